@@ -0,0 +1,102 @@
+from geofence import Geofence
+from radiosonde_payload import RadiosondePayload
+from settings.rules import Rule
+from settings.zone import Zone
+from sonde_tracker import SondeRecord, SondeTracker
+
+# Cost of the checks, a rule evaluates the cheaper ones first and stops at the first one failing.
+_FIELD = 0  # Comparison of a payload field
+_RECORD = 1  # Comparison with the previous state of the sonde
+_DISTANCE = 2  # Geofence check, the exact geodesic only near its boundary
+
+
+class CompiledRule:
+    """An alert rule compiled into its ordered checks, and its bit in SondeRecord.rules."""
+
+    __slots__ = ("settings", "name", "zone", "bit", "checks")
+
+    def __init__(self, settings: Rule, zone: Zone, bit: int, checks: list):
+        """
+        :param checks: Functions of (payload, record before the payload) returning whether the rule holds.
+        """
+        self.settings = settings
+        self.name = settings.name
+        self.zone = zone
+        self.bit = bit
+        self.checks = tuple(checks)
+
+    def matches(self, model: RadiosondePayload, sonde: SondeRecord) -> bool:
+        for check in self.checks:
+            if not check(model, sonde):
+                return False
+        return True
+
+
+def _compile_checks(rule: Rule, zone: Zone, geofences: dict) -> list:
+    """The checks of a rule, cheapest first. Bounds are bound as default arguments, local to each check."""
+    checks = []
+    if rule.descending is True or rule.burst:
+        checks.append((_FIELD, lambda model, sonde: model.vel_v < 0))
+    elif rule.descending is False:
+        checks.append((_FIELD, lambda model, sonde: model.vel_v > 0))
+    if rule.max_altitude_meters is not None:
+        checks.append((_FIELD, lambda model, sonde, high=rule.max_altitude_meters: model.altitude < high))
+    if rule.min_altitude_meters is not None:
+        checks.append((_FIELD, lambda model, sonde, low=rule.min_altitude_meters: model.altitude > low))
+    if rule.max_battery_volts is not None:
+        # Sources without battery voltage report -1.
+        checks.append((_FIELD, lambda model, sonde, high=rule.max_battery_volts: 0 <= model.batt < high))
+    if rule.models:
+        checks.append((_FIELD, lambda model, sonde, models=frozenset(rule.models): model.model in models))
+    if rule.subtypes:
+        checks.append((_FIELD, lambda model, sonde, subtypes=frozenset(rule.subtypes): model.subtype in subtypes))
+    if rule.burst:
+        # The record still holds the previous payload of the sonde.
+        checks.append((_RECORD, lambda model, sonde: sonde.vel_v > 0))
+    if rule.max_distance_km is not None:
+        key = (zone.name, rule.max_distance_km)
+        geofence = geofences.get(key)
+        if geofence is None:
+            geofence = geofences[key] = Geofence(zone.listener_location.location_tuple, rule.max_distance_km)
+        checks.append((_DISTANCE, lambda model, sonde, contains=geofence.contains: contains(model.location_tuple)))
+
+    checks.sort(key=lambda check: check[0])  # Stable, the configured order is kept within a cost
+    return [check for _, check in checks]
+
+
+class RuleSet:
+    """
+    The alert rules of the settings, compiled once when the settings are loaded.
+
+    Each rule is compiled into a tuple of checks, cheapest first: payload fields, then the previous state
+    of the sonde, then the geofence, so most payloads are rejected by a comparison or two. Rules sharing
+    a zone and a distance share their geofence. Each rule is notified once per radiosonde, which is
+    recorded as one bit of SondeRecord.rules: a rule already notified is skipped with a bit test, and a
+    sonde for which every rule was notified with a single comparison, so the state of a sonde is one
+    integer whatever the number of rules.
+    """
+
+    def __init__(self, rules: list[Rule], zones: dict[str, Zone], tracker: SondeTracker):
+        """
+        :param zones: Zone settings by name.
+        """
+        geofences = {}
+        self.rules = [
+            CompiledRule(
+                rule, zones[rule.zone], tracker.rule_bit(rule.name), _compile_checks(rule, zones[rule.zone], geofences)
+            )
+            for rule in rules
+        ]
+        self.mask = 0  # Bits of every rule
+        for rule in self.rules:
+            self.mask |= rule.bit
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def match(self, model: RadiosondePayload, sonde: SondeRecord) -> list[CompiledRule]:
+        """The rules not yet notified for the sonde that the payload satisfies."""
+        notified = sonde.rules
+        if notified & self.mask == self.mask:
+            return []
+        return [rule for rule in self.rules if not notified & rule.bit and rule.matches(model, sonde)]
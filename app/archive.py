@@ -0,0 +1,378 @@
+import array
+import asyncio
+import json
+import logging
+import math
+import os
+import struct
+import sys
+import zlib
+from collections import deque
+from datetime import datetime, UTC
+from pathlib import Path
+
+from radiosonde_payload import RadiosondePayload
+
+logger = logging.getLogger(__name__)
+
+# Archived columns and their type: "d" float, "q" integer (array typecodes), "s" string.
+COLUMNS = {
+    "time": "d",  # Receive time, unix seconds
+    "callsign": "s",
+    "latitude": "d",
+    "longitude": "d",
+    "altitude": "d",
+    "vel_v": "d",
+    "vel_h": "d",
+    "heading": "d",
+    "frame": "q",
+    "snr": "d",
+    "sats": "q",
+    "batt": "d",
+    "temp": "d",
+    "humidity": "d",
+    "pressure": "d",
+    "freq": "s",
+    "model": "s",
+    "subtype": "s",
+    "station": "s",
+}
+# Columns whose range is stored in the header of every part, to skip the parts a query can't match.
+_RANGE_COLUMNS = ("time", "latitude", "longitude")
+_RANGE_INDEXES = tuple(list(COLUMNS).index(name) for name in _RANGE_COLUMNS)
+_TYPECODES = tuple(COLUMNS.values())
+_MAGIC = b"RSARCHV1"
+_HEADER_LENGTH = struct.Struct("<I")
+_STRING_SEPARATOR = "\x00"
+
+# Value of a missing field, and conversion of the others, per type. Strings can't contain the separator.
+_MISSING = {"d": math.nan, "q": -1, "s": ""}
+_CONVERT = {"d": float, "q": int, "s": lambda value: str(value).replace(_STRING_SEPARATOR, "")}
+_PART_SUFFIX = ".rsa"
+
+
+def _encode(typecode: str, values: list) -> bytes:
+    if typecode == "s":
+        data = _STRING_SEPARATOR.join(values).encode("utf-8")
+    else:
+        data = array.array(typecode, values).tobytes()
+    return zlib.compress(data, 6)
+
+
+def _decode(typecode: str, data: bytes, rows: int, byteorder: str) -> list:
+    data = zlib.decompress(data)
+    if typecode == "s":
+        return data.decode("utf-8").split(_STRING_SEPARATOR) if rows else []
+    values = array.array(typecode)
+    values.frombytes(data)
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return values.tolist()
+
+
+def _row(received_at: float, model: RadiosondePayload) -> tuple:
+    """
+    The archived row of a payload. Missing fields, which the trusted decoder lets through, are stored as NaN,
+    -1 or an empty string, except for the time and the position, without which the row is unusable.
+    :raises ValueError: If the time or the position is missing, or a field has the wrong type.
+    """
+    values = (
+        received_at, model.callsign, model.latitude, model.longitude, model.altitude, model.vel_v, model.vel_h,
+        model.heading, model.frame, model.snr, model.sats, model.batt, model.temp, model.humidity,
+        model.pressure, model.freq, model.model, model.subtype, model.station,
+    )
+    for name, index in zip(_RANGE_COLUMNS, _RANGE_INDEXES):
+        if values[index] is None:
+            raise ValueError(f"missing {name}")
+    try:
+        return tuple(
+            _MISSING[typecode] if value is None else _CONVERT[typecode](value)
+            for typecode, value in zip(_TYPECODES, values)
+        )
+    except TypeError as e:
+        raise ValueError(e) from e
+
+
+def _row_bytes() -> int:
+    """Memory of a buffered row, measured on a typical one. Its strings are shared with the other rows."""
+    row = _row(0.0, RadiosondePayload.model_construct(
+        callsign="S1234567", latitude=45.0, longitude=9.0, altitude=1000.0, vel_v=-5.0, vel_h=10.0, heading=90.0,
+        frame=12345, snr=10.0, sats=9, batt=2.9, temp=-20.0, humidity=50.0, pressure=900.0, freq="402.500 MHz",
+        model="RS41", subtype="RS41-SGP", station="STATION",
+    ))
+    return (
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row if not isinstance(value, str))
+        + 8  # Slot of the buffer
+    )
+
+
+ROW_BYTES = _row_bytes()
+
+
+def write_part(path: Path, rows: list[tuple]):
+    """
+    Write rows to a part file: a JSON header with the row count, the range of some columns and the position
+    of every column, then each column compressed on its own, so a reader decompresses only what it needs.
+    """
+    columns = list(zip(*rows))
+    blobs = []
+    header = {"rows": len(rows), "byteorder": sys.byteorder, "columns": {}, "min": {}, "max": {}}
+    offset = 0
+    for (name, typecode), values in zip(COLUMNS.items(), columns):
+        blob = _encode(typecode, list(values))
+        header["columns"][name] = [typecode, offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+        if name in _RANGE_COLUMNS:
+            header["min"][name] = min(values)
+            header["max"][name] = max(values)
+
+    encoded_header = json.dumps(header).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix(".tmp")
+    with open(temporary_path, "wb") as part_file:
+        part_file.write(_MAGIC + _HEADER_LENGTH.pack(len(encoded_header)) + encoded_header)
+        part_file.write(b"".join(blobs))
+    os.replace(temporary_path, path)  # Readers never see a part being written
+
+
+class ArchivePart:
+    """A part file of the archive, reading its columns on demand."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as part_file:
+            if part_file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not an archive part")
+            (length,) = _HEADER_LENGTH.unpack(part_file.read(_HEADER_LENGTH.size))
+            self.header = json.loads(part_file.read(length))
+        self._data_offset = len(_MAGIC) + _HEADER_LENGTH.size + length
+
+    @property
+    def rows(self) -> int:
+        return self.header["rows"]
+
+    def overlaps(self, column: str, low: float | None, high: float | None) -> bool:
+        """Whether some values of a ranged column may be within [low, high]."""
+        if low is not None and self.header["max"][column] < low:
+            return False
+        return high is None or self.header["min"][column] <= high
+
+    def read(self, names) -> dict[str, list]:
+        """Decompress the given columns only."""
+        columns = {}
+        with open(self.path, "rb") as part_file:
+            for name in names:
+                typecode, offset, length = self.header["columns"][name]
+                part_file.seek(self._data_offset + offset)
+                columns[name] = _decode(typecode, part_file.read(length), self.rows, self.header["byteorder"])
+        return columns
+
+
+def _day(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, UTC).strftime("%Y-%m-%d")
+
+
+def _parts(directory: Path, since: float | None, until: float | None):
+    """The part files of the day partitions overlapping [since, until], in time order."""
+    if not directory.exists():
+        return
+    first = _day(since) if since is not None else None
+    last = _day(until) if until is not None else None
+    for day in sorted(path.name for path in directory.iterdir() if path.is_dir()):
+        if (first is None or day >= first) and (last is None or day <= last):
+            yield from sorted((directory / day).glob(f"*{_PART_SUFFIX}"))
+
+
+def query(directory: Path, callsign: str | None = None, since: float | None = None, until: float | None = None,
+          bbox: tuple[float, float, float, float] | None = None, columns: list[str] | None = None):
+    """
+    Yield the archived rows matching every given filter, as dicts of the requested columns.
+    :param callsign: Only this radiosonde.
+    :param since: Unix time of the oldest rows, inclusive.
+    :param until: Unix time of the newest rows, inclusive.
+    :param bbox: (south, west, north, east) in degrees, west > east crosses the antimeridian.
+    :param columns: Columns to return, all by default.
+    """
+    columns = list(columns or COLUMNS)
+    unknown = set(columns) - COLUMNS.keys()
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+    filters = []
+    if callsign is not None:
+        filters.append(("callsign", lambda value: value == callsign))
+    if since is not None or until is not None:
+        low = float("-inf") if since is None else since
+        high = float("inf") if until is None else until
+        filters.append(("time", lambda value: low <= value <= high))
+    if bbox is not None:
+        south, west, north, east = bbox
+        filters.append(("latitude", lambda value: south <= value <= north))
+        if west <= east:
+            filters.append(("longitude", lambda value: west <= value <= east))
+        else:
+            filters.append(("longitude", lambda value: value >= west or value <= east))
+
+    for path in _parts(directory, since, until):
+        try:
+            part = ArchivePart(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping {path}: {e}")
+            continue
+        if not part.overlaps("time", since, until):
+            continue
+        if bbox is not None and not part.overlaps("latitude", bbox[0], bbox[2]):
+            continue
+        if bbox is not None and bbox[1] <= bbox[3] and not part.overlaps("longitude", bbox[1], bbox[3]):
+            continue
+
+        # Each filter narrows the candidate rows, the next column is only read if some are left.
+        selected = range(part.rows)
+        loaded = {}
+        for name, accept in filters:
+            loaded.update(part.read([name]))
+            values = loaded[name]
+            selected = [index for index in selected if accept(values[index])]
+            if not selected:
+                break
+        if not selected:
+            continue
+
+        loaded.update(part.read([name for name in columns if name not in loaded]))
+        for index in selected:
+            yield {name: loaded[name][index] for name in columns}
+
+
+class ArchiveWriter:
+    """
+    Archives every decoded payload into day partitions of compressed columnar part files.
+
+    `write` only appends the row of a payload, a tuple of about ROW_BYTES, to an in-memory buffer. Every
+    `flush_interval` seconds, or as soon as `batch_bytes` of rows are buffered, the rows are encoded and
+    written on a worker thread, one part file per day. Part files are never modified once written.
+
+    A failed write, e.g. on a full disk, is logged and the rows of the days not written are kept for the
+    next flush. The buffer holds at most `max_buffered_bytes` of rows: while writes fail, or before the
+    writer runs, the oldest rows are dropped and counted rather than held without bound.
+    """
+
+    def __init__(self, directory: Path, flush_interval: float = 60.0, batch_bytes: float = 4 * 1024 * 1024,
+                 max_buffered_bytes: float = 16 * 1024 * 1024):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_rows = max(int(batch_bytes // ROW_BYTES), 1)
+        self.rows = 0  # Rows written
+        self.dropped = 0  # Rows dropped from a full buffer
+        self.skipped = 0  # Payloads without time or position, or with a field of the wrong type
+        self._parts = 0
+        self._buffer = deque(maxlen=max(int(max_buffered_bytes // ROW_BYTES), self.batch_rows))
+        self._strings = {}  # The strings of the buffered rows, each stored once
+        self._full = asyncio.Event()
+
+    def write(self, model: RadiosondePayload, received_at: float):
+        """Buffer a payload received at the unix time `received_at`."""
+        try:
+            row = _row(received_at, model)
+        except ValueError:
+            self.skipped += 1
+            if self.skipped % 100 == 1:
+                logger.warning(
+                    f"Skipped {self.skipped} payloads so far without time or position, or with invalid fields."
+                )
+            return
+        # Callsigns, models and stations repeat in most rows, the buffer keeps one copy of each.
+        strings = self._strings
+        row = tuple(strings.setdefault(value, value) if type(value) is str else value for value in row)
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1  # The oldest row makes room
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_rows:
+            self._full.set()
+
+    def _write_to_disk(self, rows: list[tuple]) -> tuple[list[tuple], Exception | None]:
+        """Write the rows, one part file per day, returns the rows of the days not written and the error."""
+        days = {}
+        for row in rows:
+            days.setdefault(_day(row[0]), []).append(row)
+        days = list(days.items())
+        for index, (day, day_rows) in enumerate(days):
+            self._parts += 1
+            name = f"part-{int(day_rows[0][0] * 1000)}-{self._parts}{_PART_SUFFIX}"
+            try:
+                write_part(self.directory / day / name, day_rows)
+            except Exception as e:
+                return [row for _, unwritten in days[index:] for row in unwritten], e
+        return [], None
+
+    def _take(self) -> list[tuple]:
+        rows = list(self._buffer)
+        self._buffer.clear()
+        self._strings.clear()  # The rows taken keep their strings
+        self._full.clear()
+        return rows
+
+    def _written(self, rows: list[tuple], unwritten: list[tuple], error: Exception | None) -> bool:
+        self.rows += len(rows) - len(unwritten)
+        if error is None:
+            return True
+        self._failed(unwritten, error)
+        return False
+
+    def _failed(self, unwritten: list[tuple], e: Exception):
+        """Put the rows not written back before the rows buffered meanwhile, the oldest dropped if full."""
+        newer = list(self._buffer)
+        self._buffer.clear()
+        self._buffer.extend(unwritten)
+        self._buffer.extend(newer)
+        dropped = len(unwritten) + len(newer) - len(self._buffer)
+        self.dropped += dropped
+        logger.error(
+            f"Could not write {len(unwritten)} payloads to the archive, keeping {len(self._buffer)} for the next "
+            f"flush ({self.dropped} dropped so far): {e}"
+        )
+
+    async def flush(self) -> bool:
+        """Write the buffered rows on a worker thread, returns whether the write succeeded."""
+        if not self._buffer:
+            return True
+        rows = self._take()
+        try:
+            unwritten, error = await asyncio.to_thread(self._write_to_disk, rows)
+        except Exception as e:
+            unwritten, error = rows, e
+        return self._written(rows, unwritten, error)
+
+    def flush_sync(self):
+        """Write the buffered rows, blocking."""
+        if not self._buffer:
+            return
+        rows = self._take()
+        try:
+            unwritten, error = self._write_to_disk(rows)
+        except Exception as e:
+            unwritten, error = rows, e
+        self._written(rows, unwritten, error)
+
+    async def run(self):
+        """Flush periodically, or when the buffer is full, until cancelled, then flush what is left."""
+        logger.info(f"Archiving payloads to {self.directory}.")
+        succeeded = True
+        try:
+            while True:
+                if succeeded:
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    # After a failure the buffer is full at once, the next attempt waits a whole interval.
+                    await asyncio.sleep(self.flush_interval)
+                succeeded = await self.flush()
+        finally:
+            self.flush_sync()
+            logger.info(
+                f"Archive stopped after {self.rows} payloads, {self.dropped} dropped, {self.skipped} skipped."
+            )
+
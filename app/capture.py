@@ -0,0 +1,125 @@
+import asyncio
+import gzip
+import logging
+import struct
+import time
+from collections import deque
+from os import makedirs
+from pathlib import Path
+
+from settings.listener_types import ListenerType
+
+logger = logging.getLogger(__name__)
+
+# Record header: receive timestamp (unix seconds), source, payload length.
+_HEADER = struct.Struct("<dBI")
+_SOURCES = list(ListenerType)
+
+
+class CaptureWriter:
+    """
+    Records raw inbound messages to a compressed, append-only capture file.
+
+    `write` only appends to an in-memory buffer, so it is cheap enough for the hot path. The buffer is
+    written by `run` every `flush_interval` seconds on a worker thread, each flush appending a gzip member
+    to the file, so a capture survives restarts and a crash loses at most one interval.
+
+    A failed write is logged and its messages are kept for the next flush. The buffer holds at most
+    `max_buffered` messages: while writes fail, or before the writer runs, the oldest messages are dropped
+    and counted rather than held without bound.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 5.0, max_buffered: int = 50_000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.records = 0
+        self.dropped = 0  # Messages dropped from a full buffer
+        self._buffer = deque(maxlen=max_buffered)  # One record, header and message, per entry
+
+    def write(self, source: ListenerType, data: bytes, received_at: float | None = None):
+        """Buffer a raw message received from `source`."""
+        if received_at is None:
+            received_at = time.time()
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1  # The oldest message makes room
+        self._buffer.append(_HEADER.pack(received_at, _SOURCES.index(source), len(data)) + data)
+        self.records += 1
+
+    def _write_to_disk(self, chunks: list[bytes]):
+        makedirs(self.path.parent, exist_ok=True)
+        with open(self.path, "ab") as raw_file:
+            size = raw_file.tell()
+            try:
+                with gzip.GzipFile(fileobj=raw_file, mode="ab", compresslevel=6) as capture_file:
+                    capture_file.write(b"".join(chunks))
+            except BaseException:
+                # A gzip member cut short would hide the ones appended after it, the write is retried whole.
+                raw_file.truncate(size)
+                raise
+
+    def _take(self) -> list[bytes]:
+        chunks = list(self._buffer)
+        self._buffer.clear()
+        return chunks
+
+    def _failed(self, chunks: list[bytes], e: Exception):
+        """Put the messages of a failed write back before those buffered meanwhile, the oldest dropped if full."""
+        newer = list(self._buffer)
+        self._buffer.clear()
+        self._buffer.extend(chunks)
+        self._buffer.extend(newer)
+        self.dropped += len(chunks) + len(newer) - len(self._buffer)
+        logger.error(
+            f"Could not write {len(chunks)} messages to {self.path}, keeping {len(self._buffer)} for the next "
+            f"flush ({self.dropped} dropped so far): {e}"
+        )
+
+    async def flush(self):
+        """Write the buffered messages on a worker thread."""
+        if not self._buffer:
+            return
+        chunks = self._take()
+        try:
+            await asyncio.to_thread(self._write_to_disk, chunks)
+        except Exception as e:
+            self._failed(chunks, e)
+
+    def flush_sync(self):
+        """Write the buffered messages, blocking."""
+        if not self._buffer:
+            return
+        chunks = self._take()
+        try:
+            self._write_to_disk(chunks)
+        except Exception as e:
+            self._failed(chunks, e)
+
+    async def run(self):
+        """Periodically flush the buffer until cancelled, then flush what is left."""
+        logger.info(f"Capturing inbound messages to {self.path}.")
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            self.flush_sync()
+            logger.info(f"Capture stopped after {self.records} messages, {self.dropped} dropped.")
+
+
+def read_capture(path: Path):
+    """Yield (received_at, source, data) for every message of a capture file."""
+    with gzip.open(path, "rb") as capture_file:
+        while True:
+            try:
+                header = capture_file.read(_HEADER.size)
+                if not header:
+                    return
+                received_at, source, length = _HEADER.unpack(header)
+                data = capture_file.read(length)
+                if len(data) < length:
+                    raise EOFError
+            except (EOFError, struct.error):
+                # The last flush was interrupted, e.g. by a crash.
+                logger.warning(f"Truncated record at the end of {path}, stopping there.")
+                return
+            yield received_at, _SOURCES[source], data
@@ -0,0 +1,109 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, UTC
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_MIN_COMPACTION = 1024  # Stale heap entries tolerated however few the keys, so small heaps are not rebuilt often
+
+
+class DeadlineScheduler:
+    """
+    Min-heap of per-key deadlines that calls `on_due(key, now)` when a key's deadline is reached.
+
+    There is at most one live heap entry per key. Moving a deadline later (the common case, every new
+    frame of a sonde) is O(1): the entry is left in place and, when it comes due, `on_due` returns the
+    key's actual next deadline, which is pushed back in O(log n). Moving a deadline earlier pushes a new
+    entry and the old one is skipped when popped. `on_due` returns None once the key needs no more calls.
+
+    Stale entries, of cancelled or moved deadlines, are counted. When they outnumber the live ones, e.g.
+    sondes flapping across the edge of the relevance range, the heap is rebuilt from the live deadlines,
+    so it never holds more than about twice as many entries as there are keys.
+        """
+
+    def __init__(self, on_due):
+        """
+        :param on_due: Function called with (key, now) when a deadline is reached, returning the next
+                       deadline of the key or None.
+        """
+        self._on_due = on_due
+        self._heap = []
+        self._deadlines = {}
+        self._stale = 0  # Heap entries no longer matching a deadline, skipped when popped
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, key, deadline: datetime):
+        """Make sure `on_due` is called for `key` no later than `deadline`."""
+        scheduled = self._deadlines.get(key)
+        if scheduled is not None and scheduled <= deadline:
+            return
+
+        sequence = next(self._counter)
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, sequence, key))
+        if self._heap[0][1] == sequence:
+            self._wakeup.set()  # New earliest deadline, the runner has to sleep less.
+        if scheduled is not None:
+            self._add_stale()
+
+    def cancel(self, key):
+        """Forget the deadline of `key`, its heap entry is skipped when popped."""
+        if self._deadlines.pop(key, None) is not None:
+            self._add_stale()
+
+    def _add_stale(self):
+        self._stale += 1
+        if self._stale > max(len(self._deadlines), _MIN_COMPACTION):
+            self._heap = [(deadline, next(self._counter), key) for key, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def run_due(self, now: datetime) -> int:
+        """Call `on_due` for every deadline up to `now`, returns the number of calls."""
+        calls = 0
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) != deadline:
+                self._stale -= 1
+                continue  # Stale entry, superseded by an earlier deadline or cancelled.
+
+            del self._deadlines[key]
+            calls += 1
+            try:
+                next_deadline = self._on_due(key, now)
+            except Exception as e:
+                logger.exception(e)
+                continue
+
+            if next_deadline is not None:
+                self.schedule(key, next_deadline)
+        return calls
+
+    async def run(self):
+        """Fire deadlines as they are reached, until cancelled."""
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = (self._heap[0][0] - datetime.now(UTC)).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            started = time.perf_counter()
+            self.run_due(datetime.now(UTC))
+            metrics.PURGE_CYCLE_SECONDS.observe(time.perf_counter() - started)
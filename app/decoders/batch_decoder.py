@@ -0,0 +1,54 @@
+"""
+Decoding of MQTT message batches in worker processes.
+
+Everything here runs in the processes of a ProcessPoolExecutor: messages are decoded and the sondes
+far from every zone are dropped there, only the relevant payloads are sent back to the event loop.
+"""
+from settings.decoder_types import DecoderType
+from zone_index import ZoneIndex
+
+from .decoder_repo import DecoderRepo
+
+_decoders = {}
+_indexes = {}
+
+
+def _get_decoder(decoder_type: DecoderType):
+    decoder = _decoders.get(decoder_type)
+    if decoder is None:
+        decoder = _decoders[decoder_type] = DecoderRepo.get_decoder(decoder_type)
+    return decoder
+
+
+def _get_zone_index(areas: tuple) -> ZoneIndex:
+    index = _indexes.get(areas)
+    if index is None:
+        _indexes.clear()  # The settings changed, the previous zones are not used anymore
+        index = _indexes[areas] = ZoneIndex(list(areas))
+    return index
+
+
+def decode_mqtt_batch(payloads: list[bytes], decoder_type: DecoderType, areas: tuple) -> tuple[list, int, int]:
+    """
+    Decode a batch of sondehub MQTT messages, keeping only the sondes near a zone.
+    :param areas: (name, (latitude, longitude), relevance in km) of every zone, see `Settings.relevance_km`.
+    :return: The relevant payloads, the number of messages that failed to decode, and the number of
+             decoded messages dropped by the geofence.
+    """
+    decode = _get_decoder(decoder_type).decode_mqtt
+    contains = _get_zone_index(areas).contains
+
+    models = []
+    rejected = 0
+    filtered = 0
+    for payload in payloads:
+        try:
+            model = decode(payload)
+        except Exception:
+            rejected += 1
+            continue
+        if contains((model.latitude, model.longitude)):
+            models.append(model)
+        else:
+            filtered += 1
+    return models, rejected, filtered
@@ -0,0 +1,27 @@
+import json
+from abc import ABC, abstractmethod
+
+from radiosonde_payload import RadiosondePayload
+
+
+class DecoderBase(ABC):
+    """Turns the raw messages of every listener into RadiosondePayload objects."""
+
+    def decode_udp(self, data: bytes) -> RadiosondePayload | None:
+        """Decode a Horus UDP packet, returns None if it is not a payload summary."""
+        return self.decode_udp_dict(json.loads(data))
+
+    @abstractmethod
+    def decode_udp_dict(self, packet: dict) -> RadiosondePayload | None:
+        """Decode an already parsed Horus UDP packet, returns None if it is not a payload summary."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode_mqtt(self, data: bytes) -> RadiosondePayload:
+        """Decode a sondehub MQTT message payload."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode_web(self, feature: dict) -> RadiosondePayload:
+        """Decode a feature of the radiosondy GeoJSON export."""
+        raise NotImplementedError
@@ -0,0 +1,18 @@
+from settings.decoder_types import DecoderType
+
+from .decoder_base import DecoderBase
+from .fast_decoder import FastDecoder
+from .strict_decoder import StrictDecoder
+from .trusted_decoder import TrustedDecoder
+
+
+class DecoderRepo:
+    repositories = {
+        DecoderType.STRICT: StrictDecoder,
+        DecoderType.FAST: FastDecoder,
+        DecoderType.TRUSTED: TrustedDecoder,
+    }
+
+    @classmethod
+    def get_decoder(cls, decoder_type: DecoderType) -> DecoderBase:
+        return cls.repositories.get(decoder_type, FastDecoder)()
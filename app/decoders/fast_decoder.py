@@ -0,0 +1,30 @@
+from pydantic_core import from_json
+
+from radiosonde_payload import RadiosondePayload
+
+from .decoder_base import DecoderBase
+from .field_mapping import mqtt_fields, web_fields
+
+
+class FastDecoder(DecoderBase):
+    """
+    Still fully validated, but without intermediate steps: UDP packets are validated straight
+    from the raw bytes by pydantic-core, MQTT messages are parsed by the pydantic-core JSON parser,
+    and MQTT/web messages are mapped in a single pass.
+    """
+
+    def decode_udp(self, data: bytes) -> RadiosondePayload | None:
+        if b'"PAYLOAD_SUMMARY"' not in data:
+            return None
+        return RadiosondePayload.model_validate_json(data)
+
+    def decode_udp_dict(self, packet: dict) -> RadiosondePayload | None:
+        if packet.get("type") != "PAYLOAD_SUMMARY":
+            return None
+        return RadiosondePayload.model_validate(packet)
+
+    def decode_mqtt(self, data: bytes) -> RadiosondePayload:
+        return RadiosondePayload.model_validate(mqtt_fields(from_json(data)))
+
+    def decode_web(self, feature: dict) -> RadiosondePayload:
+        return RadiosondePayload.model_validate(web_fields(feature))
@@ -0,0 +1,83 @@
+def strip_unit(value, default: float = 0.0) -> float:
+    """Parse a radiosondy value like "12.5 m/s" into a float."""
+    if not value:
+        return default
+    return float(value.split(" ", 1)[0])
+
+
+def mqtt_fields(packet: dict) -> dict:
+    """Map a sondehub MQTT message to the RadiosondePayload fields."""
+    get = packet.get
+    vel_h = get("vel_h", 0.0)
+    return {
+        "callsign": get("serial", ""),
+        "model": get("type", ""),
+        "freq": f"{get('frequency', '0.0')}MHz",
+        "batt": get("batt", -1),
+        "vel_v": get("vel_v", 0.0),
+        "vel_h": vel_h,
+        "altitude": int(get("alt", 0)),
+        "latitude": get("lat", 0.0),
+        "longitude": get("lon", 0.0),
+        "sdr_device_idx": "0",
+        "subtype": get("subtype", ""),
+        "ppm": 0,
+        "f_centre": 0.0,
+        "fest": [],
+        "snr": get("rssi", 0),
+        "sats": get("sats", 0),
+        "pressure": get("pressure", 0),
+        "humidity": get("humidity", 0),
+        "bt": get("burst_timer", 0),
+        "frame": get("frame", 0),
+        "temp": get("temp", 0),
+        "time": get("datetime", ""),
+        "heading": get("heading", 0.0),
+        "speed": vel_h,
+        "station": get("uploader_callsign", ""),
+        "type": "",
+    }
+
+
+def web_fields(feature: dict) -> dict:
+    """Map a feature of the radiosondy export to the RadiosondePayload fields."""
+    get = feature["properties"].get
+    speed = strip_unit(get("speed"))
+    return {
+        "callsign": get("id", ""),
+        "model": get("type", ""),
+        "freq": get("frequency", "0.0"),
+        "batt": -1,
+        "vel_v": strip_unit(get("climbing")),
+        "vel_h": speed / 3.6,
+        "altitude": int(strip_unit(get("altitude"))),
+        "latitude": float(get("latitude", "0.0")),
+        "longitude": float(get("longitude", "0.0")),
+        "sdr_device_idx": "0",
+        "subtype": "",
+        "ppm": 0,
+        "f_centre": 0.0,
+        "fest": [],
+        "snr": 0,
+        "sats": 0,
+        "pressure": 0,
+        "humidity": 0,
+        "bt": 0,
+        "frame": 0,
+        "temp": 0,
+        "time": "",
+        "heading": strip_unit(get("course")),
+        "speed": speed,
+        "station": "",
+        "type": "",
+    }
+
+
+# Properties of the radiosondy export read by `web_fields`, a feature is unchanged if none of them changed.
+WEB_PROPERTIES = ("id", "type", "frequency", "climbing", "speed", "altitude", "latitude", "longitude", "course")
+
+
+def web_fingerprint(feature: dict) -> int:
+    """Compact fingerprint of the fields of a radiosondy feature, computed from the raw strings."""
+    get = feature["properties"].get
+    return hash(tuple(get(name) for name in WEB_PROPERTIES))
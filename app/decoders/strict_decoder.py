@@ -0,0 +1,21 @@
+import json
+
+from radiosonde_payload import RadiosondePayload
+from utils import Utils
+
+from .decoder_base import DecoderBase
+
+
+class StrictDecoder(DecoderBase):
+    """Full pydantic validation of every field, through the original mapping functions."""
+
+    def decode_udp_dict(self, packet: dict) -> RadiosondePayload | None:
+        if packet.get("type") != "PAYLOAD_SUMMARY":
+            return None
+        return RadiosondePayload(**packet)
+
+    def decode_mqtt(self, data: bytes) -> RadiosondePayload:
+        return Utils.map_mqtt_json_to_radiosonde_payload(json.loads(data))
+
+    def decode_web(self, feature: dict) -> RadiosondePayload:
+        return Utils.map_web_json_to_radiosonde_payload(feature)
@@ -0,0 +1,113 @@
+from pydantic_core import from_json
+
+from radiosonde_payload import RadiosondePayload
+
+from .fast_decoder import FastDecoder
+from .field_mapping import strip_unit
+
+
+def _construct(callsign, latitude, longitude, altitude, vel_v, vel_h, heading, frame, time, model, subtype, freq,
+               batt, snr, sats) -> RadiosondePayload:
+    """Build a payload from the fields the notifier uses, with placeholders for the others."""
+    return RadiosondePayload.construct_trusted({
+        "type": "",
+        "station": "",
+        "callsign": callsign,
+        "latitude": latitude,
+        "longitude": longitude,
+        "altitude": altitude,
+        "speed": 0.0,
+        "heading": heading,
+        "time": time,
+        "comment": None,
+        "model": model,
+        "freq": freq,
+        "temp": 0.0,
+        "frame": frame,
+        "bt": 0,
+        "humidity": 0.0,
+        "pressure": 0.0,
+        "sats": sats,
+        "batt": batt,
+        "snr": snr,
+        "fest": [],
+        "f_centre": 0.0,
+        "ppm": 0.0,
+        "subtype": subtype,
+        "sdr_device_idx": "0",
+        "vel_v": vel_v,
+        "vel_h": vel_h,
+    })
+
+
+class TrustedDecoder(FastDecoder):
+    """
+    No validation at all: messages are parsed with the pydantic-core JSON parser, only the fields the notifier
+    uses are read and the payload is built directly. Raw UDP packets are the exception: validating them
+    from bytes entirely in pydantic-core (the fast decoder) is quicker than any Python-side construction.
+    Meant for trusted sources, like a local auto_rx instance; a malformed packet is not rejected and may
+    fail later, while it is being handled.
+    """
+
+    def decode_udp_dict(self, packet: dict) -> RadiosondePayload | None:
+        if packet.get("type") != "PAYLOAD_SUMMARY":
+            return None
+
+        get = packet.get
+        return _construct(
+            callsign=packet["callsign"],
+            latitude=packet["latitude"],
+            longitude=packet["longitude"],
+            altitude=packet["altitude"],
+            vel_v=packet["vel_v"],
+            vel_h=packet["vel_h"],
+            heading=get("heading", 0.0),
+            frame=packet["frame"],
+            time=get("time", ""),
+            model=get("model", ""),
+            subtype=get("subtype", ""),
+            freq=get("freq", ""),
+            batt=get("batt", -1),
+            snr=get("snr", 0),
+            sats=get("sats", 0),
+        )
+
+    def decode_mqtt(self, data: bytes) -> RadiosondePayload:
+        get = from_json(data).get
+        return _construct(
+            callsign=get("serial", ""),
+            latitude=get("lat", 0.0),
+            longitude=get("lon", 0.0),
+            altitude=int(get("alt", 0)),
+            vel_v=get("vel_v", 0.0),
+            vel_h=get("vel_h", 0.0),
+            heading=get("heading", 0.0),
+            frame=get("frame", 0),
+            time=get("datetime", ""),
+            model=get("type", ""),
+            subtype=get("subtype", ""),
+            freq=f"{get('frequency', '0.0')}MHz",
+            batt=get("batt", -1),
+            snr=get("rssi", 0),
+            sats=get("sats", 0),
+        )
+
+    def decode_web(self, feature: dict) -> RadiosondePayload:
+        get = feature["properties"].get
+        return _construct(
+            callsign=get("id", ""),
+            latitude=float(get("latitude", "0.0")),
+            longitude=float(get("longitude", "0.0")),
+            altitude=int(strip_unit(get("altitude"))),
+            vel_v=strip_unit(get("climbing")),
+            vel_h=strip_unit(get("speed")) / 3.6,
+            heading=strip_unit(get("course")),
+            frame=0,
+            time="",
+            model=get("type", ""),
+            subtype="",
+            freq=get("frequency", "0.0"),
+            batt=-1,
+            snr=0,
+            sats=0,
+        )
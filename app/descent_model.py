@@ -0,0 +1,122 @@
+import array
+import math
+import sys
+from typing import NamedTuple
+
+# Scale height of the atmosphere, in meters: the air density is divided by e every 7.2 km.
+_SCALE_HEIGHT_M = 7238.3
+_METERS_PER_DEGREE_LAT = 111_320.0
+# Shortest window over which velocities are estimated from positions, shorter ones are too noisy.
+_MIN_WINDOW_SECONDS = 5.0
+# Below this descent rate the sonde is considered landed or floating, and nothing is predicted.
+_MIN_DESCENT_RATE = 0.5
+
+
+class LandingPrediction(NamedTuple):
+    latitude: float
+    longitude: float
+    eta_seconds: float
+
+    @property
+    def location_tuple(self):
+        return self.latitude, self.longitude
+
+
+class DescentTrack:
+    """
+    Fixed-size ring buffer of the recent samples of a radiosonde, and a descent model built on it.
+
+    Adding a sample and predicting are O(1): velocities are the difference between the newest and the
+    oldest sample of the buffer, which smooths out the position noise of single frames. The descent rate
+    of a parachute grows as the air gets thinner, with 1/sqrt(density); the observed rate is normalized
+    to its sea level equivalent, and the time to the ground is the closed-form integral of that profile.
+    The horizontal drift is assumed constant until landing.
+    """
+
+    __slots__ = ("_times", "_latitudes", "_longitudes", "_altitudes", "_vel_v", "_vel_h", "_headings",
+                 "_next", "_count")
+
+    def __init__(self, capacity: int = 32):
+        # Columns of unboxed doubles, 8 bytes per value instead of a pointer to a 24 bytes float object.
+        zeros = bytes(8 * capacity)
+        self._times = array.array("d", zeros)
+        self._latitudes = array.array("d", zeros)
+        self._longitudes = array.array("d", zeros)
+        self._altitudes = array.array("d", zeros)
+        self._vel_v = array.array("d", zeros)
+        self._vel_h = array.array("d", zeros)
+        self._headings = array.array("d", zeros)
+        self._next = 0
+        self._count = 0
+
+    def nbytes(self) -> int:
+        """Memory held by the track."""
+        columns = (self._times, self._latitudes, self._longitudes, self._altitudes, self._vel_v, self._vel_h,
+                   self._headings)
+        return sys.getsizeof(self) + sum(sys.getsizeof(column) for column in columns)
+
+    def __len__(self):
+        return self._count
+
+    def _newest(self) -> int:
+        return (self._next - 1) % len(self._times)
+
+    def _oldest(self) -> int:
+        return (self._next - self._count) % len(self._times)
+
+    def add(self, timestamp: float, latitude: float, longitude: float, altitude: float, vel_v: float,
+            vel_h: float, heading: float):
+        """Add a sample, `timestamp` in seconds. Samples within half a second of the newest are ignored."""
+        if self._count and timestamp - self._times[self._newest()] < 0.5:
+            return  # Duplicate of the same frame, received from another station or source.
+
+        index = self._next
+        self._times[index] = timestamp
+        self._latitudes[index] = latitude
+        self._longitudes[index] = longitude
+        self._altitudes[index] = altitude
+        self._vel_v[index] = vel_v
+        self._vel_h[index] = vel_h
+        self._headings[index] = heading
+        self._next = (index + 1) % len(self._times)
+        self._count = min(self._count + 1, len(self._times))
+
+    def predict(self, ground_altitude: float = 0.0) -> LandingPrediction | None:
+        """Predict where and in how many seconds the sonde lands, None if it is not descending."""
+        if not self._count:
+            return None
+
+        newest = self._newest()
+        oldest = self._oldest()
+        latitude = self._latitudes[newest]
+        longitude = self._longitudes[newest]
+        altitude = self._altitudes[newest]
+        window = self._times[newest] - self._times[oldest]
+
+        if window >= _MIN_WINDOW_SECONDS:
+            descent_rate = (self._altitudes[oldest] - altitude) / window
+            mean_altitude = (self._altitudes[oldest] + altitude) / 2
+            north = (latitude - self._latitudes[oldest]) * _METERS_PER_DEGREE_LAT / window
+            delta_lon = (longitude - self._longitudes[oldest] + 180.0) % 360.0 - 180.0
+            east = delta_lon * _METERS_PER_DEGREE_LAT * math.cos(math.radians(latitude)) / window
+        else:
+            # Too few samples yet, use the reported velocities.
+            descent_rate = -self._vel_v[newest]
+            mean_altitude = altitude
+            heading = math.radians(self._headings[newest])
+            north = self._vel_h[newest] * math.cos(heading)
+            east = self._vel_h[newest] * math.sin(heading)
+
+        if descent_rate < _MIN_DESCENT_RATE or altitude <= ground_altitude:
+            return None
+
+        sea_level_rate = descent_rate * math.exp(-mean_altitude / (2 * _SCALE_HEIGHT_M))
+        eta_seconds = (2 * _SCALE_HEIGHT_M / sea_level_rate) * (
+                math.exp(-ground_altitude / (2 * _SCALE_HEIGHT_M)) - math.exp(-altitude / (2 * _SCALE_HEIGHT_M))
+        )
+
+        landing_latitude = latitude + north * eta_seconds / _METERS_PER_DEGREE_LAT
+        cos_latitude = max(math.cos(math.radians(landing_latitude)), 0.01)
+        landing_longitude = longitude + east * eta_seconds / (_METERS_PER_DEGREE_LAT * cos_latitude)
+        landing_longitude = (landing_longitude + 180.0) % 360.0 - 180.0
+        return LandingPrediction(landing_latitude, landing_longitude, eta_seconds)
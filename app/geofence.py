@@ -0,0 +1,96 @@
+import math
+
+# Shortest possible length of one degree of latitude on the WGS-84 ellipsoid (at the equator), in km.
+# Any two points whose latitudes differ by `d` degrees are at least `d * _MIN_KM_PER_DEGREE_LAT` km apart.
+_MIN_KM_PER_DEGREE_LAT = 110.574
+_MEAN_EARTH_RADIUS_KM = 6371.0088
+# Closer to the poles the equirectangular approximation is too coarse, only the exact geodesic is used there.
+_MAX_APPROXIMATION_LATITUDE = 75.0
+
+
+def geodesic_km(a: tuple[float, float], b: tuple[float, float]) -> float:
+    """Exact geodesic distance in km. geopy is imported on first use, it loads its geocoders too."""
+    from geopy import distance
+    return distance.distance(a, b).km
+
+
+class Geofence:
+    """
+    Circular geofence around a home location.
+
+    Checking whether a radiosonde is within range is done in three steps, cheapest first:
+    1. a latitude bounding-box check, which rejects most sondes on the MQTT firehose with a subtraction;
+    2. an equirectangular approximation, which decides every sonde that is clearly inside or outside;
+    3. the exact geodesic (geopy), only for sondes within `boundary_margin` of the radius.
+
+    Results are cached per callsign and position, so a packet is only evaluated once no matter
+    how many times its distance is needed while it is being handled.
+    """
+
+    def __init__(self, home: tuple[float, float], range_km: float, boundary_margin: float = 0.02):
+        """
+        :param home: (latitude, longitude) of the listener.
+        :param range_km: Radius of the geofence in kilometers.
+        :param boundary_margin: Relative band around `range_km` in which the exact geodesic is used.
+        """
+        self.home = home
+        self.range_km = range_km
+
+        band_km = max(range_km * boundary_margin, 0.5)
+        self._inner_km = range_km - band_km
+        self._outer_km = range_km + band_km
+        self._max_delta_lat = self._outer_km / _MIN_KM_PER_DEGREE_LAT
+
+        self._home_lat_rad = math.radians(home[0])
+        if abs(home[0]) + self._max_delta_lat > _MAX_APPROXIMATION_LATITUDE:
+            self._inner_km, self._outer_km = 0.0, math.inf
+        self._cache = {}
+
+    def _approximate_distance(self, latitude: float, longitude: float) -> float:
+        """Equirectangular distance from home, in km."""
+        lat_rad = math.radians(latitude)
+        delta_lon = (longitude - self.home[1] + 180.0) % 360.0 - 180.0
+        x = math.radians(delta_lon) * math.cos((lat_rad + self._home_lat_rad) / 2)
+        y = lat_rad - self._home_lat_rad
+        return math.hypot(x, y) * _MEAN_EARTH_RADIUS_KM
+
+    def _evaluate(self, latitude: float, longitude: float):
+        """Return (within_range, exact_distance_km or None) for a position."""
+        if abs(latitude - self.home[0]) > self._max_delta_lat:
+            return False, None
+
+        approximate_km = self._approximate_distance(latitude, longitude)
+        if approximate_km < self._inner_km:
+            return True, None
+        if approximate_km > self._outer_km:
+            return False, None
+
+        exact_km = geodesic_km(self.home, (latitude, longitude))
+        return exact_km <= self.range_km, exact_km
+
+    def _entry(self, callsign: str, location: tuple[float, float]):
+        entry = self._cache.get(callsign)
+        if entry is None or entry[0] != location:
+            within_range, exact_km = self._evaluate(*location)
+            entry = [location, within_range, exact_km]
+            self._cache[callsign] = entry
+        return entry
+
+    def contains(self, location: tuple[float, float]) -> bool:
+        """Check whether `location` is inside the geofence, without caching the result."""
+        return self._evaluate(*location)[0]
+
+    def is_within_range(self, callsign: str, location: tuple[float, float]) -> bool:
+        """Check whether `location` of the radiosonde `callsign` is inside the geofence."""
+        return self._entry(callsign, location)[1]
+
+    def get_distance(self, callsign: str, location: tuple[float, float]) -> float:
+        """Exact geodesic distance from home in km, computed at most once per callsign and position."""
+        entry = self._entry(callsign, location)
+        if entry[2] is None:
+            entry[2] = geodesic_km(self.home, location)
+        return entry[2]
+
+    def forget(self, callsign: str):
+        """Drop the cached result for a radiosonde that is no longer tracked."""
+        self._cache.pop(callsign, None)
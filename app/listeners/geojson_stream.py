@@ -0,0 +1,79 @@
+import codecs
+import json
+
+
+class FeatureStreamParser:
+    """
+    Incremental parser for the `features` array of a GeoJSON FeatureCollection.
+
+    Chunks of the response body are fed as they arrive and every complete feature is returned as
+    soon as it has been received, so only one feature (plus the unparsed tail of the last chunk)
+    is held in memory at a time, however large the collection is.
+    """
+
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._in_array = False
+        self.done = False
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        """Feed a chunk of the body and return the features completed by it."""
+        self._buffer += self._decoder.decode(chunk)
+        return self._parse()
+
+    def close(self) -> list[dict]:
+        """Signal the end of the body. Raises ValueError if the body ended mid-collection."""
+        self._buffer += self._decoder.decode(b"", final=True)
+        features = self._parse()
+        if not self.done:
+            raise ValueError("Unexpected end of GeoJSON features array")
+        return features
+
+    def _find_array_start(self) -> bool:
+        key = self._buffer.find('"features"')
+        if key == -1:
+            # Keep a possible partial key at the end of the buffer.
+            self._buffer = self._buffer[-len('"features"'):]
+            return False
+
+        start = self._buffer.find("[", key)
+        if start == -1:
+            self._buffer = self._buffer[key:]
+            return False
+
+        self._buffer = self._buffer[start + 1:]
+        self._in_array = True
+        return True
+
+    def _parse(self) -> list[dict]:
+        features = []
+        if self.done or (not self._in_array and not self._find_array_start()):
+            return features
+
+        buffer = self._buffer
+        position = 0
+        length = len(buffer)
+        while True:
+            while position < length and (buffer[position] in self._WHITESPACE or buffer[position] == ","):
+                position += 1
+            if position >= length:
+                break
+
+            if buffer[position] == "]":
+                self.done = True
+                position = length
+                break
+
+            try:
+                feature, position = self._json_decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The feature is not complete yet, wait for the next chunk.
+                break
+            features.append(feature)
+
+        self._buffer = buffer[position:]
+        return features
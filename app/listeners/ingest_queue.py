@@ -0,0 +1,77 @@
+import asyncio
+from collections import deque
+
+import metrics
+from settings.overflow_policy import OverflowPolicy
+
+
+class IngestQueue:
+    """
+    Bounded queue between a packet source and its consumers.
+
+    `put` never blocks, when the queue is full the overflow policy decides what is lost:
+    - drop_oldest: the oldest pending packet is discarded to make room;
+    - drop_newest: the new packet is discarded;
+    - coalesce: only the latest packet per key (callsign) is kept pending, a new packet replaces
+      the pending one of the same key in place. If the queue is full of distinct keys, the oldest is dropped.
+    """
+
+    def __init__(self, maxsize: int, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST, listener: str = ""):
+        """
+        :param listener: Label of the metrics of the queue.
+        """
+        self.maxsize = maxsize
+        self.policy = policy
+
+        self._keys = deque()
+        self._items = {}
+        self._not_empty = asyncio.Event()
+
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+        self._dropped_metric = metrics.INGEST_DROPPED.labels(listener)
+        self._coalesced_metric = metrics.INGEST_COALESCED.labels(listener)
+        self._high_water_metric = metrics.INGEST_HIGH_WATER.labels(listener)
+        self._high_water_metric.set(0)
+
+    def qsize(self) -> int:
+        return len(self._keys)
+
+    def put(self, item, key=None) -> bool:
+        """Queue an item, returns False if an item (new or old) was dropped."""
+        if key is None or self.policy != OverflowPolicy.COALESCE:
+            key = object()
+        elif key in self._items:
+            self._items[key] = item
+            self.coalesced += 1
+            self._coalesced_metric.inc()
+            return True
+
+        accepted = True
+        if len(self._keys) >= self.maxsize:
+            self.dropped += 1
+            self._dropped_metric.inc()
+            accepted = False
+            if self.policy == OverflowPolicy.DROP_NEWEST:
+                return False
+            del self._items[self._keys.popleft()]
+
+        self._keys.append(key)
+        self._items[key] = item
+        if len(self._keys) > self.high_water:
+            self.high_water = len(self._keys)
+            self._high_water_metric.set(self.high_water)
+        self._not_empty.set()
+        return accepted
+
+    async def get(self):
+        """Wait for and return the oldest pending item."""
+        while not self._keys:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        item = self._items.pop(self._keys.popleft())
+        if not self._keys:
+            self._not_empty.clear()
+        return item
@@ -1,14 +1,60 @@
+import time
 from abc import ABC, abstractmethod
 
+import metrics
 from settings import Settings
+from settings.listener_types import ListenerType
+from settings_provider import SettingsProvider
 
 
 class ListenerBase(ABC):
-    def __init__(self, settings: Settings, callback=None):
-        self.settings = settings
+    source: ListenerType = None
+    provides_frame_numbers = True  # Whether the payloads carry the frame numbers of the sonde
+
+    def __init__(self, settings_provider: SettingsProvider, callback=None):
+        self.settings_provider = settings_provider
         self.callback = callback
+        self.capture = None  # CaptureWriter recording the raw inbound messages, if enabled
+        self.activity = None  # Function returning the number of sondes descending near a zone, if known
+
+        label = self.source.value if self.source else self.__class__.__name__
+        self._packets_received = metrics.PACKETS_RECEIVED.labels(label)
+        self._packets_parsed = metrics.PACKETS_PARSED.labels(label)
+        self._packets_rejected = metrics.PACKETS_REJECTED.labels(label)
+        self._packets_filtered = metrics.PACKETS_FILTERED.labels(label)
+        self._decode_seconds = metrics.DECODE_SECONDS.labels(label)
+
+    @property
+    def settings(self) -> Settings:
+        return self.settings_provider.settings
+
+    def _capture(self, data: bytes):
+        if self.capture is not None:
+            self.capture.write(self.source, data)
+
+    def _decode(self, decode, data):
+        """Decode a message with `decode`, updating the listener metrics."""
+        self._packets_received.inc()
+        started = time.perf_counter()
+        try:
+            model = decode(data)
+        except Exception:
+            self._packets_rejected.inc()
+            raise
+        self._decode_seconds.observe(time.perf_counter() - started)
+
+        if model is None:
+            self._packets_rejected.inc()
+        else:
+            self._packets_parsed.inc()
+        return model
 
     @abstractmethod
     async def listen(self):
         """Start the listener."""
         raise NotImplementedError
+
+    @abstractmethod
+    async def handle_raw(self, data: bytes):
+        """Decode a raw inbound message, as received from the source, and pass it to the callback."""
+        raise NotImplementedError
@@ -1,18 +1,22 @@
+import importlib
+
 from settings.listener_types import ListenerType
 
 from .listener_base import ListenerBase
-from .mqtt_listener import AsyncMqttListener
-from .udp_listener import AsyncUDPListener
-from .web_listener import AsyncWebListener
 
 
 class ListenerRepo:
+    # Module and class of every listener, imported on first use: each one pulls its own client library.
     repositories = {
-        ListenerType.UDP: AsyncUDPListener,
-        ListenerType.WEB: AsyncWebListener,
-        ListenerType.MQTT: AsyncMqttListener,
+        ListenerType.UDP: (".udp_listener", "AsyncUDPListener"),
+        ListenerType.WEB: (".web_listener", "AsyncWebListener"),
+        ListenerType.MQTT: (".mqtt_listener", "AsyncMqttListener"),
     }
 
     @classmethod
-    def get_listener(cls, listener_type: ListenerType):
-        return cls.repositories.get(listener_type, ListenerBase)
+    def get_listener(cls, listener_type: ListenerType) -> type[ListenerBase]:
+        entry = cls.repositories.get(listener_type)
+        if entry is None:
+            return ListenerBase
+        module_name, class_name = entry
+        return getattr(importlib.import_module(module_name, __package__), class_name)
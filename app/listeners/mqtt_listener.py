@@ -1,10 +1,14 @@
 import asyncio
 import logging
-import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 import aiomqtt
-from settings import Settings
-from utils import Utils
+from decoders.batch_decoder import decode_mqtt_batch
+from decoders.decoder_base import DecoderBase
+from decoders.decoder_repo import DecoderRepo
+from settings.listener_types import ListenerType
+from settings_provider import SettingsProvider
 
 from .listener_base import ListenerBase
 
@@ -13,32 +17,141 @@ logger = logging.getLogger(__name__)
 
 class AsyncMqttListener(ListenerBase):
     """
-    Asynchronous UDP Broadcast Packet Listener.
-    Listens for Horus UDP broadcast packets and passes them to a callback function.
+    Asynchronous MQTT Listener.
+    Subscribes to the SondeHub MQTT feed of every radiosonde and passes the payloads to a callback function,
+    decoded in the event loop or, with `workers`, in worker processes.
     """
 
-    def __init__(self, settings: Settings, callback=None):
+    source = ListenerType.MQTT
+
+    def __init__(self, settings_provider: SettingsProvider, callback=None):
         """
-        Initialize the UDP listener.
+        Initialize the MQTT listener.
         :param callback: Function to process received packets.
         """
-        super().__init__(settings, callback)
+        super().__init__(settings_provider, callback)
         self.task = None
+        self.decoder: DecoderBase = DecoderRepo.get_decoder(self.settings.mqtt_listener.decoder)
+
+        # Worker processes mode, see `_start_workers`
+        self._pool = None
+        self._batch = []
+        self._batch_timer = None
+        self._flush_tasks = set()  # Batches submitted by the timer, until they are queued
+        self._batches = None  # Futures of the submitted batches, in order
+        self._batch_slots = None  # Limits the batches in flight, so a slow pool holds back the message iterator
+        self._results_task = None
 
     async def _handle_packet(self, data):
         """
-        Handle an incoming UDP packet, parse it, and call the callback if valid.
-        :param data: Raw packet data.
+        Handle an incoming MQTT message, parse it, and call the callback if valid.
+        :param data: Raw message payload.
         """
         try:
-            data = json.loads(data.payload)
-
             # Parse JSON data
             if self.callback:
-                await self.callback(Utils.map_mqtt_json_to_radiosonde_payload(data))  # Run callback
+                await self.callback(self._decode(self.decoder.decode_mqtt, data))  # Run callback
         except Exception as e:
             logger.exception(e)
 
+    async def handle_raw(self, data: bytes):
+        await self._handle_packet(data)
+
+    def _start_workers(self, workers: int):
+        """
+        Decode the messages in `workers` processes: messages are sent in batches to a process pool,
+        which decodes them and drops the sondes far from home. Only the relevant payloads come back
+        to the event loop, where they are passed to the callback in the order they were received.
+        """
+        logger.info(f"Decoding MQTT messages in {workers} worker processes.")
+        self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        self._batches = asyncio.Queue()
+        self._batch_slots = asyncio.Semaphore(workers * 2)
+        self._results_task = asyncio.create_task(self._handle_batches())
+
+    async def _stop_workers(self):
+        if self._pool is None:
+            return
+        if self._batch_timer:
+            self._batch_timer.cancel()
+        tasks = [*self._flush_tasks, self._results_task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flush_tasks.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    async def _add_to_batch(self, data: bytes):
+        settings = self.settings.mqtt_listener
+        self._batch.append(data)
+        if len(self._batch) >= settings.batch_size:
+            await self._submit_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = asyncio.get_running_loop().call_later(
+                settings.batch_interval_seconds, self._flush_batch
+            )
+
+    def _flush_batch(self):
+        """Submit a batch that did not fill up in time."""
+        self._batch_timer = None
+        task = asyncio.create_task(self._submit_batch())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task):
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to submit a batch of MQTT messages", exc_info=task.exception())
+
+    async def _submit_batch(self):
+        await self._batch_slots.acquire()
+        if self._batch_timer:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+
+        batch, self._batch = self._batch, []
+        if not batch:
+            self._batch_slots.release()
+            return
+
+        settings = self.settings
+        self._packets_received.inc(len(batch))
+        future = asyncio.get_running_loop().run_in_executor(
+            self._pool,
+            decode_mqtt_batch,
+            batch,
+            settings.mqtt_listener.decoder,
+            tuple(
+                (zone.name, zone.listener_location.location_tuple, settings.relevance_km(zone))
+                for zone in settings.all_zones
+            ),
+        )
+        self._batches.put_nowait(future)
+
+    async def _handle_batches(self):
+        """Pass the payloads of the decoded batches to the callback, until cancelled."""
+        while True:
+            future = await self._batches.get()
+            try:
+                models, rejected, filtered = await future
+            except Exception as e:
+                logger.exception(f"Failed to decode a batch of MQTT messages", exc_info=e)
+                continue
+            finally:
+                self._batch_slots.release()
+
+            self._packets_parsed.inc(len(models) + filtered)
+            self._packets_rejected.inc(rejected)
+            self._packets_filtered.inc(filtered)
+            if not self.callback:
+                continue
+            for model in models:
+                try:
+                    await self.callback(model)
+                except Exception as e:
+                    logger.exception(e)
+
     async def listen(self):
         logger.debug(f"Listening for packets...")
         mqtt_client = aiomqtt.Client(
@@ -49,13 +162,21 @@ class AsyncMqttListener(ListenerBase):
         )
         interval = 5
 
+        workers = self.settings.mqtt_listener.workers
+        if workers:
+            self._start_workers(workers)
+            handle = self._add_to_batch
+        else:
+            handle = self._handle_packet
+
         try:
             while True:
                 try:
                     async with mqtt_client as client:
                         await client.subscribe("sondes/#")
                         async for message in client.messages:
-                            await self._handle_packet(message)
+                            self._capture(message.payload)
+                            await handle(message.payload)
                 except aiomqtt.MqttError:
                     logger.warning(f"Connection lost; Reconnecting in {interval} seconds ...")
                     await asyncio.sleep(interval)
@@ -64,4 +185,5 @@ class AsyncMqttListener(ListenerBase):
         except Exception as e:
             logger.exception(f"Unexpected error in listener", exc_info=e)
         finally:
+            await self._stop_workers()
             logger.info("Listener stopped.")
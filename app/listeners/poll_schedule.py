@@ -0,0 +1,52 @@
+import random
+
+
+class PollSchedule:
+    """
+    Interval until the next poll of an online source, adapted to the activity near the zones.
+
+    - while a sonde is descending near a zone, the source is polled every `fast_interval` seconds;
+    - otherwise the interval starts at `base_interval` and doubles after every quiet poll, up to
+      `max_interval`, so nothing is fetched every few seconds overnight;
+    - after a failed request the interval doubles in the same way, whatever the activity, so a source
+      that is down or rate limiting is not hammered.
+
+    Backed off intervals are spread by a random `jitter` fraction, so restarted instances don't poll in step.
+    """
+
+    def __init__(self, fast_interval: float, base_interval: float, max_interval: float, jitter: float = 0.1):
+        self.fast_interval = fast_interval
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval, base_interval)
+        self.jitter = jitter
+        self._quiet_polls = 0
+        self._failures = 0
+        self.interval = base_interval  # Current interval, in seconds
+        self.reason = "starting"  # Why the current interval was chosen
+
+    def _backoff(self, steps: int) -> float:
+        interval = min(self.base_interval * 2 ** min(steps, 32), self.max_interval)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def next(self, succeeded: bool, active: int) -> float:
+        """
+        Return the interval until the next poll.
+        :param succeeded: Whether the last request succeeded.
+        :param active: Number of sondes descending near a zone.
+        """
+        if not succeeded:
+            self._failures += 1
+            self.interval = self._backoff(self._failures)
+            self.reason = f"request failed {self._failures} time(s) in a row"
+            return self.interval
+
+        self._failures = 0
+        if active:
+            self._quiet_polls = 0
+            self.interval = self.fast_interval
+            self.reason = f"{active} radiosonde(s) descending nearby"
+        else:
+            self.interval = self._backoff(self._quiet_polls)
+            self._quiet_polls += 1
+            self.reason = "no radiosonde descending nearby"
+        return self.interval
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+
+from radiosonde_payload import RadiosondePayload
+from settings.listener_types import ListenerType
+from settings_provider import SettingsProvider
+
+logger = logging.getLogger(__name__)
+
+
+class _SondeSource:
+    __slots__ = ("frame", "source", "forwarded_at")
+
+    def __init__(self):
+        self.frame = -1
+        self.source = None
+        self.forwarded_at = 0.0
+
+
+class SourceMerger:
+    """
+    Merges the payloads of several listeners into one de-duplicated stream.
+
+    For every sonde only the freshest payload is forwarded:
+    - sources with frame numbers (UDP, MQTT) are forwarded a frame only if it is newer than the last
+      forwarded one, so whichever source delivers a frame first wins and the late copies are dropped;
+    - sources without frame numbers (WEB) only feed a sonde that has no fresher source, i.e. that has not
+      been forwarded anything from another source for `failover_after_seconds`.
+    Sources quiet for `failover_after_seconds` are reported as stalled; their sondes fail over to the
+    other sources automatically through the rules above.
+    """
+
+    def __init__(self, settings_provider: SettingsProvider, sources: list[ListenerType], frame_sources: set, callback):
+        """
+        :param sources: The merged sources.
+        :param frame_sources: Sources whose payloads carry real frame numbers.
+        :param callback: Coroutine function receiving the merged payloads.
+        """
+        self.settings_provider = settings_provider
+        self.callback = callback
+        self._frame_sources = frame_sources
+        self._sondes = {}
+        self._last_seen = {source: time.monotonic() for source in sources}
+        self._stalled = set()
+
+        self.forwarded = 0
+        self.duplicates = 0
+
+    @property
+    def _failover_after(self) -> float:
+        return self.settings_provider.settings.source_merge.failover_after_seconds
+
+    def callback_for(self, source: ListenerType):
+        """Return the callback to give to the listener of `source`."""
+        async def merge(model: RadiosondePayload):
+            await self.handle(source, model)
+
+        return merge
+
+    def _accept(self, source: ListenerType, model: RadiosondePayload, now: float) -> bool:
+        sonde = self._sondes.get(model.callsign)
+        if sonde is None:
+            sonde = self._sondes[model.callsign] = _SondeSource()
+
+        stale = now - sonde.forwarded_at > self._failover_after
+        if source in self._frame_sources:
+            # A restarted sonde, or a feed lost for a while, may legitimately go back in frame numbers.
+            accept = model.frame > sonde.frame or stale
+            if accept:
+                sonde.frame = model.frame
+        else:
+            accept = sonde.source == source or stale
+
+        if accept:
+            sonde.source = source
+            sonde.forwarded_at = now
+        return accept
+
+    async def handle(self, source: ListenerType, model: RadiosondePayload):
+        now = time.monotonic()
+        self._last_seen[source] = now
+        if source in self._stalled:
+            self._stalled.discard(source)
+            logger.info(f"Source {source} is receiving data again.")
+
+        if not self._accept(source, model, now):
+            self.duplicates += 1
+            return
+
+        self.forwarded += 1
+        await self.callback(model)
+
+    def forget(self, callsign: str):
+        """Drop the state of a radiosonde that is no longer tracked."""
+        self._sondes.pop(callsign, None)
+
+    async def monitor(self):
+        """Report sources that stall, until cancelled."""
+        while True:
+            await asyncio.sleep(self._failover_after / 2)
+            now = time.monotonic()
+            for source, last_seen in self._last_seen.items():
+                if source not in self._stalled and now - last_seen > self._failover_after:
+                    self._stalled.add(source)
+                    active = [other for other in self._last_seen if other not in self._stalled]
+                    logger.warning(
+                        f"Source {source} has been quiet for {now - last_seen:.0f} s, "
+                        f"failing over to: {', '.join(active) or 'none'}."
+                    )
@@ -2,8 +2,13 @@ import asyncio
 import json
 import logging
 
-from settings import Settings
+from decoders.decoder_base import DecoderBase
+from decoders.decoder_repo import DecoderRepo
+from settings.listener_types import ListenerType
+from settings.overflow_policy import OverflowPolicy
+from settings_provider import SettingsProvider
 
+from .ingest_queue import IngestQueue
 from .listener_base import ListenerBase
 
 logger = logging.getLogger(__name__)
@@ -13,55 +18,111 @@ class AsyncUDPListener(ListenerBase):
     """
     Asynchronous UDP Broadcast Packet Listener.
     Listens for Horus UDP broadcast packets and passes them to a callback function.
+
+    Received datagrams are pushed into a bounded queue drained by a configurable number of consumers,
+    so a burst of packets can never create unbounded tasks. The overflow policy decides which packets
+    are lost when the consumers fall behind.
     """
 
-    def __init__(self, settings: Settings, callback=None):
+    source = ListenerType.UDP
+
+    def __init__(self, settings_provider: SettingsProvider, callback=None):
         """
         Initialize the UDP listener.
         :param callback: Function to process received packets.
-        :param port: UDP port to listen on.
         """
-        super().__init__(settings, callback)
+        super().__init__(settings_provider, callback)
         self.udp_port = self.settings.udp_broadcast.listen_port
         self.running = False
+        self.queue: IngestQueue | None = None
+        self.decoder: DecoderBase = DecoderRepo.get_decoder(self.settings.udp_broadcast.decoder)
+        self._stop_event: asyncio.Event | None = None
 
-    async def _handle_packet(self, data, addr):
+    async def _handle_packet(self, data):
         """
         Handle an incoming UDP packet, parse it, and call the callback if valid.
-        :param data: Raw packet data.
-        :param addr: Address of the sender.
+        :param data: Raw packet data, or the already parsed packet.
         """
         try:
             # Parse JSON data
-            packet_dict = json.loads(data.decode())
-            if packet_dict.get("type") == "PAYLOAD_SUMMARY":
-                if self.callback:
-                    await self.callback(packet_dict)  # Run callback
+            if isinstance(data, dict):
+                model = self._decode(self.decoder.decode_udp_dict, data)
+            else:
+                model = self._decode(self.decoder.decode_udp, data)
+
+            if model is not None and self.callback:
+                await self.callback(model)  # Run callback
         except Exception as e:
             logger.exception(e)
 
+    async def handle_raw(self, data: bytes):
+        await self._handle_packet(data)
+
+    def _enqueue(self, data: bytes):
+        """Queue a received datagram according to the overflow policy."""
+        self._capture(data)
+        if self.queue.policy == OverflowPolicy.COALESCE:
+            # The callsign is needed to coalesce, so the packet is parsed once here instead of by the consumer.
+            try:
+                packet_dict = json.loads(data.decode())
+            except Exception as e:
+                logger.exception(e)
+                return
+            accepted = self.queue.put(packet_dict, packet_dict.get("callsign"))
+        else:
+            accepted = self.queue.put(data)
+
+        if not accepted and self.queue.dropped % 100 == 1:
+            logger.warning(
+                f"UDP ingest queue full ({self.queue.maxsize}), {self.queue.dropped} packets dropped so far."
+            )
+
+    async def _consume(self):
+        while True:
+            await self._handle_packet(await self.queue.get())
+
+    def stop(self):
+        """Stop listening."""
+        self.running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+
     async def listen(self):
         """
         Start listening for incoming UDP packets asynchronously.
         """
         logger.debug(f"Listening for UDP packets on port {self.udp_port}...")
+        settings = self.settings.udp_broadcast
         self.running = True
+        self._stop_event = asyncio.Event()
+        self.queue = IngestQueue(settings.queue_size, settings.overflow_policy, self.source.value)
+
+        consumers = [
+            asyncio.create_task(self._consume(), name=f"udp-consumer-{i}") for i in range(settings.consumers)
+        ]
 
         # Create the UDP server
         loop = asyncio.get_running_loop()
         transport, protocol = await loop.create_datagram_endpoint(
-            lambda: _UDPProtocol(self._handle_packet),
+            lambda: _UDPProtocol(self._enqueue),
             local_addr=("0.0.0.0", self.udp_port),
         )
 
         try:
-            while self.running:
-                await asyncio.sleep(0.1)  # Prevent busy looping
+            await self._stop_event.wait()
         except asyncio.CancelledError:
             pass
         finally:
             logger.debug("Closing socket connection")
             transport.close()
+            for consumer in consumers:
+                consumer.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+            self.running = False
+            logger.info(
+                f"UDP listener stopped. Dropped: {self.queue.dropped}, coalesced: {self.queue.coalesced}, "
+                f"queue high-water mark: {self.queue.high_water}/{self.queue.maxsize}."
+            )
 
 
 class _UDPProtocol(asyncio.DatagramProtocol):
@@ -72,10 +133,10 @@ class _UDPProtocol(asyncio.DatagramProtocol):
     def __init__(self, packet_handler):
         """
         Initialize the protocol.
-        :param packet_handler: Coroutine function to handle received packets.
+        :param packet_handler: Function queueing received packets.
         """
         self.packet_handler = packet_handler
 
     def datagram_received(self, data, addr):
         """Handle received UDP packets."""
-        asyncio.create_task(self.packet_handler(data, addr))
+        self.packet_handler(data)
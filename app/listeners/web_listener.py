@@ -1,72 +1,211 @@
 import asyncio
 import logging
-from datetime import datetime, UTC
+import time
 
 import aiohttp
-from settings import Settings
-from utils import Utils
+import metrics
+from decoders.decoder_base import DecoderBase
+from decoders.decoder_repo import DecoderRepo
+from decoders.field_mapping import web_fingerprint
+from settings.listener_types import ListenerType
+from settings_provider import SettingsProvider
 
+from .geojson_stream import FeatureStreamParser
 from .listener_base import ListenerBase
+from .poll_schedule import PollSchedule
 
 logger = logging.getLogger(__name__)
 
 
 class AsyncWebListener(ListenerBase):
     """
-    Asynchronous UDP Broadcast Packet Listener.
-    Listens for Horus UDP broadcast packets and passes them to a callback function.
+    Asynchronous radiosondy export listener.
+    Periodically fetches the GeoJSON export of live radiosondes and passes each sonde to a callback function.
+
+    A single pooled session is kept for the lifetime of the listener, so the TCP/TLS connection is reused
+    between polls. Requests are conditional (ETag / Last-Modified), an unchanged export costs a 304,
+    and the response body is parsed as a stream one feature at a time.
+
+    Most sondes of the export don't change between two polls. A fingerprint of every feature is kept from
+    the previous poll, and only new or changed features are decoded and passed to the callback. The export
+    has no frame numbers, changed features get the number of the poll instead: the second it started, bumped
+    if polls are faster, so it keeps growing across polls and restarts.
+
+    The export is polled fast while a sonde descends near a zone, less and less often when none does, and
+    less often after failed requests, see PollSchedule.
     """
 
-    def __init__(self, settings: Settings, callback=None):
+    source = ListenerType.WEB
+    # The synthetic frame numbers can't be compared with the real ones of the other sources.
+    provides_frame_numbers = False
+
+    def __init__(self, settings_provider: SettingsProvider, callback=None):
         """
-        Initialize the UDP listener.
+        Initialize the web listener.
         :param callback: Function to process received packets.
         """
-        super().__init__(settings, callback)
+        super().__init__(settings_provider, callback)
         self.running = False
+        self._session: aiohttp.ClientSession | None = None
+        self._etag = None
+        self._last_modified = None
+        self._fingerprints: dict[str, int] = {}  # callsign: fingerprint of the feature in the previous poll
+        self._fingerprints_settings = None
+        self._poll = 0
+        self._schedule = None
+        self._schedule_settings = None
+        self.decoder: DecoderBase = DecoderRepo.get_decoder(self.settings.web_listener.decoder)
 
-    async def _handle_packet(self, data):
+    def _start_poll(self) -> dict[str, int]:
+        """Number a new poll, returns the dict collecting its fingerprints."""
+        self._poll = max(self._poll + 1, int(time.time()))
+        if self.settings is not self._fingerprints_settings:
+            # The zones may have changed, every sonde has to be checked again.
+            self._fingerprints_settings = self.settings
+            self._fingerprints = {}
+        return {}
+
+    def _end_poll(self, fingerprints: dict[str, int], count: int, changed: int):
+        """Keep the fingerprints of the features in the export, dropping the sondes that left it."""
+        self._fingerprints = fingerprints
+        logger.debug(
+            f"Processed {count} radiosondes from online source: {changed} new or changed, "
+            f"{count - changed} unchanged skipped."
+        )
+
+    async def _handle_packet(self, data, fingerprints: dict[str, int]) -> bool:
         """
-        Handle an incoming UDP packet, parse it, and call the callback if valid.
-        :param data: Raw packet data.
+        Handle a single feature of the export, parse it, and call the callback if valid.
+        :param data: GeoJSON feature.
+        :param fingerprints: Fingerprints of the current poll, the one of the feature is added.
+        :return: Whether the feature is new or changed since the previous poll.
         """
         try:
-            # Parse JSON data
+            callsign = data["properties"].get("id", "")
+            fingerprint = web_fingerprint(data)
+            fingerprints[callsign] = fingerprint
+            if self._fingerprints.get(callsign) == fingerprint:
+                return False
+
+            model = self._decode(self.decoder.decode_web, data)
+            if model is not None:
+                model.frame = self._poll
             if self.callback:
-                for i in list(map(Utils.map_web_json_to_radiosonde_payload, data["features"])):
-                    await self.callback(i)  # Run callback
+                await self.callback(model)  # Run callback
         except Exception as e:
             logger.exception(e)
+        return True
+
+    async def handle_raw(self, data: bytes):
+        """Handle a whole export body."""
+        parser = FeatureStreamParser()
+        fingerprints = self._start_poll()
+        count = changed = 0
+        for feature in parser.feed(data) + parser.close():
+            changed += await self._handle_packet(feature, fingerprints)
+            count += 1
+        self._end_poll(fingerprints, count, changed)
 
-    async def _make_request(self):
-        url = f"https://s1.radiosondy.info/export/export_map.php?live_map=1&_={int(datetime.now(UTC).timestamp() * 1000)}"
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=2, keepalive_timeout=60, ttl_dns_cache=300)
 
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    logger.error(
-                        f"Failed to fetch data from online source. Status code: {response.status}"
-                    )
-                    return
+        # aiohttp advertises and transparently decodes gzip/deflate (and br, with Brotli installed).
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=60, sock_connect=10),
+        )
+
+    def _get_schedule(self) -> PollSchedule:
+        """Return the poll schedule for the current settings, rebuilding it after a settings reload."""
+        settings = self.settings
+        if settings is not self._schedule_settings:
+            web_listener = settings.web_listener
+            self._schedule = PollSchedule(
+                web_listener.fast_poll_interval_seconds,
+                web_listener.poll_interval_seconds,
+                web_listener.max_poll_interval_seconds,
+                web_listener.poll_jitter,
+            )
+            self._schedule_settings = settings
+        return self._schedule
+
+    def _next_interval(self, succeeded: bool) -> float:
+        """Return the interval until the next poll, logging why it changed."""
+        schedule = self._get_schedule()
+        reason = schedule.reason
+        active = self.activity() if self.activity else 0
+        interval = schedule.next(succeeded, active)
+        metrics.WEB_POLL_INTERVAL.set(interval)
+        if schedule.reason != reason:
+            logger.info(f"Polling the online source every {interval:.0f} s: {schedule.reason}.")
+        return interval
+
+    async def _make_request(self) -> bool:
+        """Poll the export once, returns whether the request succeeded."""
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        async with self._session.get(self.settings.web_listener.url, headers=headers) as response:
+            if response.status == 304:
+                logger.debug("Online source not modified since the last poll.")
+                return True
+
+            if response.status != 200:
+                logger.error(
+                    f"Failed to fetch data from online source. Status code: {response.status}"
+                )
+                return False
+
+            parser = FeatureStreamParser()
+            fingerprints = self._start_poll()
+            captured = [] if self.capture is not None else None
+            count = changed = 0
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                if captured is not None:
+                    captured.append(chunk)
+                for feature in parser.feed(chunk):
+                    changed += await self._handle_packet(feature, fingerprints)
+                    count += 1
+            for feature in parser.close():
+                changed += await self._handle_packet(feature, fingerprints)
+                count += 1
+
+            if captured is not None:
+                self._capture(b"".join(captured))
 
-                await self._handle_packet(await response.json())
+            # Only remember the validators once the whole export has been processed.
+            self._etag = response.headers.get("ETag")
+            self._last_modified = response.headers.get("Last-Modified")
+            self._end_poll(fingerprints, count, changed)
+            return True
 
     async def listen(self):
         logger.debug(f"Listening for packets...")
         self.running = True
+        self._session = self._create_session()
 
         try:
             while self.running:
-                await self._make_request()
-                await asyncio.sleep(10)  # Prevent busy looping
+                try:
+                    succeeded = await self._make_request()
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    logger.error(f"Failed to fetch data from online source: {e!r}")
+                    succeeded = False
+                await asyncio.sleep(self._next_interval(succeeded))
         except asyncio.CancelledError:
             logger.info("Listener task cancelled.")
         except Exception as e:
             logger.exception(f"Unexpected error in listener", exc_info=e)
         finally:
             self.running = False
+            await self._session.close()
+            self._session = None
             logger.info("Listener stopped.")
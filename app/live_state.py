@@ -0,0 +1,238 @@
+import asyncio
+import json
+import logging
+
+from aiohttp import web
+
+from sonde_tracker import SondeRecord, SondeTracker
+from zone_index import ZoneIndex
+
+logger = logging.getLogger(__name__)
+
+_ALL = None  # Subscription and snapshot key of the unfiltered view
+
+
+class LiveState:
+    """
+    GeoJSON view of the tracked radiosondes, kept up to date incrementally.
+
+    The ingest path does no work for it: the tracker records which callsigns changed, and every
+    `update_interval` seconds only those sondes are encoded again. Each sonde is kept as an encoded GeoJSON
+    feature with the zones it is in, so a snapshot is a join of strings, built once per update and per
+    zone however many clients ask for it. The changes are encoded once per subscribed zone and pushed to
+    every subscriber queue, a client too slow to keep up is disconnected rather than buffered for.
+    """
+
+    CHANGES = "live_state"  # Name of the live state as a consumer of the tracker changes
+
+    def __init__(self, tracker: SondeTracker, get_zone_index, update_interval: float = 1.0, queue_size: int = 32):
+        """
+        :param get_zone_index: Function returning the current ZoneIndex.
+        :param queue_size: Updates buffered for a subscriber before it is disconnected.
+        """
+        self.tracker = tracker
+        self.get_zone_index = get_zone_index
+        self.update_interval = update_interval
+        self.queue_size = queue_size
+        self.version = 0
+        self._features = {}  # Callsign: (encoded feature, names of the zones it is in)
+        self._snapshots = {}  # Zone or _ALL: encoded FeatureCollection of the current version
+        self._subscribers = {}  # Zone or _ALL: set of subscriber queues
+
+        tracker.track_changes(self.CHANGES)
+        for callsign in tracker.callsigns():
+            self._features[callsign] = self._encode(callsign, tracker.get(callsign), get_zone_index())
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    @staticmethod
+    def _encode(callsign: str, sonde: SondeRecord, zone_index: ZoneIndex) -> tuple[str, frozenset]:
+        zones = frozenset(zone_index.match_location(sonde.location_tuple))
+        properties = {
+            "callsign": callsign,
+            "model": sonde.model,
+            "freq": sonde.freq,
+            "altitude": sonde.altitude,
+            "vel_v": sonde.vel_v,
+            "vel_h": sonde.vel_h,
+            "heading": sonde.heading,
+            "frame": sonde.frame,
+            "batt": sonde.batt,
+            "last_update": sonde.last_update.isoformat(),
+            "zones": sorted(zones),
+            "notified": sorted(sonde.notify),
+        }
+        if sonde.is_descending:
+            prediction = sonde.track.predict()
+            if prediction is not None:
+                properties["predicted_landing"] = {
+                    "latitude": prediction.latitude,
+                    "longitude": prediction.longitude,
+                    "eta_seconds": round(prediction.eta_seconds),
+                }
+        feature = {
+            "type": "Feature",
+            "id": callsign,
+            "geometry": {"type": "Point", "coordinates": [sonde.longitude, sonde.latitude, sonde.altitude]},
+            "properties": properties,
+        }
+        return json.dumps(feature, separators=(",", ":")), zones
+
+    @staticmethod
+    def _collection(features: list[str], removed: list[str] | None = None) -> str:
+        collection = '{"type":"FeatureCollection","features":[' + ",".join(features) + "]"
+        if removed is not None:
+            collection += ',"removed":' + json.dumps(removed)
+        return collection + "}"
+
+    def snapshot(self, zone: str | None = _ALL) -> str:
+        """The tracked sondes as a GeoJSON FeatureCollection, only those within `zone` if given."""
+        snapshot = self._snapshots.get(zone)
+        if snapshot is None:
+            snapshot = self._snapshots[zone] = self._collection([
+                feature for feature, zones in self._features.values() if zone is _ALL or zone in zones
+            ])
+        return snapshot
+
+    def update(self):
+        """Encode the sondes changed since the last update and push the changes to the subscribers."""
+        changed = self.tracker.take_changes(self.CHANGES)
+        if not changed:
+            return
+
+        zone_index = self.get_zone_index()
+        updates = []  # (callsign, previous (feature, zones) or None, current (feature, zones) or None)
+        for callsign in changed:
+            previous = self._features.pop(callsign, None)
+            sonde = self.tracker.get(callsign)
+            current = None
+            if sonde is not None:
+                current = self._features[callsign] = self._encode(callsign, sonde, zone_index)
+            updates.append((callsign, previous, current))
+
+        self.version += 1
+        self._snapshots.clear()
+        for zone, queues in list(self._subscribers.items()):
+            message = self._changes(updates, zone)
+            if message is None:
+                continue
+            for subscriber in list(queues):
+                try:
+                    subscriber.put_nowait(message)
+                except asyncio.QueueFull:
+                    logger.warning("Live state subscriber too slow, disconnecting it.")
+                    self.unsubscribe(subscriber, zone)
+                    subscriber.put_nowait(None)  # Room was made for the end of stream marker by clearing it
+
+    def _changes(self, updates: list[tuple], zone: str | None) -> str | None:
+        """The changes seen from `zone`, a sonde leaving it is removed for its subscribers."""
+        features = []
+        removed = []
+        for callsign, previous, current in updates:
+            if current is not None and (zone is _ALL or zone in current[1]):
+                features.append(current[0])
+            elif previous is not None and (zone is _ALL or zone in previous[1]):
+                removed.append(callsign)
+        if not features and not removed:
+            return None
+        return self._collection(features, removed)
+
+    def subscribe(self, zone: str | None = _ALL) -> asyncio.Queue:
+        """Return a queue receiving the encoded changes, and None when the subscriber is disconnected."""
+        subscriber = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(zone, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: asyncio.Queue, zone: str | None = _ALL):
+        queues = self._subscribers.get(zone)
+        if queues is not None:
+            queues.discard(subscriber)
+            if not queues:
+                del self._subscribers[zone]
+        while not subscriber.empty():
+            subscriber.get_nowait()
+
+    def close(self):
+        """Disconnect every subscriber."""
+        for zone, queues in list(self._subscribers.items()):
+            for subscriber in list(queues):
+                self.unsubscribe(subscriber, zone)
+                subscriber.put_nowait(None)
+
+    async def run(self):
+        """Update periodically until cancelled."""
+        while True:
+            await asyncio.sleep(self.update_interval)
+            self.update()
+
+
+class LiveStateServer:
+    """
+    Serves the live state:
+    - `GET /sondes`: GeoJSON FeatureCollection of the tracked sondes, with an ETag;
+    - `GET /events`: Server-Sent Events, a `snapshot` event, then an `update` event with the changed features
+      and the `removed` callsigns after every change.
+    Both accept `?zone=name` to only see the sondes within a zone.
+    """
+
+    def __init__(self, live_state: LiveState, zones, host: str, port: int):
+        """
+        :param zones: Function returning the names of the configured zones.
+        """
+        self.live_state = live_state
+        self.zones = zones
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    def _zone(self, request: web.Request) -> str | None:
+        zone = request.query.get("zone")
+        if zone is not None and zone not in self.zones():
+            raise web.HTTPNotFound(text=f"Unknown zone: {zone}")
+        return zone
+
+    async def _handle_sondes(self, request: web.Request):
+        zone = self._zone(request)
+        etag = f'"{self.live_state.version}-{zone or ""}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Access-Control-Allow-Origin": "*"}
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(text=self.live_state.snapshot(zone), content_type="application/geo+json", headers=headers)
+
+    async def _handle_events(self, request: web.Request):
+        zone = self._zone(request)
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Access-Control-Allow-Origin": "*",
+        })
+        await response.prepare(request)
+
+        # Subscribed before the snapshot is taken, so no change falls in between.
+        subscriber = self.live_state.subscribe(zone)
+        try:
+            await response.write(f"event: snapshot\ndata: {self.live_state.snapshot(zone)}\n\n".encode())
+            while (message := await subscriber.get()) is not None:
+                await response.write(f"event: update\ndata: {message}\n\n".encode())
+        except ConnectionResetError:
+            pass  # Client gone
+        finally:
+            self.live_state.unsubscribe(subscriber, zone)
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/sondes", self._handle_sondes)
+        app.router.add_get("/events", self._handle_events)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Live state available on http://{self.host}:{self.port}/sondes")
+
+    async def stop(self):
+        if self._runner is not None:
+            self.live_state.close()
+            await self._runner.cleanup()
+            self._runner = None
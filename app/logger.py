@@ -1,15 +1,103 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import time
+from datetime import datetime, UTC
 from logging import config
+from logging.handlers import QueueHandler, QueueListener
 from os import makedirs
 from os.path import exists
 from pathlib import Path
 
+import metrics
+from settings.log_output import LogFormat, LogOutput
 
-def configure_logger(base_path: Path):
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limit of the messages logged from each line of code.
+
+    Every call site may log `burst` messages per `interval` seconds. Beyond that, only one message out of
+    `sample_every` is kept, so a burst of identical warnings or tracebacks stays visible without flooding
+    the log. The next message kept reports how many were suppressed. Errors are limited too: a stream of
+    malformed packets must not turn into a stream of tracebacks.
+    """
+
+    def __init__(self, burst: int, interval: float, sample_every: int):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sample_every = sample_every
+        self._sites = {}  # (pathname, lineno): [window start, messages in the window, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        site = self._sites.get(key)
+        if site is None or now - site[0] >= self.interval:
+            suppressed = site[2] if site is not None else 0
+            site = self._sites[key] = [now, 0, 0]
+            if suppressed:
+                record.suppressed = suppressed
+        site[1] += 1
+
+        if site[1] > self.burst and (site[1] - self.burst) % self.sample_every:
+            site[2] += 1
+            metrics.LOG_MESSAGES_SUPPRESSED.inc()
+            return False
+
+        if site[2]:
+            record.suppressed = site[2]
+            site[2] = 0
+        return True
+
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    """
+    Queue handler leaving the formatting, tracebacks included, to the listener thread.
+    The calling thread only merges the message arguments, so the record can't change once queued.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": f"{record.filename}:{record.lineno}",
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logger(base_path: Path, settings: LogOutput | None = None):
+    """
+    Log to the console and to a daily rotated file. Records are queued by the threads that log and written
+    by a background thread, so a slow console or disk never blocks the event loop.
+    """
+    settings = settings or LogOutput()
     base_path = base_path.parent
     if not exists(base_path / "data/logs/"):
         makedirs(base_path / "data/logs/")
 
+    json_format = settings.format == LogFormat.JSON
+
     # Logging configuration dictionary
     LOGGING_CONFIG = {
         "version": 1,
@@ -21,17 +109,20 @@ def configure_logger(base_path: Path):
             "detailed": {
                 "format": "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s",
             },
+            "json": {
+                "()": JsonFormatter,
+            },
         },
         "handlers": {
             "console": {
                 "class": "logging.StreamHandler",
                 "level": "DEBUG",
-                "formatter": "default",
+                "formatter": "json" if json_format else "default",
             },
             "file": {
                 "class": "logging.handlers.TimedRotatingFileHandler",
                 "level": "DEBUG",
-                "formatter": "detailed",
+                "formatter": "json" if json_format else "detailed",
                 "filename": base_path / "data/logs/radiosonde_auto_rx_notifier.log",
                 "when": "midnight",
                 "interval": 1,
@@ -47,3 +138,17 @@ def configure_logger(base_path: Path):
 
     # Apply logging configuration
     logging.config.dictConfig(LOGGING_CONFIG)
+
+    # Move the configured handlers behind a queue, served by a background thread.
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue = queue.SimpleQueue()
+    queue_handler = _DeferredFormatQueueHandler(log_queue)
+    queue_handler.addFilter(
+        RateLimitFilter(settings.rate_limit_burst, settings.rate_limit_interval_seconds, settings.sample_every)
+    )
+    root.handlers = [queue_handler]
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Writes the records still queued at exit
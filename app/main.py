@@ -3,10 +3,11 @@ from pathlib import Path
 
 from logger import configure_logger
 from radiosonde_auto_rx_listener import AsyncRadiosondeAutoRxListener
+from settings_provider import settings_provider
 
 if __name__ == "__main__":
     base_path = Path(__file__).parent
-    configure_logger(base_path)
+    configure_logger(base_path, settings_provider.settings.logging)
 
     listener = AsyncRadiosondeAutoRxListener()
     asyncio.run(listener.start())
@@ -0,0 +1,244 @@
+import asyncio
+import bisect
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children = {}
+        REGISTRY.register(self)
+
+    def labels(self, *values):
+        """Return the child for the given label values, keep a reference to it on hot paths."""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for values, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {child.value}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function):
+        """Get the value of this (unlabelled) gauge by calling `function` at scrape time."""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            yield f"{self.name} {self._function()}"
+            return
+        yield from super()._samples()
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = _DEFAULT_BUCKETS):
+        self.buckets = buckets
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(child.buckets, child.counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {child.count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, values)} {child.sum}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, values)} {child.count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# Listeners
+PACKETS_RECEIVED = Counter("radiosonde_packets_received_total", "Raw messages received", ("listener",))
+PACKETS_PARSED = Counter("radiosonde_packets_parsed_total", "Messages decoded into a payload", ("listener",))
+PACKETS_REJECTED = Counter(
+    "radiosonde_packets_rejected_total", "Messages that failed to decode or are not payloads", ("listener",)
+)
+PACKETS_FILTERED = Counter(
+    "radiosonde_packets_filtered_total", "Payloads dropped by the worker processes, far from home", ("listener",)
+)
+DECODE_SECONDS = Histogram("radiosonde_decode_seconds", "Time spent decoding a message", ("listener",))
+INGEST_DROPPED = Counter("radiosonde_ingest_dropped_total", "Packets dropped from a full ingest queue", ("listener",))
+INGEST_COALESCED = Counter(
+    "radiosonde_ingest_coalesced_total", "Queued packets replaced by a newer one of the same callsign", ("listener",)
+)
+INGEST_HIGH_WATER = Gauge(
+    "radiosonde_ingest_queue_high_water", "Most packets waiting in the ingest queue since it started", ("listener",)
+)
+WEB_POLL_INTERVAL = Gauge("radiosonde_web_poll_interval_seconds", "Current interval between two polls of the web export")
+
+# Tracking
+TRACKED_SONDES = Gauge("radiosonde_tracked_sondes", "Radiosondes currently tracked near a zone")
+SEEN_SONDES = Gauge("radiosonde_seen_sondes", "Radiosondes only seen far from every zone, until they expire")
+TRACKER_BYTES = Gauge("radiosonde_tracker_bytes", "Estimated memory held by the tracked radiosondes")
+TRACKER_BYTES_PER_SONDE = Gauge(
+    "radiosonde_tracker_bytes_per_sonde", "Estimated memory held per tracked radiosonde, records and seen entries"
+)
+GEOFENCE_HITS = Counter("radiosonde_geofence_hits_total", "Payloads within the notification distance")
+RULE_MATCHES = Counter("radiosonde_rule_matches_total", "Alert rules notified, once per radiosonde", ("rule",))
+PURGE_CYCLE_SECONDS = Histogram(
+    "radiosonde_purge_cycle_seconds", "Time spent handling due landing timeouts and purges"
+)
+
+# Notifications
+NOTIFICATION_QUEUE_DEPTH = Gauge("radiosonde_notification_queue_depth", "Notifications waiting to be sent")
+NOTIFICATIONS_DROPPED = Counter(
+    "radiosonde_notifications_dropped_total", "Notifications dropped before delivery", ("reason",)
+)
+NOTIFICATIONS = Counter("radiosonde_notifications_total", "Notification delivery attempts", ("service", "result"))
+NOTIFICATION_SEND_SECONDS = Histogram(
+    "radiosonde_notification_send_seconds", "Time spent delivering a notification", ("service",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+# Logging
+LOG_MESSAGES_SUPPRESSED = Counter(
+    "radiosonde_log_messages_suppressed_total", "Log messages dropped by the per-line rate limit"
+)
+
+# Event loop
+EVENT_LOOP_LAG = Histogram(
+    "radiosonde_event_loop_lag_seconds", "Delay of the event loop in running a scheduled callback",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+async def monitor_event_loop_lag(interval: float):
+    """Measure, every `interval` seconds, how late the event loop wakes up a sleeping task."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(time.perf_counter() - started - interval, 0.0))
+
+
+class MetricsServer:
+    """Serves the metrics on `GET /metrics`, in the Prometheus text format."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def _handle_metrics(self, request):
+        from aiohttp import web
+        return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    async def start(self):
+        from aiohttp import web  # Only imported when the metrics are served
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Metrics available on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
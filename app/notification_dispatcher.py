@@ -0,0 +1,308 @@
+import asyncio
+import importlib
+import logging
+import time
+from collections import deque
+
+import metrics
+from settings.notifications import Notification, Notifications
+from settings_provider import SettingsProvider, settings_provider
+
+logger = logging.getLogger(__name__)
+
+
+class _TokenBucket:
+    """Allows `burst` notifications at once, then `rate` notifications per second on average."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token, returns how many seconds to wait before it may be used."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _Service:
+    """A notification service with its long-lived Apprise instance, concurrency limit and rate limit."""
+
+    def __init__(self, settings: Notification):
+        self.url = settings.url
+        self.name = self.url.split("://", 1)[0]  # Only the scheme, the rest of the URL may contain credentials
+        import apprise  # Loads every Apprise plugin, imported once a service is enabled, see `start`
+        self.notifier = apprise.Apprise()
+        self.valid = self.notifier.add(self.url)
+        self.semaphore = asyncio.Semaphore(settings.max_concurrency)
+        self.waiting = deque()  # Jobs taken by a worker while the service was at its concurrency limit
+        self.bucket = None
+        if settings.rate_per_minute is not None:
+            self.bucket = _TokenBucket(settings.rate_per_minute / 60, settings.burst)
+        self.send_seconds = metrics.NOTIFICATION_SEND_SECONDS.labels(self.name)
+
+
+class _Job:
+    def __init__(self, service: _Service, title: str, body: str):
+        self.service = service
+        self.title = title
+        self.body = body
+        self.attempt = 0
+
+
+class NotificationDispatcher:
+    """
+    Sends notifications from a bounded queue served by a fixed set of workers.
+
+    One Apprise instance is built per enabled service and reused until the notification settings change.
+    Every notification is queued once per service, so each service has its own concurrency limit,
+    timeout, token-bucket rate limit and exponential-backoff retries. A worker never waits for a service
+    at its concurrency limit: the job is parked on the service and queued again as soon as one of its
+    deliveries ends, so a slow service can't hold the workers the other services need. Notifications submitted within
+    `coalesce_seconds` of each other for the same services are merged into one digest. Submitting never
+    blocks: when the queue is full the notification is dropped and logged.
+    """
+
+    def __init__(self, provider: SettingsProvider = settings_provider):
+        self._settings_provider = provider
+        self._queue: asyncio.Queue | None = None
+        self._workers = []
+        self._preload = None  # Import of Apprise in progress
+        self._retry_handles = set()  # Delayed jobs: retries and rate-limited notifications
+        self._pending = {}  # Notifications being coalesced, by target services
+        self._pending_handles = {}
+        self._services = {}  # Built services by URL
+        self._services_settings: Notifications | None = None
+
+        self.dry_run = False  # Count notifications without sending them, for replays and benchmarks
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0  # Notifications merged into a digest
+        self.rate_limited = 0  # Notifications delayed by a rate limit
+
+    @property
+    def _settings(self) -> Notifications:
+        return self._settings_provider.settings.notifications
+
+    @property
+    def queue_depth(self) -> int:
+        if self._queue is None:
+            return 0
+        return self._queue.qsize() + sum(len(service.waiting) for service in self._services.values())
+
+    def _get_services(self, services: list[Notification] | None = None) -> list[_Service]:
+        """
+        Return the built services for `services`, by default the services of the notifications section.
+        Services are built once per URL, shared by the zones using them, and rebuilt after a settings reload.
+        """
+        settings = self._settings
+        if settings is not self._services_settings:
+            self._services = {}
+            self._services_settings = settings
+
+        built_services = []
+        for service in settings.services if services is None else services:
+            if not service.enabled:
+                continue
+
+            built = self._services.get(service.url)
+            if built is None:
+                built = self._services[service.url] = _Service(service)
+                if not built.valid:
+                    logger.warning(f"Ignoring invalid notification service URL ({built.name}).")
+            if built.valid:
+                built_services.append(built)
+        return built_services
+
+    def start(self):
+        """Start the workers. Must be called from a running event loop."""
+        if self._queue is not None:
+            return
+
+        settings = self._settings
+        self._queue = asyncio.Queue(maxsize=settings.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"notification-worker-{i}") for i in range(settings.workers)
+        ]
+        logger.info(f"Notification dispatcher started with {settings.workers} workers.")
+
+        zones = self._settings_provider.settings.zones
+        if any(service.enabled for service in [*settings.services, *(s for zone in zones for s in zone.services)]):
+            # Import Apprise on a worker thread now, rather than on the event loop with the first notification.
+            self._preload = asyncio.create_task(asyncio.to_thread(importlib.import_module, "apprise"))
+
+    async def stop(self):
+        """Stop the workers, discarding pending notifications."""
+        for handle in [*self._retry_handles, *self._pending_handles.values()]:
+            handle.cancel()
+        self._retry_handles.clear()
+        self._pending_handles.clear()
+        if self._pending:
+            logger.warning(f"Discarding {sum(len(p[1]) for p in self._pending.values())} coalescing notifications.")
+            self._pending.clear()
+        waiting = sum(len(service.waiting) for service in self._services.values())
+        if waiting:
+            logger.warning(f"Discarding {waiting} notifications waiting for a busy service.")
+            for service in self._services.values():
+                service.waiting.clear()
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._preload is not None:
+            await asyncio.gather(self._preload, return_exceptions=True)
+            self._preload = None
+
+        if self._queue is not None and not self._queue.empty():
+            logger.warning(f"Discarding {self._queue.qsize()} pending notifications.")
+
+        self._workers = []
+        self._queue = None
+        logger.info("Notification dispatcher stopped.")
+
+    def submit(self, title: str, body: str, services: list[Notification] | None = None):
+        """Queue a notification for every enabled service of `services`, by default the global services."""
+        self.submitted += 1
+        if self.dry_run:
+            return
+
+        if self._queue is None:
+            logger.warning(f"Notification dispatcher not running, dropping notification: {title}")
+            self.dropped += 1
+            metrics.NOTIFICATIONS_DROPPED.labels("stopped").inc()
+            return
+
+        window = self._settings.coalesce_seconds
+        if window <= 0:
+            self._dispatch_all(services, title, body)
+            return
+
+        key = None if services is None else tuple(service.url for service in services)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = (services, [])
+            self._pending_handles[key] = asyncio.get_running_loop().call_later(window, self._flush_pending, key)
+        pending[1].append((title, body))
+
+    def _flush_pending(self, key):
+        """Send the notifications coalesced for `key`, as a digest if there are several."""
+        self._pending_handles.pop(key, None)
+        services, notifications = self._pending.pop(key)
+        if len(notifications) == 1:
+            title, body = notifications[0]
+        else:
+            self.coalesced += len(notifications) - 1
+            title = f"🚨 {len(notifications)} Radiosonde Notifications 🚨"
+            body = "\n\n---\n\n".join(f"**{title}**\n{body.strip()}" for title, body in notifications)
+        self._dispatch_all(services, title, body)
+
+    def _dispatch_all(self, services: list[Notification] | None, title: str, body: str):
+        for service in self._get_services(services):
+            self._dispatch(_Job(service, title, body))
+
+    def _dispatch(self, job: _Job):
+        """Queue a job now, or once its service's rate limit allows it."""
+        delay = job.service.bucket.reserve() if job.service.bucket else 0.0
+        if delay <= 0:
+            self._enqueue(job)
+            return
+
+        self.rate_limited += 1
+        logger.info(f"Rate limit of {job.service.name} reached, delaying a notification by {delay:.1f} s.")
+        self._enqueue_later(job, delay)
+
+    def _enqueue(self, job: _Job):
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            metrics.NOTIFICATIONS_DROPPED.labels("queue_full").inc()
+            logger.warning(f"Notification queue full, dropping notification for {job.service.name}.")
+
+    def _enqueue_later(self, job: _Job, delay: float):
+        def enqueue():
+            self._retry_handles.discard(handle)
+            if self._queue is not None:
+                self._enqueue(job)
+
+        handle = asyncio.get_running_loop().call_later(delay, enqueue)
+        self._retry_handles.add(handle)
+
+    def _schedule_retry(self, job: _Job):
+        settings = self._settings
+        delay = settings.retry_backoff_seconds * 2 ** (job.attempt - 1)
+        if job.service.bucket:
+            delay = max(delay, job.service.bucket.reserve())
+        logger.info(
+            f"Retrying notification to {job.service.name} in {delay:.1f} s "
+            f"(attempt {job.attempt + 1}/{settings.max_retries + 1})."
+        )
+        self._enqueue_later(job, delay)
+
+    async def _send(self, job: _Job) -> bool:
+        service = job.service
+        try:
+            async with service.semaphore:
+                return await asyncio.wait_for(
+                    service.notifier.async_notify(body=job.body, title=job.title),
+                    timeout=self._settings.timeout_seconds,
+                )
+        finally:
+            if service.waiting:
+                self._enqueue(service.waiting.popleft())  # A slot of the service is free again
+
+    def _park(self, job: _Job):
+        """Set aside a job of a service at its concurrency limit, until one of its deliveries ends."""
+        service = job.service
+        if len(service.waiting) >= self._settings.queue_size:
+            self.dropped += 1
+            metrics.NOTIFICATIONS_DROPPED.labels("service_busy").inc()
+            logger.warning(f"Too many notifications waiting for {service.name}, dropping one.")
+            return
+        service.waiting.append(job)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job.service.semaphore.locked():
+                self._queue.task_done()
+                self._park(job)
+                continue
+
+            job.attempt += 1
+            started = time.perf_counter()
+            try:
+                delivered = await self._send(job)
+                result = "sent" if delivered else "failed"
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.warning(f"Notification delivery to {job.service.name} timed out.")
+                delivered = False
+                result = "timeout"
+            except Exception as e:
+                logger.exception(e)
+                delivered = False
+                result = "error"
+            finally:
+                self._queue.task_done()
+
+            job.service.send_seconds.observe(time.perf_counter() - started)
+            metrics.NOTIFICATIONS.labels(job.service.name, result).inc()
+
+            if delivered:
+                self.sent += 1
+            elif job.attempt <= self._settings.max_retries:
+                self._schedule_retry(job)
+            else:
+                self.failed += 1
+                logger.error(f"Notification delivery to {job.service.name} failed after {job.attempt} attempts.")
+
+
+notification_dispatcher = NotificationDispatcher()
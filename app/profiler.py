@@ -0,0 +1,108 @@
+import asyncio
+import io
+import logging
+import signal
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_TOP_FUNCTIONS = 60  # Functions listed in the text summary of a profile
+
+
+def dump_tasks(stream):
+    """Write every pending asyncio task of the running loop, with the stack of coroutines it is suspended in."""
+    tasks = sorted(asyncio.all_tasks(), key=lambda task: task.get_name())
+    stream.write(f"{len(tasks)} pending tasks\n")
+    for task in tasks:
+        coroutine = task.get_coro()
+        stream.write(f"\n--- {task.get_name()}: {getattr(coroutine, '__qualname__', coroutine)}\n")
+        task.print_stack(file=stream)
+
+
+class Profiler:
+    """
+    Time-bounded CPU profile of the event loop thread, with a dump of the asyncio tasks.
+
+    Nothing is profiled until `start` is called, by the listener at startup or by a SIGUSR1 signal, so it
+    costs nothing otherwise. A profile runs for `duration` seconds, a second signal stops it early. Each
+    capture writes to `directory`:
+    - `<time>-tasks.txt`: the pending tasks and where each one is suspended, when the profile starts;
+    - `<time>.pstats`: the profile, for `python -m pstats` or a viewer such as snakeviz;
+    - `<time>.txt`: the functions taking the most time, cumulative and own.
+    """
+
+    def __init__(self, directory: Path, duration: float = 30.0):
+        self.directory = directory
+        self.duration = duration
+        self._profile = None
+        self._name = None
+        self._stop_handle = None
+        self._signal_installed = False
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def install_signal_handler(self):
+        """Toggle profiling on SIGUSR1. Must be called from the running event loop."""
+        if not hasattr(signal, "SIGUSR1"):
+            logger.warning("Profiling on signal is not supported on this platform.")
+            return
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.toggle)
+        self._signal_installed = True
+        logger.info("Send SIGUSR1 to capture a profile.")
+
+    def remove_signal_handler(self):
+        if self._signal_installed:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR1)
+            self._signal_installed = False
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self):
+        """Dump the tasks and start profiling, for `duration` seconds. Must be called from the running event loop."""
+        if self.running:
+            return
+        self._name = datetime.now().strftime("%Y%m%d-%H%M%S")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / f"{self._name}-tasks.txt", "w", encoding="utf-8") as tasks_file:
+                dump_tasks(tasks_file)
+        except OSError as e:
+            logger.error(f"Could not write the task dump: {e}")
+            return
+
+        import cProfile  # Only imported when profiling
+
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self._stop_handle = asyncio.get_running_loop().call_later(self.duration, self.stop)
+        logger.info(f"Profiling for {self.duration:g} seconds into {self.directory}.")
+
+    def stop(self):
+        """Stop profiling and write the profile."""
+        if not self.running:
+            return
+        profile, self._profile = self._profile, None
+        profile.disable()
+        self._stop_handle.cancel()
+
+        import pstats
+
+        path = self.directory / f"{self._name}.pstats"
+        summary = io.StringIO()
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(_TOP_FUNCTIONS)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(_TOP_FUNCTIONS)
+        try:
+            stats.dump_stats(path)
+            path.with_suffix(".txt").write_text(summary.getvalue(), encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Could not write the profile: {e}")
+            return
+        logger.info(f"Profile written to {path}.")
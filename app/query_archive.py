@@ -0,0 +1,58 @@
+"""
+Query the payload archive, reading only the day partitions and the columns a query needs.
+
+Prints the matching rows as CSV, times in ISO 8601 UTC. Dates and times are UTC unless they have an offset,
+a date alone as --until means the end of that day.
+
+Usage:
+  python app/query_archive.py --callsign S1234567
+  python app/query_archive.py --since 2025-01-10 --until 2025-01-12 --bbox 45.0 8.5 46.0 10.0
+  python app/query_archive.py --since 2025-01-10T06:00 --columns time,callsign,altitude,snr,sats,batt
+"""
+import argparse
+import csv
+import sys
+from datetime import datetime, UTC, timedelta
+from pathlib import Path
+
+from archive import COLUMNS, query
+from settings import DATA_PATH
+from settings.archive import Archive
+
+
+def parse_time(value: str, end_of_day: bool = False) -> float:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1, microseconds=-1)
+    return parsed.timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", type=Path, default=DATA_PATH / Archive().directory, help="Archive directory")
+    parser.add_argument("--callsign", help="Only this radiosonde")
+    parser.add_argument("--since", type=parse_time, help="Oldest receive time")
+    parser.add_argument("--until", type=lambda value: parse_time(value, end_of_day=True), help="Newest receive time")
+    parser.add_argument(
+        "--bbox", type=float, nargs=4, metavar=("SOUTH", "WEST", "NORTH", "EAST"), help="Bounding box, in degrees"
+    )
+    parser.add_argument("--columns", default=",".join(COLUMNS), help="Comma separated columns to print")
+    args = parser.parse_args()
+
+    columns = [name.strip() for name in args.columns.split(",") if name.strip()]
+    unknown = [name for name in columns if name not in COLUMNS]
+    if unknown:
+        parser.error(f"unknown columns: {', '.join(unknown)}, available: {', '.join(COLUMNS)}")
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(columns)
+    for row in query(args.directory, args.callsign, args.since, args.until, args.bbox, columns):
+        if "time" in row:
+            row["time"] = datetime.fromtimestamp(row["time"], UTC).isoformat()
+        writer.writerow(row.values())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,265 @@
 import asyncio
 import logging
+import time
 from datetime import datetime, UTC, timedelta
 
+from alert_rules import RuleSet
+from archive import ArchiveWriter
+from capture import CaptureWriter
+from deadline_scheduler import DeadlineScheduler
+import metrics
 from listeners.listener_repo import ListenerRepo
+from listeners.source_merger import SourceMerger
+from notification_dispatcher import notification_dispatcher
+from profiler import Profiler
 from radiosonde_payload import RadiosondePayload
-from settings import Settings
+from settings import Settings, DATA_PATH
+from settings.zone import DEFAULT_ZONE
+from settings_provider import settings_provider
+from sonde_tracker import SondeRecord, SondeTracker
+from tracker_journal import TrackerJournal
 from utils import Utils
+from zone_index import ZoneIndex
 
 logger = logging.getLogger(__name__)
 
+# A descending sonde counts as active near a zone only if it was updated this recently.
+_ACTIVE_WINDOW = timedelta(minutes=2)
+
 
 class AsyncRadiosondeAutoRxListener:
     def __init__(self):
-        self._settings: Settings = Settings.load_settings()
-        self._sondes = {}
-        self._last_frame = {}
+        self._settings_provider = settings_provider
+        self._tracker = SondeTracker()
+        self._zones = {}  # Zone settings by name
+        self._zone_index = None
+        self._outer_zone_index = None  # Zones widened by the fast poll margin of the web listener
+        self._relevance_index = None  # Zones widened to where sondes get a record rather than a seen entry
+        self._zones_settings = None
+        self._landing_timeouts = []  # Distinct landing timeouts of the zones, in minutes, ascending
+        self._landing_zones = 0  # Number of zones with a landing timeout
+        self._prediction_altitude = None  # Highest altitude at which a zone uses landing predictions
+        self._rules = None  # RuleSet of the alert rules
 
-        self._purge_interval = 60  # How often to check for old radiosonde data (in seconds)
-        self._purge_task = None  # Task to handle purging of old radiosonde data
+        self._max_age = timedelta(hours=2)  # Radiosondes without updates for this long are purged
+        self._scheduler = DeadlineScheduler(self._on_deadline)
+        self._purge_task = None  # Task firing landing timeouts and purging old radiosonde data
         self._listener_task = None
-
-        self._lock = asyncio.Lock()
+        self._merger = None  # Merges the payloads when several listeners run together
+        self._merger_task = None
+        self._capture_task = None
+        self._archive = None  # ArchiveWriter of the decoded payloads, if enabled
+        self._archive_task = None
+        self._journal_task = None
+        self._metrics_server = None
+        self._live_state_server = None
+        self._live_state_task = None
+        self._loop_lag_task = None
+        self._profiler = None
 
         logger.info("AsyncRadiosondeAutoRxListener initialized.")
 
+    @property
+    def _settings(self) -> Settings:
+        return self._settings_provider.settings
+
+    def _get_zone_index(self) -> ZoneIndex:
+        """Return the spatial index of the zones for the current settings, rebuilding it after a settings reload."""
+        settings = self._settings
+        if settings is not self._zones_settings:
+            zones = settings.all_zones
+            self._zones = {zone.name: zone for zone in zones}
+            self._zone_index = ZoneIndex([
+                (zone.name, zone.listener_location.location_tuple, zone.notification_thresholds.distance_km)
+                for zone in zones
+            ])
+            margin_km = settings.web_listener.fast_poll_margin_km
+            self._outer_zone_index = ZoneIndex([
+                (zone.name, zone.listener_location.location_tuple, zone.notification_thresholds.distance_km + margin_km)
+                for zone in zones
+            ])
+            self._relevance_index = ZoneIndex([
+                (zone.name, zone.listener_location.location_tuple, settings.relevance_km(zone)) for zone in zones
+            ])
+            self._rules = RuleSet(settings.rules, self._zones, self._tracker)
+            max_memory_mb = settings.tracking.max_memory_mb
+            self._tracker.max_bytes = max_memory_mb * 1024 * 1024 if max_memory_mb is not None else None
+
+            thresholds = [zone.notification_thresholds for zone in zones]
+            timeouts = [t.landing_point_timeout_minutes for t in thresholds if t.landing_point_timeout_minutes > 0]
+            self._landing_timeouts = sorted(set(timeouts))
+            self._landing_zones = len(timeouts)
+            self._prediction_altitude = max(
+                (t.predicted_landing_altitude_meters for t in thresholds if t.predicted_landing_alert), default=None
+            )
+            self._zones_settings = settings
+        return self._zone_index
+
+    def _descending_nearby(self) -> int:
+        """Count the recently updated sondes descending near a zone, within its distance plus the fast poll margin."""
+        self._get_zone_index()
+        since = datetime.now(UTC) - _ACTIVE_WINDOW
+        count = 0
+        for callsign in self._tracker.callsigns():
+            sonde = self._tracker.get(callsign)
+            if (
+                    sonde.last_update >= since
+                    and sonde.is_descending
+                    and self._outer_zone_index.contains(sonde.location_tuple)
+            ):
+                count += 1
+        return count
+
     async def start(self):
         logger.info("Starting AsyncRadiosondeAutoRxListener...")
-        listener = ListenerRepo.get_listener(self._settings.listener_type)(self._settings, self.handle_payload_summary)
+        listener_types = self._settings.listener_types
+        listener_classes = [ListenerRepo.get_listener(listener_type) for listener_type in listener_types]
+
+        if len(listener_classes) == 1:
+            listeners = [listener_classes[0](self._settings_provider, self.handle_payload_summary)]
+        else:
+            self._merger = SourceMerger(
+                self._settings_provider,
+                listener_types,
+                {cls.source for cls in listener_classes if cls.provides_frame_numbers},
+                self.handle_payload_summary,
+            )
+            listeners = [
+                cls(self._settings_provider, self._merger.callback_for(cls.source)) for cls in listener_classes
+            ]
+
+        for listener in listeners:
+            listener.activity = self._descending_nearby
 
-        logger.debug(f"Using listener: {listener.__class__.__name__}")
+        logger.debug(f"Using listeners: {', '.join(listener.__class__.__name__ for listener in listeners)}")
 
-        await self._listen(listener)
+        await self._listen(listeners)
 
-    async def _listen(self, listener):
-        # Start the listener
-        self._listener_task = asyncio.create_task(listener.listen())
+    async def _start_metrics(self):
+        settings = self._settings.metrics
+        metrics.TRACKED_SONDES.set_function(lambda: len(self._tracker))
+        metrics.SEEN_SONDES.set_function(lambda: self._tracker.seen)
+        metrics.TRACKER_BYTES.set_function(lambda: self._tracker.memory_bytes)
+        metrics.TRACKER_BYTES_PER_SONDE.set_function(lambda: self._tracker.bytes_per_sonde)
+        metrics.NOTIFICATION_QUEUE_DEPTH.set_function(lambda: notification_dispatcher.queue_depth)
+
+        self._metrics_server = metrics.MetricsServer(settings.host, settings.port)
+        await self._metrics_server.start()
+        self._loop_lag_task = asyncio.create_task(
+            metrics.monitor_event_loop_lag(settings.event_loop_lag_interval_seconds), name="loop-lag"
+        )
+
+    def _zone_names(self):
+        self._get_zone_index()
+        return self._zones.keys()
+
+    async def _start_live_api(self):
+        from live_state import LiveState, LiveStateServer  # Only imported when enabled, it needs aiohttp
+
+        settings = self._settings.live_api
+        live_state = LiveState(
+            self._tracker, self._get_zone_index, settings.update_interval_seconds, settings.client_queue_size
+        )
+        self._live_state_server = LiveStateServer(live_state, self._zone_names, settings.host, settings.port)
+        await self._live_state_server.start()
+        self._live_state_task = asyncio.create_task(live_state.run(), name="live-state")
+
+    async def _stop_live_api(self):
+        if self._live_state_task:
+            self._live_state_task.cancel()
+        if self._live_state_server:
+            await self._live_state_server.stop()
+
+    async def _stop_metrics(self):
+        if self._loop_lag_task:
+            self._loop_lag_task.cancel()
+        if self._metrics_server:
+            await self._metrics_server.stop()
+
+    @staticmethod
+    async def _run_listeners(listeners: list):
+        """Run the listeners concurrently, if one fails the others are cancelled."""
+        async with asyncio.TaskGroup() as group:
+            for listener in listeners:
+                group.create_task(listener.listen(), name=f"listener-{listener.__class__.__name__}")
+
+    def _restore_state(self) -> TrackerJournal:
+        """Load the radiosondes tracked before the restart, and the deadlines they missed meanwhile."""
+        settings = self._settings.persistence
+        journal = TrackerJournal(
+            self._tracker, DATA_PATH / settings.directory, settings.flush_interval_seconds, settings.snapshot_interval_seconds
+        )
+        started = time.perf_counter()
+        try:
+            restored = journal.load()
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not restore the tracked radiosondes, starting empty: {e}")
+            self._tracker = SondeTracker()
+            journal.tracker = self._tracker
+            self._zones_settings = None  # Set the memory cap and the rule bits on the new tracker
+            restored = 0
+        self._tracker.track_changes(TrackerJournal.CHANGES)
+
+        for callsign in self._tracker.callsigns():
+            # Due at once: `_on_deadline` sends the landing notifications missed during the restart,
+            # purges what is too old, and schedules the rest.
+            self._scheduler.schedule(callsign, self._tracker.get(callsign).last_update)
+        logger.info(f"Restored {restored} radiosondes in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        return journal
+
+    def _start_profiler(self):
+        settings = self._settings.profiling
+        self._profiler = Profiler(DATA_PATH / settings.directory, settings.duration_seconds)
+        if settings.on_signal:
+            self._profiler.install_signal_handler()
+        if settings.enabled:
+            self._profiler.start()
+
+    def _stop_profiler(self):
+        if self._profiler:
+            self._profiler.remove_signal_handler()
+            self._profiler.stop()
+
+    async def _listen(self, listeners: list):
+        notification_dispatcher.start()
+
+        if self._settings.profiling.enabled or self._settings.profiling.on_signal:
+            self._start_profiler()
+
+        if self._settings.persistence.enabled:
+            journal = self._restore_state()
+            self._journal_task = asyncio.create_task(journal.run(), name="journal")
+
+        if self._settings.metrics.enabled:
+            await self._start_metrics()
+
+        if self._settings.live_api.enabled:
+            await self._start_live_api()
+
+        if self._settings.capture.enabled:
+            capture = self._settings.capture
+            writer = CaptureWriter(
+                DATA_PATH / capture.file, capture.flush_interval_seconds, capture.max_buffered_messages
+            )
+            for listener in listeners:
+                listener.capture = writer
+            self._capture_task = asyncio.create_task(writer.run(), name="capture")
+
+        if self._settings.archive.enabled:
+            archive = self._settings.archive
+            self._archive = ArchiveWriter(
+                DATA_PATH / archive.directory, archive.flush_interval_seconds,
+                archive.batch_mb * 1024 * 1024, archive.max_buffered_mb * 1024 * 1024,
+            )
+            self._archive_task = asyncio.create_task(self._archive.run(), name="archive")
+
+        # Start the listeners, they all run until one of them fails
+        self._listener_task = asyncio.create_task(self._run_listeners(listeners), name="listeners")
+        if self._merger:
+            self._merger_task = asyncio.create_task(self._merger.monitor(), name="merger")
 
         # Start the purge task to remove old radiosonde data
-        self._purge_task = asyncio.create_task(self.purge_old_radiosondes())
+        self._purge_task = asyncio.create_task(self.purge_old_radiosondes(), name="purge")
 
         # From here, everything happens in the callback function above.
         try:
@@ -48,7 +270,15 @@ class AsyncRadiosondeAutoRxListener:
         finally:
             # Close listener.
             await self._stop_listener_task()
+            await self._stop_merger_task()
             await self._stop_purge_task()
+            await self._stop_capture_task()
+            await self._stop_archive_task()
+            await self._stop_journal_task()
+            await notification_dispatcher.stop()
+            await self._stop_metrics()
+            await self._stop_live_api()
+            self._stop_profiler()
 
     async def handle_payload_summary(self, model: dict | RadiosondePayload):
         """Handle a 'Payload Summary' UDP broadcast message, supplied as a dict."""
@@ -56,92 +286,194 @@ class AsyncRadiosondeAutoRxListener:
             model = RadiosondePayload(**model)
 
         current_time = datetime.now(UTC)
-        range_km = self._settings.notification_thresholds.distance_km
-        home = self._settings.listener_location.location_tuple
-
-        if self._sondes.get(model.callsign) is None:
-            async with self._lock:
-                self._sondes[model.callsign] = {
-                    "notify": False,
-                    "landing_notify": False,
-                    "altitude": 0,
-                    "last_update": current_time,
-                    "data": model,
-                }
+        timestamp = current_time.timestamp()
+        if self._archive is not None:
+            self._archive.write(model, timestamp)
+
+        zone_index = self._get_zone_index()
+        zones_in_range = zone_index.match(model.callsign, model.location_tuple)
+        if zones_in_range:
+            metrics.GEOFENCE_HITS.inc()
+        relevant = bool(zones_in_range) or self._relevance_index.contains(model.location_tuple)
+
+        for callsign in self._tracker.expire_seen(timestamp - self._max_age.total_seconds()):
+            self._forget(callsign)
+        sonde = self._tracker.get(model.callsign)
+        if sonde is None:
+            if not relevant:
+                # Far from every zone: only remember that it was seen, until it comes closer.
+                if self._tracker.see(model.callsign, timestamp):
+                    logger.debug(f"New radiosonde detected far from the zones: {model.callsign}.")
+                    self._evict()
+                return
+            sonde = self._tracker.add(model, current_time)
             logger.info(f"New radiosonde detected: {model.callsign}.")
+            self._evict()
 
-        if (
-                model.is_descending
-                and self._is_below_threshold(model)
-                and Utils.is_within_range(home, model.location_tuple, range_km)
-                and not self._sondes[model.callsign]["notify"]
-                and model.frame != self._last_frame.get(model.callsign, -1)
-        ):  # radiosonde is falling
-            logger.debug(
-                f"Radiosonde {model.callsign} is descending, within range, and below altitude threshold. Sending notification."
-            )
-            await Utils.send_threshold_notification(model)
-            async with self._lock:
-                self._sondes[model.callsign]["notify"] = True
-
-        elif (
-                not Utils.is_within_range(home, model.location_tuple, range_km)
-        ):
-            if self._sondes[model.callsign]["notify"]:
+        # The checks and the state changes below do not await, so they are atomic on the event loop.
+        # The notify flags are set before sending, so a concurrent packet of the same sonde can't notify twice.
+        new_frame = self._tracker.is_new_frame(model)
+        notify_zones = []
+        if zones_in_range and model.is_descending and new_frame:
+            for name in zones_in_range:
+                if name not in sonde.notify and self._is_below_threshold(model, name):
+                    logger.debug(
+                        f"Radiosonde {model.callsign} is descending, within range, and below altitude threshold "
+                        f"of zone {name}. Sending notification."
+                    )
+                    self._tracker.set_notify(model.callsign, name, True)
+                    notify_zones.append(name)
+
+        if sonde.notify:
+            left = [name for name in sonde.notify if self._has_left_zone(model, name, name in zones_in_range)]
+            for name in left:
                 # Reset notify flag if conditions are not met
                 logger.info(
-                    f"Conditions not met for radiosonde {model.callsign}. Resetting notification flag."
+                    f"Conditions not met for radiosonde {model.callsign} in zone {name}. Resetting notification flag."
                 )
-                async with self._lock:
-                    self._sondes[model.callsign]["notify"] = False
+                self._tracker.set_notify(model.callsign, name, False)
 
-        async with self._lock:
-            self._sondes[model.callsign]["altitude"] = model.altitude
-            self._sondes[model.callsign]["last_update"] = current_time
-            self._sondes[model.callsign]["data"] = model
-            self._last_frame[model.callsign] = model.frame
+        # Checked against the record before it is updated, which still holds the previous payload.
+        matched_rules = self._rules.match(model, sonde) if self._rules and new_frame else ()
+        for rule in matched_rules:
+            logger.debug(f"Radiosonde {model.callsign} matches rule {rule.name}. Sending notification.")
+            self._tracker.set_rule_notified(model.callsign, rule.bit)
 
-    def _is_below_threshold(self, model: RadiosondePayload):
-        return model.altitude < self._settings.notification_thresholds.altitude_meters
+        if not relevant and not sonde.flagged:
+            # Gone far from every zone, its record is not needed anymore.
+            self._tracker.demote(model.callsign, timestamp)
+            self._scheduler.cancel(model.callsign)
+            zone_index.forget(model.callsign)
+            return
 
-    async def purge_old_radiosondes(self):
-        """Periodically check and purge radiosonde data older than 2 hours."""
-        range_km = self._settings.notification_thresholds.distance_km
-        home = self._settings.listener_location.location_tuple
-
-        while True:
-            logger.info("Purging old radiosonde data...")
-            current_time = datetime.now(UTC)
-
-            async with self._lock:
-                for callsign in list(self._sondes.keys()):
-                    data = self._sondes[callsign]
-                    last_updated = data.get("last_update")
-                    landing_notify = data.get("landing_notify")
-                    model = data.get("data")
-                    timeout = (
-                        self._settings.notification_thresholds.landing_point_timeout_minutes
-                    )
+        self._tracker.update(model, current_time)
+        self._scheduler.schedule(model.callsign, self._next_deadline(sonde, current_time))
+
+        self._check_predicted_landing(model, sonde, zone_index)
+
+        for name in notify_zones:
+            zone = self._zones[name]
+            Utils.send_threshold_notification(
+                model,
+                zone_index.geofences[name].get_distance(model.callsign, model.location_tuple),
+                sonde.track.predict(zone.listener_location.altitude),
+                zone,
+            )
+
+        for rule in matched_rules:
+            metrics.RULE_MATCHES.labels(rule.name).inc()
+            Utils.send_rule_notification(
+                model,
+                rule.settings,
+                rule.zone,
+                zone_index.geofences[rule.zone.name].get_distance(model.callsign, model.location_tuple),
+                sonde.track.predict(rule.zone.listener_location.altitude) if model.is_descending else None,
+            )
+
+    def _evict(self):
+        """Evict the least relevant sondes if the tracker is over its memory cap."""
+        evicted = self._tracker.evict()
+        for callsign in evicted:
+            self._forget(callsign)
+        if evicted:
+            logger.warning(f"Tracker memory cap reached, evicted {len(evicted)} radiosondes.")
+
+    def _forget(self, callsign: str):
+        """Drop the state kept outside of the tracker for a radiosonde that is no longer tracked."""
+        self._scheduler.cancel(callsign)
+        self._zone_index.forget(callsign)
+        if self._merger:
+            self._merger.forget(callsign)
+
+    def _check_predicted_landing(self, model: RadiosondePayload, sonde: SondeRecord, zone_index: ZoneIndex):
+        """Notify the zones in which the predicted landing point of a descending sonde is, once per zone."""
+        if self._prediction_altitude is None or not model.is_descending or model.altitude >= self._prediction_altitude:
+            return
+
+        prediction = sonde.track.predict(self._zones[DEFAULT_ZONE].listener_location.altitude)
+        if prediction is None:
+            return
+
+        for name in zone_index.match_location(prediction.location_tuple):
+            zone = self._zones[name]
+            thresholds = zone.notification_thresholds
+            if (
+                    thresholds.predicted_landing_alert
+                    and model.altitude < thresholds.predicted_landing_altitude_meters
+                    and name not in sonde.predicted_notify
+                    and name not in sonde.notify
+            ):
+                logger.debug(
+                    f"Radiosonde {model.callsign} is predicted to land within zone {name}. Sending notification."
+                )
+                self._tracker.set_predicted_notify(model.callsign, name, True)
+                zone_prediction = sonde.track.predict(zone.listener_location.altitude) or prediction
+                Utils.send_predicted_landing_notification(model, zone_prediction, zone)
+
+    def _has_left_zone(self, model: RadiosondePayload, zone: str, in_range: bool) -> bool:
+        """
+        Whether a notified sonde is out of the range of a zone by more than its hysteresis, so a sonde hugging
+        the edge of the zone is not notified again and again.
+        """
+        thresholds = self._zones[zone].notification_thresholds
+        if in_range:
+            return False
+        distance_km = self._zone_index.geofences[zone].get_distance(model.callsign, model.location_tuple)
+        return distance_km > thresholds.distance_km + thresholds.range_hysteresis_km
+
+    def _is_below_threshold(self, model: RadiosondePayload | SondeRecord, zone: str):
+        return model.altitude < self._zones[zone].notification_thresholds.altitude_meters
+
+    def _next_deadline(self, sonde: SondeRecord, current_time: datetime) -> datetime | None:
+        """Return when the sonde needs attention next: its next landing timeout, or its purge."""
+        self._get_zone_index()
+        last_updated = sonde.last_update
+
+        if len(sonde.landing_notify) < self._landing_zones:
+            for timeout in self._landing_timeouts:
+                landing_deadline = last_updated + timedelta(minutes=timeout)
+                if landing_deadline > current_time:
+                    return landing_deadline
+
+        return last_updated + self._max_age
+
+    def _on_deadline(self, callsign: str, current_time: datetime) -> datetime | None:
+        """Handle the landing timeouts or the purge of a radiosonde, returning its next deadline."""
+        sonde = self._tracker.get(callsign)
+        if sonde is None:
+            return None
 
-                    if (
-                            last_updated
-                            and timeout > 0
-                            and (current_time - last_updated) > timedelta(minutes=timeout)
-                            and not landing_notify
-                            and self._is_below_threshold(model)
-                            and Utils.is_within_range(home, model.location_tuple, range_km)
-                    ):
-                        await Utils.send_landing_notification(model)
-                        data["landing_notify"] = True
-
-                    if last_updated and (current_time - last_updated) > timedelta(hours=2):
-                        del self._sondes[callsign]
-                        del self._last_frame[callsign]
-                        logger.info(
-                            f"Purged radiosonde data for {callsign} (older than 2 hours)."
-                        )
-
-            await asyncio.sleep(self._purge_interval)  # Wait for the next purge cycle
+        zone_index = self._get_zone_index()
+        last_updated = sonde.last_update
+
+        if current_time - last_updated > self._max_age:
+            self._tracker.remove(callsign)
+            self._forget(callsign)
+            logger.info(
+                f"Purged radiosonde data for {callsign} (older than 2 hours)."
+            )
+            return None
+
+        for name in zone_index.match(callsign, sonde.location_tuple):
+            timeout = self._zones[name].notification_thresholds.landing_point_timeout_minutes
+            if (
+                    timeout > 0
+                    and (current_time - last_updated) >= timedelta(minutes=timeout)
+                    and name not in sonde.landing_notify
+                    and self._is_below_threshold(sonde, name)
+            ):
+                self._tracker.set_landing_notify(callsign, name, True)
+                distance_km = zone_index.geofences[name].get_distance(callsign, sonde.location_tuple)
+                Utils.send_landing_notification(sonde, distance_km, self._zones[name])
+
+        return self._next_deadline(sonde, current_time)
+
+    async def purge_old_radiosondes(self):
+        """
+        Fire every landing timeout and purge radiosonde data older than 2 hours, each at its exact deadline.
+        Deadlines are kept in a min-heap and moved cheaply on every new frame, there is no periodic sweep.
+        """
+        await self._scheduler.run()
 
     async def _stop_purge_task(self):
         """Stop the purge task gracefully."""
@@ -153,6 +485,44 @@ class AsyncRadiosondeAutoRxListener:
             except asyncio.CancelledError:
                 logger.info("Purge task cancelled.")
 
+    async def _stop_merger_task(self):
+        """Stop monitoring the merged sources."""
+        if self._merger_task:
+            self._merger_task.cancel()
+            try:
+                await self._merger_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _stop_journal_task(self):
+        """Stop the journal task, writing the last changes."""
+        if self._journal_task:
+            self._journal_task.cancel()
+            try:
+                await self._journal_task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.exception("The tracker journal task failed.", exc_info=e)
+
+    async def _stop_capture_task(self):
+        """Stop the capture task, flushing the buffered messages."""
+        if self._capture_task:
+            self._capture_task.cancel()
+            try:
+                await self._capture_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _stop_archive_task(self):
+        """Stop the archive task, flushing the buffered payloads."""
+        if self._archive_task:
+            self._archive_task.cancel()
+            try:
+                await self._archive_task
+            except asyncio.CancelledError:
+                pass
+
     async def _stop_listener_task(self):
         """Stop the purge task gracefully."""
         if self._listener_task:
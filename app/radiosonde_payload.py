@@ -32,6 +32,19 @@ class RadiosondePayload(BaseModel):
     vel_v: float
     vel_h: float
 
+    @classmethod
+    def construct_trusted(cls, values: dict):
+        """
+        Build a payload from already well-typed values, without any validation.
+        `values` must contain every field; this skips even the per-field work of `model_construct`.
+        """
+        model = cls.__new__(cls)
+        object.__setattr__(model, "__dict__", values)
+        object.__setattr__(model, "__pydantic_fields_set__", set(values))
+        object.__setattr__(model, "__pydantic_extra__", None)
+        object.__setattr__(model, "__pydantic_private__", None)
+        return model
+
     @property
     def location_tuple(self):
         return self.latitude, self.longitude
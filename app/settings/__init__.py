@@ -1,21 +1,118 @@
 from pathlib import Path
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
 from yaml import safe_load, dump
 
+from .archive import Archive
+from .capture import Capture
 from .listener_location import ListenerLocation
 from .listener_types import ListenerType
+from .live_api import LiveApi
+from .log_output import LogOutput
+from .metrics_endpoint import MetricsEndpoint
+from .mqtt_listener import MqttListener
 from .notification_thresholds import NotificationThresholds
 from .notifications import Notifications
+from .persistence import Persistence
+from .profiling import Profiling
+from .rules import Rule
+from .source_merge import SourceMerge
+from .tracking import Tracking
 from .udp_broadcast import UDPBroadcast
+from .web_listener import WebListener
+from .zone import DEFAULT_ZONE, Zone
+
+DATA_PATH = Path(__file__).parent.parent.parent / "data"
+SETTINGS_FILE_PATH = DATA_PATH / "config.yml"
+
+# Sondes are relevant up to this many times the notification distance of a zone, so a sonde leaving the
+# notification range (and resetting its notification flag) is still seen before it is dropped or forgotten.
+RELEVANCE_FACTOR = 2.0
 
 
 class Settings(BaseModel):
     listener_location: ListenerLocation
     notification_thresholds: NotificationThresholds
     udp_broadcast: UDPBroadcast
-    listener_type: ListenerType
+    listener_type: ListenerType | list[ListenerType]
     notifications: Notifications
+    web_listener: WebListener = Field(default_factory=WebListener)
+    mqtt_listener: MqttListener = Field(default_factory=MqttListener)
+    capture: Capture = Field(default_factory=Capture)
+    archive: Archive = Field(default_factory=Archive)
+    metrics: MetricsEndpoint = Field(default_factory=MetricsEndpoint)
+    live_api: LiveApi = Field(default_factory=LiveApi)
+    source_merge: SourceMerge = Field(default_factory=SourceMerge)
+    persistence: Persistence = Field(default_factory=Persistence)
+    tracking: Tracking = Field(default_factory=Tracking)
+    profiling: Profiling = Field(default_factory=Profiling)
+    logging: LogOutput = Field(default_factory=LogOutput)
+    zones: list[Zone] = Field(default_factory=list)  # More locations, each with its thresholds and services
+    rules: list[Rule] = Field(default_factory=list)  # Alert rules, each notified once per radiosonde
+
+    @field_validator("listener_type")
+    @classmethod
+    def _check_listener_type(cls, value):
+        if isinstance(value, list):
+            if not value:
+                raise ValueError("at least one listener type is required")
+            if len(set(value)) != len(value):
+                raise ValueError("listener types must be unique")
+        return value
+
+    @field_validator("zones")
+    @classmethod
+    def _check_zones(cls, value):
+        names = [zone.name for zone in value]
+        if DEFAULT_ZONE in names or len(set(names)) != len(names):
+            raise ValueError(f"zone names must be unique and different from '{DEFAULT_ZONE}'")
+        return value
+
+    @field_validator("rules")
+    @classmethod
+    def _check_rules(cls, value):
+        names = [rule.name for rule in value]
+        if len(set(names)) != len(names):
+            raise ValueError("rule names must be unique")
+        return value
+
+    @model_validator(mode="after")
+    def _check_rule_zones(self):
+        zones = {zone.name for zone in self.all_zones}
+        for rule in self.rules:
+            if rule.zone not in zones:
+                raise ValueError(f"rule '{rule.name}' refers to an unknown zone: {rule.zone}")
+        return self
+
+    @property
+    def all_zones(self) -> list[Zone]:
+        """Every zone, starting with the default one made of the top-level location and thresholds."""
+        default = Zone(
+            name=DEFAULT_ZONE,
+            listener_location=self.listener_location,
+            notification_thresholds=self.notification_thresholds,
+        )
+        return [default, *self.zones]
+
+    def reach_km(self, zone: Zone) -> float:
+        """Distance within which radiosondes matter to a zone: its distance_km, or that of a rule of the zone."""
+        return max([
+            zone.notification_thresholds.distance_km,
+            *(rule.max_distance_km for rule in self.rules if rule.zone == zone.name and rule.max_distance_km),
+        ])
+
+    def relevance_km(self, zone: Zone) -> float:
+        """
+        Distance within which radiosondes get a record, in the event loop and in the MQTT worker processes:
+        RELEVANCE_FACTOR times the reach of the zone, and at least the web listener's fast poll distance.
+        """
+        reach_km = self.reach_km(zone)
+        return max(reach_km * RELEVANCE_FACTOR, reach_km + self.web_listener.fast_poll_margin_km)
+
+    @property
+    def listener_types(self) -> list[ListenerType]:
+        """The configured listener types, in order of preference."""
+        return self.listener_type if isinstance(self.listener_type, list) else [self.listener_type]
 
     @classmethod
     def create_settings_file(cls, settings_file_path):
@@ -27,11 +124,9 @@ class Settings(BaseModel):
         return settings
 
     @classmethod
-    def load_settings(cls):
-        settings_file_path = Path(__file__).parent.parent.parent / "data/config.yml"
-
+    def load_settings(cls, settings_file_path: Path = SETTINGS_FILE_PATH):
         if not settings_file_path.exists():
-            return Settings.create_settings_file(settings_file_path)
+            return cls.create_settings_file(settings_file_path)
 
         with open(settings_file_path, "r") as settings_file:
             return cls(**safe_load(settings_file))
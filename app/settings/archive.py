@@ -0,0 +1,9 @@
+from pydantic import BaseModel, PositiveFloat
+
+
+class Archive(BaseModel):
+    enabled: bool = False  # Keep every decoded payload in a compressed columnar archive, for later analysis
+    directory: str = "archive"  # Archive directory, relative to the data directory, with one folder per day
+    flush_interval_seconds: PositiveFloat = 60.0  # How often buffered payloads are written to disk
+    batch_mb: PositiveFloat = 4.0  # Write earlier once this much memory of payloads is buffered
+    max_buffered_mb: PositiveFloat = 16.0  # While writes fail, the oldest payloads beyond this memory are dropped
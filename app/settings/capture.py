@@ -0,0 +1,8 @@
+from pydantic import BaseModel, PositiveFloat, PositiveInt
+
+
+class Capture(BaseModel):
+    enabled: bool = False  # Record every raw inbound message, for replay and benchmarks
+    file: str = "captures/capture.bin.gz"  # Capture file, relative to the data directory
+    flush_interval_seconds: PositiveFloat = 5.0  # How often buffered messages are written to disk
+    max_buffered_messages: PositiveInt = 50000  # While writes fail, the oldest messages beyond this are dropped
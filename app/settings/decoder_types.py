@@ -0,0 +1,7 @@
+from enum import StrEnum
+
+
+class DecoderType(StrEnum):
+    STRICT = "strict"
+    FAST = "fast"
+    TRUSTED = "trusted"
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, PositiveFloat, PositiveInt
+
+
+class LiveApi(BaseModel):
+    enabled: bool = False  # Serve the tracked radiosondes as GeoJSON, and their changes as Server-Sent Events
+    host: str = "0.0.0.0"
+    port: int = 8081
+    update_interval_seconds: PositiveFloat = 1.0  # How often the changed sondes are encoded and pushed
+    client_queue_size: PositiveInt = 32  # Updates buffered for a client before it is disconnected as too slow
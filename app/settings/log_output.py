@@ -0,0 +1,15 @@
+from enum import StrEnum
+
+from pydantic import BaseModel, PositiveFloat, PositiveInt
+
+
+class LogFormat(StrEnum):
+    TEXT = "text"
+    JSON = "json"  # One JSON object per line
+
+
+class LogOutput(BaseModel):
+    format: LogFormat = LogFormat.TEXT  # Format of the log file and console: text or json
+    rate_limit_burst: PositiveInt = 20  # Messages logged from the same line of code in each interval
+    rate_limit_interval_seconds: PositiveFloat = 60.0  # Interval of the per-line rate limit
+    sample_every: PositiveInt = 100  # Beyond the rate limit, one message out of this many is still logged
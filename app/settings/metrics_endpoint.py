@@ -0,0 +1,8 @@
+from pydantic import BaseModel, PositiveFloat
+
+
+class MetricsEndpoint(BaseModel):
+    enabled: bool = False  # Serve Prometheus metrics over HTTP
+    host: str = "0.0.0.0"
+    port: int = 8082  # Not 9100, the port of node_exporter
+    event_loop_lag_interval_seconds: PositiveFloat = 1.0  # How often the event loop lag is measured
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, NonNegativeInt, PositiveFloat, PositiveInt
+
+from .decoder_types import DecoderType
+
+
+class MqttListener(BaseModel):
+    decoder: DecoderType = DecoderType.FAST  # Payload decoder: strict, fast or trusted (no validation)
+    workers: NonNegativeInt = 0  # Processes decoding and geo-filtering the messages, 0 = decode on the event loop
+    batch_size: PositiveInt = 500  # Messages sent to a worker process at once
+    batch_interval_seconds: PositiveFloat = 0.1  # Longest time a message waits for its batch to fill up
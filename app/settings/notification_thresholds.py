@@ -1,4 +1,4 @@
-from pydantic import BaseModel, PositiveFloat
+from pydantic import BaseModel, NonNegativeFloat, PositiveFloat
 
 
 class NotificationThresholds(BaseModel):
@@ -7,3 +7,6 @@ class NotificationThresholds(BaseModel):
     landing_point_timeout_minutes: int = (
         5  # Specifies the duration (in minutes) of inactivity after which the landing point is sent. 0 = Disabled
     )
+    predicted_landing_alert: bool = False  # Also notify when the predicted landing point is within distance_km
+    predicted_landing_altitude_meters: float = 5000.0  # Below this altitude the landing prediction is used for alerts
+    range_hysteresis_km: NonNegativeFloat = 1.0  # A notified sonde is re-armed only once this far beyond distance_km
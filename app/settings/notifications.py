@@ -1,10 +1,19 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PositiveFloat, PositiveInt, NonNegativeFloat, NonNegativeInt
 
 
 class Notification(BaseModel):
     url: str
     enabled: bool = True
+    max_concurrency: PositiveInt = 1  # Maximum number of notifications sent to this service at the same time
+    rate_per_minute: PositiveFloat | None = None  # Average number of notifications per minute, None = unlimited
+    burst: PositiveInt = 5  # Notifications that can be sent at once before rate_per_minute applies
 
 
 class Notifications(BaseModel):
     services: list[Notification] = Field(default_factory=list)
+    workers: PositiveInt = 2  # Number of workers sending queued notifications
+    queue_size: PositiveInt = 100  # Maximum number of pending notifications, newer ones are dropped when full
+    timeout_seconds: PositiveFloat = 30.0  # Timeout of a single delivery attempt
+    max_retries: NonNegativeInt = 3  # Retries of a failed delivery, with exponential backoff
+    retry_backoff_seconds: PositiveFloat = 2.0  # Delay before the first retry, doubled on every further retry
+    coalesce_seconds: NonNegativeFloat = 0.0  # Notifications within this window are merged into a digest, 0 = off
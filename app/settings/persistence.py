@@ -0,0 +1,8 @@
+from pydantic import BaseModel, PositiveFloat
+
+
+class Persistence(BaseModel):
+    enabled: bool = True  # Keep the tracked radiosondes and their notification flags across restarts
+    directory: str = "state"  # Journal and snapshot directory, relative to the data directory
+    flush_interval_seconds: PositiveFloat = 2.0  # How often the changes are appended to the journal
+    snapshot_interval_seconds: PositiveFloat = 300.0  # How often the journal is compacted into a snapshot
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, PositiveFloat
+
+
+class Profiling(BaseModel):
+    enabled: bool = False  # Capture a profile as soon as the listener starts
+    on_signal: bool = True  # Capture a profile on SIGUSR1, a second signal stops it early
+    duration_seconds: PositiveFloat = 30.0  # How long a profile runs
+    directory: str = "profiles"  # Profiles and task dumps, relative to the data directory
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field, PositiveFloat, model_validator
+
+from .notifications import Notification
+from .zone import DEFAULT_ZONE
+
+
+class Rule(BaseModel):
+    name: str  # Unique name of the rule, shown in its notifications
+    zone: str = DEFAULT_ZONE  # Zone the distance is measured from, and whose services are used by default
+    max_distance_km: PositiveFloat | None = None  # Only within this distance of the zone
+    min_altitude_meters: float | None = None  # Only above this altitude
+    max_altitude_meters: float | None = None  # Only below this altitude
+    descending: bool | None = None  # Only descending (true) or ascending (false) radiosondes, None = both
+    burst: bool = False  # Only on the first frame descending after ascending, when the balloon bursts
+    max_battery_volts: PositiveFloat | None = None  # Only with a known battery voltage below this one
+    models: list[str] = Field(default_factory=list)  # Only these models, e.g. RS41, empty = any
+    subtypes: list[str] = Field(default_factory=list)  # Only these subtypes, e.g. RS41-SGP, empty = any
+    services: list[Notification] = Field(default_factory=list)  # Empty = the services of the zone
+
+    @model_validator(mode="after")
+    def _check_altitudes(self):
+        if (
+                self.min_altitude_meters is not None
+                and self.max_altitude_meters is not None
+                and self.min_altitude_meters >= self.max_altitude_meters
+        ):
+            raise ValueError(f"rule '{self.name}': min_altitude_meters must be below max_altitude_meters")
+        return self
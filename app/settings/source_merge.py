@@ -0,0 +1,5 @@
+from pydantic import BaseModel, PositiveFloat
+
+
+class SourceMerge(BaseModel):
+    failover_after_seconds: PositiveFloat = 60.0  # A source quiet for this long is considered stalled
@@ -0,0 +1,5 @@
+from pydantic import BaseModel, PositiveFloat
+
+
+class Tracking(BaseModel):
+    max_memory_mb: PositiveFloat | None = 64.0  # Memory cap of the tracked sondes, the least relevant are evicted
@@ -1,6 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PositiveInt
+
+from .decoder_types import DecoderType
+from .overflow_policy import OverflowPolicy
 
 
 class UDPBroadcast(BaseModel):
     enabled: bool = True
     listen_port: int = 55673
+    queue_size: PositiveInt = 1000  # Maximum number of received packets waiting to be processed
+    consumers: PositiveInt = 1  # Number of tasks processing received packets
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST  # What to do when the queue is full
+    decoder: DecoderType = DecoderType.FAST  # Payload decoder: strict, fast or trusted (no validation)
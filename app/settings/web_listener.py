@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field, NonNegativeFloat, PositiveFloat
+
+from .decoder_types import DecoderType
+
+
+class WebListener(BaseModel):
+    url: str = "https://s1.radiosondy.info/export/export_map.php?live_map=1"  # GeoJSON export of live radiosondes
+    poll_interval_seconds: PositiveFloat = 10.0  # How often the export is fetched when nothing is descending nearby
+    fast_poll_interval_seconds: PositiveFloat = 3.0  # How often it is fetched while a sonde descends nearby
+    max_poll_interval_seconds: PositiveFloat = 300.0  # Longest interval, after quiet polls or failed requests
+    poll_jitter: float = Field(0.1, ge=0, lt=1)  # Random spread of the backed off intervals, as a fraction
+    fast_poll_margin_km: NonNegativeFloat = 30.0  # Nearby means within the distance_km of a zone plus this margin
+    decoder: DecoderType = DecoderType.FAST  # Payload decoder: strict, fast or trusted (no validation)
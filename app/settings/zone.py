@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+from .listener_location import ListenerLocation
+from .notification_thresholds import NotificationThresholds
+from .notifications import Notification
+
+DEFAULT_ZONE = "default"  # Name of the zone made of the top-level listener_location and notification_thresholds
+
+
+class Zone(BaseModel):
+    name: str  # Unique name of the zone, shown in its notifications
+    listener_location: ListenerLocation
+    notification_thresholds: NotificationThresholds
+    services: list[Notification] = Field(default_factory=list)  # Empty = the services of the notifications section
@@ -0,0 +1,75 @@
+import logging
+import os
+import time
+from pathlib import Path
+
+from settings import Settings, SETTINGS_FILE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class SettingsProvider:
+    """
+    Process-wide, cached access to the settings.
+
+    `config.yml` is parsed and validated once. Afterwards, reading `settings` only stats the file
+    (at most once every `check_interval` seconds) and re-loads it when its mtime or size changed.
+    The new Settings object is swapped in with a single assignment, so readers always see either
+    the old or the new settings, never a mix. An invalid file keeps the current settings in place.
+    """
+
+    def __init__(self, settings_file_path: Path = SETTINGS_FILE_PATH, check_interval: float = 2.0):
+        """
+        :param settings_file_path: Path of the config.yml file.
+        :param check_interval: Minimum number of seconds between two checks for changes.
+        """
+        self.settings_file_path = settings_file_path
+        self.check_interval = check_interval
+        self.reload_count = 0
+
+        self._settings: Settings | None = None
+        self._file_signature = None
+        self._next_check = 0.0
+
+    def _get_file_signature(self):
+        try:
+            stat = os.stat(self.settings_file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        settings = Settings.load_settings(self.settings_file_path)
+        self._file_signature = self._get_file_signature()
+        self._settings = settings
+
+    @property
+    def settings(self) -> Settings:
+        if self._settings is None:
+            self._load()
+            self._next_check = time.monotonic() + self.check_interval
+            return self._settings
+
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            if self._get_file_signature() != self._file_signature:
+                self.reload()
+
+        return self._settings
+
+    def reload(self):
+        """Re-read the settings file, keeping the current settings if it is not valid."""
+        try:
+            self._load()
+        except Exception as e:
+            # Do not retry the same broken file until it changes again.
+            self._file_signature = self._get_file_signature()
+            logger.exception(f"Invalid settings file, keeping the current settings: {e}")
+            return
+
+        self.reload_count += 1
+        logger.info(f"Settings reloaded from {self.settings_file_path} (reload #{self.reload_count}).")
+
+
+settings_provider = SettingsProvider()
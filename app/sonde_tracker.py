@@ -0,0 +1,301 @@
+import sys
+from collections import OrderedDict
+from datetime import datetime
+
+from descent_model import DescentTrack
+from radiosonde_payload import RadiosondePayload
+
+_NO_ZONES = frozenset()
+
+
+class SondeRecord:
+    """
+    The state of a tracked radiosonde: the payload fields used by the notifications, its notification flags
+    and its descent track. Without the track, a sixth of the size of a payload with its flags in sets.
+
+    The flags are frozensets of zone names, the empty one shared by every record, replaced by the tracker
+    when they change. The alert rules already notified are bits of the `rules` integer, see
+    `SondeTracker.rule_bit`.
+    """
+
+    __slots__ = ("callsign", "model", "freq", "latitude", "longitude", "altitude", "vel_v", "vel_h", "heading",
+                 "batt", "frame", "last_update", "notify", "landing_notify", "predicted_notify", "rules", "track")
+
+    # Fields copied from the payloads, and stored by the journal.
+    FIELDS = ("model", "freq", "latitude", "longitude", "altitude", "vel_v", "vel_h", "heading", "batt", "frame")
+
+    def __init__(self, callsign: str, last_update: datetime):
+        self.callsign = callsign
+        self.last_update = last_update
+        self.notify = _NO_ZONES  # Names of the zones in which the sonde was notified
+        self.landing_notify = _NO_ZONES
+        self.predicted_notify = _NO_ZONES
+        self.rules = 0  # Bits of the alert rules notified
+        self.track = DescentTrack()
+        self.frame = -1
+
+    def set_fields(self, fields):
+        """Copy FIELDS from a payload, or from any object with these attributes."""
+        self.model = fields.model
+        self.freq = fields.freq
+        self.latitude = fields.latitude
+        self.longitude = fields.longitude
+        self.altitude = fields.altitude
+        self.vel_v = fields.vel_v
+        self.vel_h = fields.vel_h
+        self.heading = fields.heading
+        self.batt = fields.batt
+        self.frame = fields.frame
+
+    @property
+    def location_tuple(self):
+        return self.latitude, self.longitude
+
+    @property
+    def is_descending(self):
+        return self.vel_v < 0
+
+    @property
+    def flagged(self) -> bool:
+        """Whether the sonde was notified in some zone, or by some alert rule."""
+        return bool(self.notify or self.landing_notify or self.predicted_notify or self.rules)
+
+    def nbytes(self) -> int:
+        """Memory held by the record, its descent track included."""
+        return (
+            sys.getsizeof(self)
+            + sum(sys.getsizeof(getattr(self, name)) for name in ("callsign", "last_update", *self.FIELDS))
+            + self.track.nbytes()
+        )
+
+
+def _entry_bytes() -> int:
+    """Memory of one entry of an OrderedDict, measured."""
+    entries = OrderedDict()
+    empty = sys.getsizeof(entries)
+    for index in range(1024):
+        entries[index] = None
+    return round((sys.getsizeof(entries) - empty) / 1024)
+
+
+_ENTRY_BYTES = _entry_bytes()
+_FLOAT_BYTES = sys.getsizeof(0.0)
+
+
+class SondeTracker:
+    """
+    Owner of the state of every tracked radiosonde.
+
+    Sondes near a zone have a SondeRecord. Sondes far from every zone, most of the MQTT firehose, only have
+    a "seen" entry with the time they were last seen, until they come closer. Both are kept in least
+    recently updated order, so expired seen entries are dropped from the front and, beyond `max_bytes`,
+    the least relevant sondes are evicted: seen entries first, then records without notification, oldest
+    first. The memory held is estimated as entries are added and removed, without walking the tracker.
+
+    The tracker is only ever used from the event loop thread and none of its methods awaits, so every
+    read-modify-write is atomic with respect to other coroutines. Packet handling and expiry therefore
+    never wait on each other and no lock is needed.
+    """
+
+    def __init__(self, max_bytes: float | None = None):
+        self.max_bytes = max_bytes
+        self._sondes = OrderedDict()  # Callsign: SondeRecord
+        self._seen = OrderedDict()  # Callsign: unix time it was last seen
+        self._record_bytes = {}  # Callsign: memory of its record, as estimated when added
+        self._records_bytes = 0
+        self._changed = {}  # Consumer: callsigns changed since its last `take_changes`
+        self._rule_names = []  # Names of the alert rules, by bit of SondeRecord.rules
+
+    def track_changes(self, consumer: str):
+        """Start recording which sondes change, for a consumer such as the journal."""
+        self._changed[consumer] = set()
+
+    def take_changes(self, consumer: str) -> set[str]:
+        """Return the callsigns added, changed or removed since the previous call of the consumer."""
+        changed, self._changed[consumer] = self._changed[consumer], set()
+        return changed
+
+    def give_back_changes(self, consumer: str, callsigns: set[str]):
+        """Return callsigns taken by a consumer that could not handle them, the next `take_changes` has them."""
+        self._changed[consumer].update(callsigns)
+
+    def _mark(self, callsign: str):
+        for changed in self._changed.values():
+            changed.add(callsign)
+
+    def __len__(self):
+        """Number of records, the sondes tracked near a zone. The seen entries are counted by `seen`."""
+        return len(self._sondes)
+
+    def __contains__(self, callsign: str):
+        return callsign in self._sondes
+
+    @property
+    def seen(self) -> int:
+        """Number of seen entries, the sondes only seen far from every zone."""
+        return len(self._seen)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Estimated memory held by the records and the seen entries."""
+        return (
+            self._records_bytes + len(self._sondes) * _ENTRY_BYTES
+            + len(self._seen) * (2 * _ENTRY_BYTES + _FLOAT_BYTES)  # Callsign strings counted as an entry
+        )
+
+    @property
+    def bytes_per_sonde(self) -> float:
+        """Estimated memory per record or seen entry."""
+        sondes = len(self._sondes) + len(self._seen)
+        return self.memory_bytes / sondes if sondes else 0.0
+
+    def get(self, callsign: str) -> SondeRecord | None:
+        return self._sondes.get(callsign)
+
+    def callsigns(self) -> list[str]:
+        """Snapshot of the callsigns of the records, safe to iterate while the tracker is modified."""
+        return list(self._sondes)
+
+    def _insert(self, record: SondeRecord):
+        self._seen.pop(record.callsign, None)
+        self._sondes[record.callsign] = record
+        size = record.nbytes()
+        self._records_bytes += size - self._record_bytes.get(record.callsign, 0)
+        self._record_bytes[record.callsign] = size
+        self._mark(record.callsign)
+
+    def add(self, model: RadiosondePayload, current_time: datetime) -> SondeRecord:
+        """Start a record for a sonde near a zone, replacing its seen entry."""
+        record = SondeRecord(model.callsign, current_time)
+        record.set_fields(model)
+        record.frame = -1  # Not handled yet, see `is_new_frame`
+        self._insert(record)
+        return record
+
+    def restore(self, record: SondeRecord):
+        """Put back a record loaded from the journal, its descent track starts over."""
+        self._insert(record)
+
+    def see(self, callsign: str, timestamp: float) -> bool:
+        """Record that a sonde far from every zone was seen, returns whether it is new."""
+        new = callsign not in self._seen
+        self._seen[callsign] = timestamp
+        if not new:
+            self._seen.move_to_end(callsign)
+        return new
+
+    def demote(self, callsign: str, timestamp: float):
+        """Replace the record of a sonde that went far from every zone with a seen entry."""
+        self._drop_record(callsign)
+        self._seen[callsign] = timestamp
+
+    def last_frame(self, callsign: str) -> int:
+        record = self._sondes.get(callsign)
+        return record.frame if record is not None else -1
+
+    def update(self, model: RadiosondePayload, current_time: datetime):
+        record = self._sondes[model.callsign]
+        self._sondes.move_to_end(model.callsign)
+        record.set_fields(model)
+        record.last_update = current_time
+        record.track.add(
+            current_time.timestamp(), model.latitude, model.longitude, model.altitude, model.vel_v, model.vel_h,
+            model.heading,
+        )
+        self._mark(model.callsign)
+
+    def is_new_frame(self, model: RadiosondePayload) -> bool:
+        return model.frame != self.last_frame(model.callsign)
+
+    def set_notify(self, callsign: str, zone: str, notify: bool):
+        record = self._sondes[callsign]
+        if notify:
+            record.notify = record.notify | {zone}
+        else:
+            record.notify = record.notify - {zone} or _NO_ZONES
+        self._mark(callsign)
+
+    def set_landing_notify(self, callsign: str, zone: str, landing_notify: bool):
+        record = self._sondes[callsign]
+        if landing_notify:
+            record.landing_notify = record.landing_notify | {zone}
+        else:
+            record.landing_notify = record.landing_notify - {zone} or _NO_ZONES
+        self._mark(callsign)
+
+    def set_predicted_notify(self, callsign: str, zone: str, predicted_notify: bool):
+        record = self._sondes[callsign]
+        if predicted_notify:
+            record.predicted_notify = record.predicted_notify | {zone}
+        else:
+            record.predicted_notify = record.predicted_notify - {zone} or _NO_ZONES
+        self._mark(callsign)
+
+    def rule_bit(self, name: str) -> int:
+        """
+        The bit of an alert rule in SondeRecord.rules. Bits are never reassigned, so the records stay valid
+        when the rules are changed, reordered or removed.
+        """
+        try:
+            index = self._rule_names.index(name)
+        except ValueError:
+            index = len(self._rule_names)
+            self._rule_names.append(name)
+        return 1 << index
+
+    def rule_names(self, rules: int) -> list[str]:
+        """The names of the alert rules whose bits are set in `rules`."""
+        return [name for index, name in enumerate(self._rule_names) if rules >> index & 1]
+
+    def set_rule_notified(self, callsign: str, bit: int):
+        self._sondes[callsign].rules |= bit
+        self._mark(callsign)
+
+    def _drop_record(self, callsign: str):
+        if self._sondes.pop(callsign, None) is not None:
+            self._records_bytes -= self._record_bytes.pop(callsign)
+            self._mark(callsign)
+
+    def remove(self, callsign: str):
+        self._drop_record(callsign)
+        self._seen.pop(callsign, None)
+
+    def expire_seen(self, before: float) -> list[str]:
+        """Drop the seen entries not seen since the unix time `before`, returns their callsigns."""
+        expired = []
+        seen = self._seen
+        while seen:
+            callsign, timestamp = next(iter(seen.items()))
+            if timestamp >= before:
+                break
+            seen.popitem(last=False)
+            expired.append(callsign)
+        return expired
+
+    def evict(self) -> list[str]:
+        """
+        Evict the least relevant sondes until the estimated memory is below `max_bytes`, returns their callsigns.
+        """
+        if self.max_bytes is None or self.memory_bytes <= self.max_bytes:
+            return []
+
+        evicted = []
+        while self._seen and self.memory_bytes > self.max_bytes:
+            evicted.append(self._seen.popitem(last=False)[0])
+
+        # Records without notification first, then the oldest ones whatever their flags.
+        for flagged in (False, True):
+            excess = self.memory_bytes - self.max_bytes
+            if excess <= 0:
+                break
+            records = []
+            for callsign, record in self._sondes.items():
+                if record.flagged == flagged:
+                    records.append(callsign)
+                    excess -= self._record_bytes[callsign] + _ENTRY_BYTES
+                    if excess <= 0:
+                        break
+            for callsign in records:
+                self._drop_record(callsign)
+            evicted.extend(records)
+        return evicted
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, UTC
+from pathlib import Path
+
+from sonde_tracker import SondeRecord, SondeTracker
+
+logger = logging.getLogger(__name__)
+
+
+class TrackerJournal:
+    """
+    Keeps the state of a SondeTracker on disk, so a restart neither re-notifies nor forgets radiosondes.
+
+    The tracker only records which callsigns changed, which is O(1) on the hot path. Every
+    `flush_interval` seconds the latest state of the changed sondes is appended to a JSON lines journal,
+    one record per sonde however many frames it received, serialized and written on a worker thread.
+    Every `snapshot_interval` seconds the whole state is written to a snapshot and a new, empty journal
+    is started. The snapshot and its journal share a generation number, so a crash between the two
+    steps never replays an old journal over a newer snapshot.
+
+    A failed write, e.g. on a full disk, is logged and the sondes it held are written by the next flush.
+    """
+
+    CHANGES = "journal"  # Name of the journal as a consumer of the tracker changes
+
+    def __init__(self, tracker: SondeTracker, directory: Path, flush_interval: float = 2.0,
+                 snapshot_interval: float = 300.0):
+        self.tracker = tracker
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self._generation = 0
+        self._journal_file = None
+        self._writing = None  # Write in progress on a worker thread
+
+    @property
+    def _snapshot_path(self) -> Path:
+        return self.directory / "snapshot.json"
+
+    def _journal_path(self, generation: int) -> Path:
+        return self.directory / f"journal-{generation}.jsonl"
+
+    def _record(self, callsign: str) -> dict:
+        """The current state of a sonde, as stored on disk. Read on the event loop, serialized later."""
+        sonde = self.tracker.get(callsign)
+        if sonde is None:
+            return {"callsign": callsign, "removed": True}
+        return {
+            "callsign": callsign,
+            "notify": sorted(sonde.notify),
+            "landing_notify": sorted(sonde.landing_notify),
+            "predicted_notify": sorted(sonde.predicted_notify),
+            "rules": self.tracker.rule_names(sonde.rules),
+            "last_update": sonde.last_update.timestamp(),
+            "data": {name: getattr(sonde, name) for name in SondeRecord.FIELDS},
+        }
+
+    def _restore(self, record: dict):
+        callsign = record["callsign"]
+        if record.get("removed"):
+            self.tracker.remove(callsign)
+            return
+        sonde = SondeRecord(callsign, datetime.fromtimestamp(record["last_update"], UTC))
+        data = record["data"]
+        for name in SondeRecord.FIELDS:
+            setattr(sonde, name, data[name])
+        sonde.notify = frozenset(record["notify"])
+        sonde.landing_notify = frozenset(record["landing_notify"])
+        sonde.predicted_notify = frozenset(record["predicted_notify"])
+        for name in record["rules"]:
+            sonde.rules |= self.tracker.rule_bit(name)
+        self.tracker.restore(sonde)
+
+    def load(self) -> int:
+        """Restore the tracker from the snapshot and its journal, returns the number of restored sondes."""
+        if self._snapshot_path.exists():
+            with open(self._snapshot_path, "r", encoding="utf-8") as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            self._generation = snapshot["generation"]
+            for record in snapshot["sondes"]:
+                self._restore(record)
+
+        journal_path = self._journal_path(self._generation)
+        if journal_path.exists():
+            with open(journal_path, "r", encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Record cut short by a crash or a failed write.
+                    self._restore(record)
+        return len(self.tracker)
+
+    def _append(self, records: list[dict]):
+        if self._journal_file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._journal_file = open(self._journal_path(self._generation), "a", encoding="utf-8")
+        position = self._journal_file.tell()
+        try:
+            self._journal_file.write("".join(json.dumps(record) + "\n" for record in records))
+            self._journal_file.flush()
+        except OSError:
+            self._truncate(position)
+            raise
+
+    def _truncate(self, position: int):
+        """Close the journal after a failed append and cut off what was written of it."""
+        journal_file, self._journal_file = self._journal_file, None
+        try:
+            journal_file.close()  # Fails again flushing the rest of the records, but closes the file
+        except OSError:
+            pass
+        try:
+            os.truncate(journal_file.name, position)
+        except OSError as e:
+            logger.warning(f"Could not truncate the tracker journal after a failed write: {e}")
+
+    def _write_snapshot(self, records: list[dict]):
+        """Write the snapshot of the next generation, then switch to its journal."""
+        generation = self._generation + 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary_path = self._snapshot_path.with_suffix(".tmp")
+        with open(temporary_path, "w", encoding="utf-8") as snapshot_file:
+            json.dump({"generation": generation, "sondes": records}, snapshot_file)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, self._snapshot_path)
+
+        previous, self._generation = self._generation, generation
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        self._journal_path(previous).unlink(missing_ok=True)
+
+    async def _in_thread(self, write, records: list[dict], changes: set[str]):
+        """
+        Run a write on a worker thread. If it fails, or may not have completed, the changed callsigns are
+        given back to the tracker, for the next flush.
+        """
+        written = False
+        try:
+            # Shielded, so a cancellation never leaves a write running while the final flush starts.
+            self._writing = asyncio.ensure_future(asyncio.to_thread(write, records))
+            await asyncio.shield(self._writing)
+            written = True
+        except OSError as e:
+            logger.error(f"Could not write the tracker state to {self.directory}, retrying with the next flush: {e}")
+        finally:
+            if not written:
+                self.tracker.give_back_changes(self.CHANGES, changes)
+
+    async def flush(self):
+        """Append the changed sondes to the journal, on a worker thread."""
+        changes = self.tracker.take_changes(self.CHANGES)
+        records = [self._record(callsign) for callsign in changes]
+        if records:
+            await self._in_thread(self._append, records, changes)
+
+    async def snapshot(self):
+        """Write every tracked sonde to a new snapshot, on a worker thread."""
+        changes = self.tracker.take_changes(self.CHANGES)
+        records = [self._record(callsign) for callsign in self.tracker.callsigns()]
+        await self._in_thread(self._write_snapshot, records, changes)
+
+    async def run(self):
+        """Periodically flush the journal and compact it, until cancelled, then flush what is left."""
+        loop = asyncio.get_running_loop()
+        next_snapshot = loop.time() + self.snapshot_interval
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                if loop.time() >= next_snapshot:
+                    await self.snapshot()
+                    next_snapshot = loop.time() + self.snapshot_interval
+                else:
+                    await self.flush()
+        finally:
+            if self._writing is not None and not self._writing.done():
+                await asyncio.wait([self._writing])
+            records = [self._record(callsign) for callsign in self.tracker.take_changes(self.CHANGES)]
+            if records:
+                try:
+                    self._append(records)
+                except OSError as e:
+                    logger.error(f"Could not write the last {len(records)} changes of the tracker state: {e}")
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
@@ -1,15 +1,17 @@
-import apprise
-import asyncio
-from geopy import distance
-
+from descent_model import LandingPrediction
+from notification_dispatcher import notification_dispatcher
+from geofence import geodesic_km
 from radiosonde_payload import RadiosondePayload
-from settings import Settings
+from settings.notifications import Notification
+from settings.rules import Rule
+from settings.zone import DEFAULT_ZONE, Zone
+from settings_provider import settings_provider
 
 
 class Utils:
     @staticmethod
     def get_distance(listener_coordinates, radiosonde_coordinates):
-        return distance.distance(listener_coordinates, radiosonde_coordinates).km
+        return geodesic_km(listener_coordinates, radiosonde_coordinates)
 
     @staticmethod
     def is_within_range(listener_coordinates, radiosonde_coordinates, range_km):
@@ -17,19 +19,18 @@ class Utils:
         return distance_from_listener <= range_km
 
     @staticmethod
-    async def send_notification(message_body, title):
-        settings = Settings.load_settings()
-
-        notifier = apprise.Apprise()
-
-        for service in settings.notifications.services:
-            if service.enabled:
-                notifier.add(service.url)
+    def send_notification(message_body, title, zone: Zone | None = None, services: list[Notification] | None = None):
+        # Queue the notification for the enabled services of the zone, delivery happens in the dispatcher workers.
+        # `services` replaces those of the zone, by default the services of the notifications section.
+        if zone is not None:
+            services = services or zone.services or None
+            if zone.name != DEFAULT_ZONE:
+                title = f"{title} [{zone.name}]"
+        notification_dispatcher.submit(title, message_body, services)
 
-        # notify all the services loaded into our Apprise object.
-        asyncio.create_task(
-            notifier.async_notify(body=message_body, title=title)
-        )
+    @staticmethod
+    def _zone(zone: Zone | None) -> Zone:
+        return zone if zone is not None else settings_provider.settings.all_zones[0]
 
     @staticmethod
     def map_mqtt_json_to_radiosonde_payload(json_payload: dict):
@@ -97,8 +98,16 @@ class Utils:
         )
 
     @staticmethod
-    async def send_landing_notification(packet: RadiosondePayload):
-        settings = Settings.load_settings()
+    def format_prediction(prediction: LandingPrediction) -> str:
+        minutes, seconds = divmod(round(prediction.eta_seconds), 60)
+        return f"{round(prediction.latitude, 5)}, {round(prediction.longitude, 5)} in about {minutes} min {seconds} s"
+
+    @staticmethod
+    def send_landing_notification(packet: RadiosondePayload, distance_km: float | None = None,
+                                  zone: Zone | None = None):
+        zone = Utils._zone(zone)
+        if distance_km is None:
+            distance_km = Utils.get_distance(zone.listener_location.location_tuple, packet.location_tuple)
 
         message_body = f"""
 The radiosonde is nearing its landing site! Based on the latest telemetry data, here is a detailed update:
@@ -106,7 +115,7 @@ The radiosonde is nearing its landing site! Based on the latest telemetry data,
 📍 **Landing Prediction**:
 - **Location**: {packet.latitude}, {packet.longitude}
 - **Last Known Altitude**: {packet.altitude} meters
-- **Distance from Listener**: {round(Utils.get_distance(settings.listener_location.location_tuple, packet.location_tuple), 2)} km
+- **Distance from Listener**: {round(distance_km, 2)} km
 
 📊 **Radiosonde Details**:
 - **Callsign**: {packet.callsign}
@@ -121,19 +130,53 @@ Click the link to view the location on [Google Maps](https://www.google.com/maps
 If you're planning retrieval, ensure you have the necessary equipment and safety precautions. The area might be remote or challenging to access.
 """
 
-        await Utils.send_notification(message_body, "🚨 Radiosonde Alert 🚨")
+        Utils.send_notification(message_body, "🚨 Radiosonde Alert 🚨", zone)
 
     @staticmethod
-    async def send_threshold_notification(packet: RadiosondePayload):
-        settings = Settings.load_settings()
+    def send_threshold_notification(packet: RadiosondePayload, distance_km: float | None = None,
+                                    prediction: LandingPrediction | None = None, zone: Zone | None = None):
+        zone = Utils._zone(zone)
+        thresholds = zone.notification_thresholds
+        if distance_km is None:
+            distance_km = Utils.get_distance(zone.listener_location.location_tuple, packet.location_tuple)
+        predicted_landing = ""
+        if prediction is not None:
+            predicted_landing = f"\n- **Predicted Landing**: {Utils.format_prediction(prediction)}"
 
         message_body = f"""
-The radiosonde is within {settings.notification_thresholds.distance_km} km and below {settings.notification_thresholds.altitude_meters} meters altitude.
+The radiosonde is within {thresholds.distance_km} km and below {thresholds.altitude_meters} meters altitude.
 
 📍 **Landing Prediction**:
 - **Location**: {packet.latitude}, {packet.longitude}
 - **Last Known Altitude**: {packet.altitude} meters
-- **Distance from Listener**: {round(Utils.get_distance(settings.listener_location.location_tuple, packet.location_tuple), 2)} km
+- **Distance from Listener**: {round(distance_km, 2)} km{predicted_landing}
+
+📊 **Radiosonde Details**:
+- **Callsign**: {packet.callsign}
+- **Model**: {packet.model}
+- **Frequency**: {packet.freq}
+- **Battery**: {packet.batt} V
+- **Last Known Speed**: {packet.vel_v} m/s
+
+Click the link to view the location on [Google Maps](https://www.google.com/maps?q={packet.latitude},{packet.longitude})
+"""
+
+        Utils.send_notification(message_body, "🚨 Radiosonde Alert 🚨", zone)
+
+    @staticmethod
+    def send_predicted_landing_notification(packet: RadiosondePayload, prediction: LandingPrediction,
+                                            zone: Zone | None = None):
+        zone = Utils._zone(zone)
+        distance_km = Utils.get_distance(zone.listener_location.location_tuple, prediction.location_tuple)
+
+        message_body = f"""
+The radiosonde is predicted to land within {zone.notification_thresholds.distance_km} km.
+
+📍 **Landing Prediction**:
+- **Predicted Location**: {Utils.format_prediction(prediction)}
+- **Predicted Distance from Listener**: {round(distance_km, 2)} km
+- **Current Location**: {packet.latitude}, {packet.longitude}
+- **Current Altitude**: {packet.altitude} meters
 
 📊 **Radiosonde Details**:
 - **Callsign**: {packet.callsign}
@@ -142,7 +185,55 @@ The radiosonde is within {settings.notification_thresholds.distance_km} km and b
 - **Battery**: {packet.batt} V
 - **Last Known Speed**: {packet.vel_v} m/s
 
+Click the link to view the predicted landing point on [Google Maps](https://www.google.com/maps?q={prediction.latitude},{prediction.longitude})
+"""
+
+        Utils.send_notification(message_body, "🪂 Radiosonde Landing Prediction 🪂", zone)
+
+    @staticmethod
+    def describe_rule(rule: Rule) -> str:
+        conditions = []
+        if rule.burst:
+            conditions.append("burst")
+        elif rule.descending is not None:
+            conditions.append("descending" if rule.descending else "ascending")
+        if rule.max_distance_km is not None:
+            conditions.append(f"within {rule.max_distance_km} km")
+        if rule.min_altitude_meters is not None:
+            conditions.append(f"above {rule.min_altitude_meters} meters")
+        if rule.max_altitude_meters is not None:
+            conditions.append(f"below {rule.max_altitude_meters} meters")
+        if rule.max_battery_volts is not None:
+            conditions.append(f"battery below {rule.max_battery_volts} V")
+        if rule.models:
+            conditions.append(f"model {', '.join(rule.models)}")
+        if rule.subtypes:
+            conditions.append(f"subtype {', '.join(rule.subtypes)}")
+        return ", ".join(conditions) or "any radiosonde"
+
+    @staticmethod
+    def send_rule_notification(packet: RadiosondePayload, rule: Rule, zone: Zone, distance_km: float,
+                               prediction: LandingPrediction | None = None):
+        predicted_landing = ""
+        if prediction is not None:
+            predicted_landing = f"\n- **Predicted Landing**: {Utils.format_prediction(prediction)}"
+
+        message_body = f"""
+The radiosonde matches the rule **{rule.name}**: {Utils.describe_rule(rule)}.
+
+📍 **Position**:
+- **Location**: {packet.latitude}, {packet.longitude}
+- **Altitude**: {packet.altitude} meters
+- **Distance from Listener**: {round(distance_km, 2)} km{predicted_landing}
+
+📊 **Radiosonde Details**:
+- **Callsign**: {packet.callsign}
+- **Model**: {packet.model} {packet.subtype}
+- **Frequency**: {packet.freq}
+- **Battery**: {packet.batt} V
+- **Vertical Speed**: {packet.vel_v} m/s
+
 Click the link to view the location on [Google Maps](https://www.google.com/maps?q={packet.latitude},{packet.longitude})
 """
 
-        await Utils.send_notification(message_body, "🚨 Radiosonde Alert 🚨")
+        Utils.send_notification(message_body, f"📡 Radiosonde Rule: {rule.name} 📡", zone, rule.services or None)
@@ -0,0 +1,78 @@
+import math
+
+from geofence import Geofence
+
+# Size of the grid cells, in degrees. Zones are tens of kilometers wide, so they cover only a few cells.
+_CELL_DEGREES = 1.0
+_CELLS_PER_TURN = int(360 / _CELL_DEGREES)
+_MIN_KM_PER_DEGREE_LAT = 110.574
+_KM_PER_DEGREE_LON_AT_EQUATOR = 111.320
+
+
+def _cell(latitude: float, longitude: float) -> tuple[int, int]:
+    return math.floor(latitude / _CELL_DEGREES), math.floor(longitude / _CELL_DEGREES) % _CELLS_PER_TURN
+
+
+class ZoneIndex:
+    """
+    Grid spatial index of circular zones, each checked by its own Geofence.
+
+    Every zone is registered in the grid cells its bounding box overlaps, so matching a position looks
+    up one cell and evaluates only the few zones registered there, whatever the number of zones. On the
+    MQTT firehose the cell of most sondes is empty and the lookup is a single dict miss.
+    """
+
+    def __init__(self, areas: list[tuple]):
+        """
+        :param areas: (key, (latitude, longitude), range_km) of every zone.
+        """
+        self.geofences = {key: Geofence(home, range_km) for key, home, range_km in areas}
+        self._cells = {}
+        for key, home, range_km in areas:
+            for cell in self._covered_cells(home, range_km):
+                self._cells.setdefault(cell, []).append(key)
+
+    @staticmethod
+    def _covered_cells(home: tuple[float, float], range_km: float):
+        latitude, longitude = home
+        delta_lat = range_km / _MIN_KM_PER_DEGREE_LAT
+        south = max(latitude - delta_lat, -90.0)
+        north = min(latitude + delta_lat, 90.0)
+
+        # Longitudes shrink towards the poles, the widest span is at the latitude farthest from the equator.
+        cos_latitude = math.cos(math.radians(max(abs(south), abs(north))))
+        if cos_latitude * _KM_PER_DEGREE_LON_AT_EQUATOR * 180.0 <= range_km:
+            lon_cells = range(_CELLS_PER_TURN)
+        else:
+            delta_lon = range_km / (_KM_PER_DEGREE_LON_AT_EQUATOR * cos_latitude)
+            west = math.floor((longitude - delta_lon) / _CELL_DEGREES)
+            east = math.floor((longitude + delta_lon) / _CELL_DEGREES)
+            lon_cells = [cell % _CELLS_PER_TURN for cell in range(west, east + 1)]
+
+        for lat_cell in range(math.floor(south / _CELL_DEGREES), math.floor(north / _CELL_DEGREES) + 1):
+            for lon_cell in lon_cells:
+                yield lat_cell, lon_cell
+
+    def candidates(self, location: tuple[float, float]) -> list:
+        """Keys of the zones that may contain `location`."""
+        return self._cells.get(_cell(*location), ())
+
+    def match(self, callsign: str, location: tuple[float, float]) -> list:
+        """Keys of the zones containing the position of a radiosonde, cached per callsign by the geofences."""
+        return [
+            key for key in self._cells.get(_cell(*location), ())
+            if self.geofences[key].is_within_range(callsign, location)
+        ]
+
+    def match_location(self, location: tuple[float, float]) -> list:
+        """Keys of the zones containing `location`, without caching."""
+        return [key for key in self._cells.get(_cell(*location), ()) if self.geofences[key].contains(location)]
+
+    def contains(self, location: tuple[float, float]) -> bool:
+        """Check whether any zone contains `location`, without caching."""
+        return any(self.geofences[key].contains(location) for key in self._cells.get(_cell(*location), ()))
+
+    def forget(self, callsign: str):
+        """Drop the cached results of a radiosonde that is no longer tracked."""
+        for geofence in self.geofences.values():
+            geofence.forget(callsign)
@@ -0,0 +1,71 @@
+"""
+Benchmark: packets/s of each payload decoder, for each source format.
+
+Uses synthetic sample packets, or the messages of a capture file recorded with the `capture` setting.
+
+Usage: python benchmarks/bench_decoders.py [--packets 20000] [--capture CAPTURE.bin.gz]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import sample_packets  # noqa: E402
+from capture import read_capture  # noqa: E402
+from decoders.decoder_repo import DecoderRepo  # noqa: E402
+from listeners.geojson_stream import FeatureStreamParser  # noqa: E402
+from settings.decoder_types import DecoderType  # noqa: E402
+
+DECODE_METHODS = {
+    "udp": "decode_udp",
+    "mqtt": "decode_mqtt",
+    "web": "decode_web",
+}
+
+
+def load_capture(path: Path, limit: int) -> dict:
+    """Group up to `limit` recorded messages per source, web export bodies are split into features."""
+    packets = {kind: [] for kind in DECODE_METHODS}
+    for _, source, data in read_capture(path):
+        kind = source.value.lower()
+        if kind == "web":
+            parser = FeatureStreamParser()
+            packets[kind].extend(parser.feed(data) + parser.close())
+        else:
+            packets[kind].append(data)
+    return {kind: messages[:limit] for kind, messages in packets.items() if messages}
+
+
+def bench(packets, decode) -> float:
+    start = time.perf_counter()
+    for packet in packets:
+        decode(packet)
+    return len(packets) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--packets", type=int, default=20_000)
+    parser.add_argument("--capture", type=Path, help="Benchmark on the messages of a capture file")
+    args = parser.parse_args()
+
+    if args.capture:
+        recorded = load_capture(args.capture, args.packets)
+    else:
+        recorded = {kind: sample_packets.generate(kind, args.packets) for kind in DECODE_METHODS}
+
+    print(f"{'source':<8}" + "".join(f"{decoder_type.value:>16}" for decoder_type in DecoderType))
+    for kind, packets in recorded.items():
+        method = DECODE_METHODS[kind]
+        rates = [
+            bench(packets, getattr(DecoderRepo.get_decoder(decoder_type), method))
+            for decoder_type in DecoderType
+        ]
+        print(f"{kind:<8}" + "".join(f"{rate:>12,.0f} p/s" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
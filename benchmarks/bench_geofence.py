@@ -0,0 +1,62 @@
+"""
+Micro-benchmark: geofence prefilter vs. the plain geopy geodesic.
+
+Simulates the MQTT firehose, where almost every sonde is far away from home, and compares
+`Utils.is_within_range` with `Geofence.is_within_range`.
+
+Usage: python benchmarks/bench_geofence.py [--packets 50000] [--range-km 20]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from geofence import Geofence  # noqa: E402
+from utils import Utils  # noqa: E402
+
+HOME = (45.4642, 9.19)
+
+
+def generate_packets(count: int, near_ratio: float):
+    random.seed(42)
+    packets = []
+    for i in range(count):
+        if random.random() < near_ratio:
+            location = (HOME[0] + random.uniform(-0.5, 0.5), HOME[1] + random.uniform(-0.5, 0.5))
+        else:
+            location = (random.uniform(-70, 70), random.uniform(-180, 180))
+        packets.append((f"S{i % 2000}", location))
+    return packets
+
+
+def bench(name, func, packets):
+    start = time.perf_counter()
+    hits = sum(1 for callsign, location in packets if func(callsign, location))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {len(packets) / elapsed:>12,.0f} packets/s  ({hits} in range)")
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--packets", type=int, default=50_000)
+    parser.add_argument("--range-km", type=float, default=20.0)
+    parser.add_argument("--near-ratio", type=float, default=0.02)
+    args = parser.parse_args()
+
+    packets = generate_packets(args.packets, args.near_ratio)
+    geofence = Geofence(HOME, args.range_km)
+
+    expected = bench("geopy (current path)", lambda _, loc: Utils.is_within_range(HOME, loc, args.range_km), packets)
+    actual = bench("Geofence", geofence.is_within_range, packets)
+    bench("Geofence (cached repeat)", geofence.is_within_range, packets)
+
+    if expected != actual:
+        print(f"WARNING: results differ ({expected} vs {actual})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: messages/s of the MQTT listener, decoding on the event loop vs in worker processes.
+
+Feeds a synthetic sondehub firehose to AsyncMqttListener, as the aiomqtt message iterator would,
+and measures how long it takes until every message has been decoded and the relevant ones passed
+to the callback. Uses the location and thresholds in data/config.yml.
+
+Usage: python benchmarks/bench_mqtt_workers.py [--messages 200000] [--workers 0 1 2 4] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from listeners.mqtt_listener import AsyncMqttListener  # noqa: E402
+from settings_provider import settings_provider  # noqa: E402
+
+import synthetic_firehose  # noqa: E402
+
+
+def _decoded(listener: AsyncMqttListener) -> float:
+    return listener._packets_parsed.value + listener._packets_rejected.value
+
+
+async def feed(listener: AsyncMqttListener, messages: list[bytes]):
+    """Feed the messages to the listener in worker mode, until they are all decoded."""
+    decoded = _decoded(listener)
+    for message in messages:
+        await listener._add_to_batch(message)
+    await listener._submit_batch()
+    while _decoded(listener) - decoded < len(messages):
+        await asyncio.sleep(0.001)
+
+
+async def bench(messages: list[bytes], workers: int) -> tuple[float, int]:
+    handled = 0
+
+    async def callback(model):
+        nonlocal handled
+        handled += 1
+
+    listener = AsyncMqttListener(settings_provider, callback)
+    if not workers:
+        started = time.perf_counter()
+        for message in messages:
+            await listener._handle_packet(message)
+        return len(messages) / (time.perf_counter() - started), handled
+
+    listener._start_workers(workers)
+    # Spawning the worker processes is not part of the measure.
+    await feed(listener, messages[:workers * 10_000])
+    handled = 0
+
+    started = time.perf_counter()
+    await feed(listener, messages)
+    rate = len(messages) / (time.perf_counter() - started)
+
+    await listener._stop_workers()
+    return rate, handled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({0, 1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    settings = settings_provider.settings
+    settings.mqtt_listener.batch_size = args.batch_size
+    home = settings.listener_location.location_tuple
+    messages = [
+        message for _, message in
+        itertools.islice(synthetic_firehose.generate(5000, 3600, home), args.messages)
+    ]
+
+    print(f"{len(messages)} messages, {os.cpu_count()} CPUs")
+    for workers in args.workers:
+        rate, handled = asyncio.run(bench(messages, workers))
+        print(f"workers={workers:<3} {rate:>12,.0f} messages/s  {handled} passed to the callback")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Micro-benchmark: compiled alert rules vs. checking every condition of every rule, in the configured order.
+
+Sondes descend near home with random fields, and every rule is checked for every packet. The naive path
+checks the conditions in the order they are written, distance first (geopy), and keeps no per-sonde state;
+the compiled RuleSet checks the cheap fields first and skips the rules already notified for the sonde.
+
+Usage: python benchmarks/bench_rules.py [--packets 5000] [--rules 1,10,50]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from alert_rules import RuleSet  # noqa: E402
+from decoders.field_mapping import mqtt_fields  # noqa: E402
+from radiosonde_payload import RadiosondePayload  # noqa: E402
+from settings import Settings  # noqa: E402
+from sonde_tracker import SondeTracker  # noqa: E402
+from utils import Utils  # noqa: E402
+
+HOME = (45.4642, 9.19)
+MODELS = ("RS41", "RS41", "RS41", "M10", "DFM", "RS92")
+
+
+def generate_packets(count: int, sondes: int = 200):
+    random.seed(42)
+    packets = []
+    for i in range(count):
+        packets.append(RadiosondePayload.model_validate(mqtt_fields({
+            "serial": f"S{i % sondes}",
+            "lat": HOME[0] + random.uniform(-0.6, 0.6),
+            "lon": HOME[1] + random.uniform(-0.6, 0.6),
+            "alt": random.uniform(0, 30000),
+            "vel_v": random.uniform(-20, 5),
+            "batt": random.uniform(2.0, 3.3),
+            "type": random.choice(MODELS),
+            "frame": i,
+        })))
+    return packets
+
+
+def generate_rules(count: int) -> list[dict]:
+    random.seed(7)
+    rules = []
+    for i in range(count):
+        rule = {"name": f"rule-{i}", "max_distance_km": random.choice((10, 20, 50)), "descending": True}
+        kind = i % 4
+        if kind == 0:
+            rule["max_altitude_meters"] = random.choice((1000, 2000, 5000))
+        elif kind == 1:
+            rule["max_battery_volts"] = 2.3
+        elif kind == 2:
+            rule["models"] = ["RS92"]
+        else:
+            rule["min_altitude_meters"], rule["max_altitude_meters"] = 1000, 3000
+        rules.append(rule)
+    return rules
+
+
+def naive_match(rule, model: RadiosondePayload) -> bool:
+    if rule.max_distance_km is not None and not Utils.is_within_range(HOME, model.location_tuple, rule.max_distance_km):
+        return False
+    if rule.descending and not model.is_descending:
+        return False
+    if rule.max_altitude_meters is not None and model.altitude >= rule.max_altitude_meters:
+        return False
+    if rule.min_altitude_meters is not None and model.altitude <= rule.min_altitude_meters:
+        return False
+    if rule.max_battery_volts is not None and not 0 <= model.batt < rule.max_battery_volts:
+        return False
+    return not rule.models or model.model in rule.models
+
+
+def bench(name: str, func, packets) -> int:
+    start = time.perf_counter()
+    matches = sum(func(model) for model in packets)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<36} {len(packets) / elapsed:>12,.0f} packets/s  ({matches} matches)")
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--packets", type=int, default=5_000)
+    parser.add_argument("--rules", default="1,10,50")
+    args = parser.parse_args()
+
+    packets = generate_packets(args.packets)
+    for count in (int(value) for value in args.rules.split(",")):
+        data = Settings.get_default_settings().model_dump()
+        data["listener_location"] = {"latitude": HOME[0], "longitude": HOME[1], "altitude": 0}
+        data["rules"] = generate_rules(count)
+        settings = Settings(**data)
+        zones = {zone.name: zone for zone in settings.all_zones}
+
+        print(f"{count} rules:")
+        bench("  naive, every rule", lambda model: sum(naive_match(rule, model) for rule in settings.rules), packets)
+
+        tracker = SondeTracker()
+        rule_set = RuleSet(settings.rules, zones, tracker)
+        now = datetime.now(UTC)
+        for model in packets:
+            if tracker.get(model.callsign) is None:
+                tracker.add(model, now)
+        # `match` leaves the records untouched, no rule is notified yet.
+        bench("  compiled, every rule", lambda model: len(rule_set.match(model, tracker.get(model.callsign))), packets)
+
+        def match_once(model):
+            matched = rule_set.match(model, tracker.get(model.callsign))
+            for rule in matched:
+                tracker.set_rule_notified(model.callsign, rule.bit)
+            return len(matched)
+
+        bench("  compiled, once per sonde", match_once, packets)
+
+
+if __name__ == "__main__":
+    main()
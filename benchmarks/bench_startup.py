@@ -0,0 +1,90 @@
+"""
+Benchmark: cold import time and memory of the application, per listener type.
+
+Every scenario runs in a fresh interpreter: it imports the main listener, resolves the listener classes of
+the scenario through ListenerRepo and, for the notification scenario, builds an Apprise service. It reports
+the import time, the peak RSS, and which heavy libraries ended up loaded.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--top 15]
+  --top N also prints the N slowest imports (cumulative, from `python -X importtime`) of a UDP start.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_PATH = Path(__file__).parent.parent / "app"
+HEAVY_MODULES = ("aiohttp", "aiomqtt", "apprise", "geopy", "requests")
+
+SCENARIOS = {
+    "UDP": "ListenerRepo.get_listener(ListenerType.UDP)",
+    "WEB": "ListenerRepo.get_listener(ListenerType.WEB)",
+    "MQTT": "ListenerRepo.get_listener(ListenerType.MQTT)",
+    "UDP + notification": (
+        "ListenerRepo.get_listener(ListenerType.UDP); "
+        "from notification_dispatcher import _Service; from settings.notifications import Notification; "
+        "_Service(Notification(url='json://localhost'))"
+    ),
+}
+
+_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+from radiosonde_auto_rx_listener import AsyncRadiosondeAutoRxListener
+from listeners.listener_repo import ListenerRepo
+from settings.listener_types import ListenerType
+{scenario}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def probe(scenario: str) -> dict:
+    code = _PROBE.format(scenario=scenario, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=APP_PATH, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def slowest_imports(scenario: str, top: int) -> list[tuple[int, str]]:
+    code = _PROBE.format(scenario=scenario, heavy=HEAVY_MODULES)
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=APP_PATH, capture_output=True, text=True, check=True
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.rstrip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0)
+    args = parser.parse_args()
+
+    for label, scenario in SCENARIOS.items():
+        results = [probe(scenario) for _ in range(args.runs)]
+        seconds = statistics.median(result["seconds"] for result in results)
+        rss = statistics.median(result["rss_mib"] for result in results)
+        modules = ", ".join(results[-1]["modules"]) or "-"
+        print(f"{label:<20} {seconds * 1000:>8.1f} ms  {rss:>7.1f} MiB RSS  loaded: {modules}")
+
+    if args.top:
+        print(f"\nSlowest imports of a UDP start (cumulative):")
+        for cumulative, name in slowest_imports(SCENARIOS["UDP"], args.top):
+            print(f"{cumulative / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: web listener poll against a local stand-in of the radiosondy export.
+
+Compares the previous approach (new session per poll, whole body loaded with `response.json()`)
+with `AsyncWebListener` (pooled session, conditional GET, streamed features), reporting time per
+poll and peak Python memory of the parsing. A full download of an export whose features didn't
+change measures the fingerprint diffing, which skips decoding them.
+
+Usage: python benchmarks/bench_web_listener.py [--features 20000] [--polls 5]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_radiosondy_server import FakeRadiosondyExport  # noqa: E402
+from listeners.web_listener import AsyncWebListener  # noqa: E402
+from settings_provider import settings_provider  # noqa: E402
+from utils import Utils  # noqa: E402
+
+
+async def count_callback(counter, _):
+    counter[0] += 1
+
+
+async def poll_previous(url, counter):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            data = await response.json()
+    for payload in list(map(Utils.map_web_json_to_radiosonde_payload, data["features"])):
+        await count_callback(counter, payload)
+
+
+async def run(label, polls, poll):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(polls):
+        await poll()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed / polls * 1000:>8.1f} ms/poll  peak {peak / 1024 / 1024:>7.1f} MiB")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=20_000)
+    parser.add_argument("--polls", type=int, default=5)
+    args = parser.parse_args()
+
+    export = FakeRadiosondyExport(args.features, change_every=0)
+    runner = web.AppRunner(export.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/export/export_map.php?live_map=1"
+
+    counter = [0]
+    await run("previous (json, new session)", args.polls, lambda: poll_previous(url, counter))
+
+    settings = settings_provider.settings
+    settings.web_listener.url = url
+    listener = AsyncWebListener(settings_provider, lambda payload: count_callback(counter, payload))
+    listener._session = listener._create_session()
+
+    # Force a full download and decode on every poll to compare parsing, then measure diffed and conditional polls.
+    async def full_poll():
+        listener._etag = listener._last_modified = None
+        listener._fingerprints = {}
+        await listener._make_request()
+
+    async def unchanged_poll():
+        listener._etag = listener._last_modified = None
+        await listener._make_request()
+
+    await run("streamed, pooled session", args.polls, full_poll)
+    await run("unchanged features (diffed)", args.polls, unchanged_poll)
+    await run("conditional poll (304)", args.polls, listener._make_request)
+    print(f"requests: {export.requests}, not modified: {export.not_modified}, callbacks: {counter[0]}")
+
+    await listener._session.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
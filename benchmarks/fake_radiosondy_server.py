@@ -0,0 +1,103 @@
+"""
+Local stand-in for the radiosondy GeoJSON export, for testing and benchmarking the web listener.
+
+Serves a synthetic FeatureCollection with the same property format as export_map.php, with an ETag,
+Last-Modified and optional gzip encoding. Every `--change-every` seconds the positions are updated and
+the validators change; in between, conditional requests get a 304.
+
+Usage: python benchmarks/fake_radiosondy_server.py [--port 8080] [--features 5000] [--change-every 10]
+Then set `web_listener.url` to http://127.0.0.1:8080/export/export_map.php?live_map=1
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import time
+from email.utils import formatdate
+
+from aiohttp import web
+
+
+def generate_features(count: int, seed: int):
+    rng = random.Random(seed)
+    features = []
+    for i in range(count):
+        latitude = rng.uniform(-70, 70)
+        longitude = rng.uniform(-180, 180)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+            "properties": {
+                "id": f"S{i:07d}",
+                "type": "RS41-SGP",
+                "frequency": f"{rng.uniform(400, 406):.3f} MHz",
+                "climbing": f"{rng.uniform(-30, 6):.1f} m/s",
+                "speed": f"{rng.uniform(0, 120):.1f} km/h",
+                "altitude": f"{rng.randint(0, 35000)} m",
+                "latitude": f"{latitude:.5f}",
+                "longitude": f"{longitude:.5f}",
+                "course": f"{rng.randint(0, 359)} °",
+            },
+        })
+    return features
+
+
+class FakeRadiosondyExport:
+    def __init__(self, features: int, change_every: float):
+        self.features = features
+        self.change_every = change_every
+        self.requests = 0
+        self.not_modified = 0
+        self._version = None
+        self._body = b""
+        self._gzip_body = b""
+        self._etag = ""
+        self._last_modified = ""
+
+    def _refresh(self):
+        version = int(time.time() // self.change_every) if self.change_every > 0 else 0
+        if version == self._version:
+            return
+
+        self._version = version
+        self._body = json.dumps(
+            {"type": "FeatureCollection", "features": generate_features(self.features, version)}
+        ).encode()
+        self._gzip_body = gzip.compress(self._body, compresslevel=5)
+        self._etag = f'"{hashlib.md5(self._body).hexdigest()}"'
+        self._last_modified = formatdate(time.time(), usegmt=True)
+
+    async def handle(self, request: web.Request):
+        self.requests += 1
+        self._refresh()
+
+        if request.headers.get("If-None-Match") == self._etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": self._etag})
+
+        headers = {"ETag": self._etag, "Last-Modified": self._last_modified, "Content-Type": "application/json"}
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return web.Response(body=self._gzip_body, headers=headers)
+        return web.Response(body=self._body, headers=headers)
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/export/export_map.php", self.handle)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--features", type=int, default=5000)
+    parser.add_argument("--change-every", type=float, default=10.0)
+    args = parser.parse_args()
+
+    web.run_app(FakeRadiosondyExport(args.features, args.change_every).create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Replay harness: feeds recorded (or synthetic) inbound messages through the real hot path and reports
+throughput, handling latency, memory and notification counts.
+
+Every message goes through the listener of its source (`handle_raw`: decoding, callback) and
+`AsyncRadiosondeAutoRxListener.handle_payload_summary`, using the settings in data/config.yml.
+Notifications are counted, never sent.
+
+Usage:
+  python benchmarks/replay.py CAPTURE.bin.gz [--speed 1]    # 1x, Nx, or 0 for as fast as possible
+  python benchmarks/replay.py --synthetic 2000 [--duration 600] [--speed 0]
+"""
+import argparse
+import asyncio
+import logging
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from capture import read_capture  # noqa: E402
+from listeners.listener_repo import ListenerRepo  # noqa: E402
+from notification_dispatcher import notification_dispatcher  # noqa: E402
+from radiosonde_auto_rx_listener import AsyncRadiosondeAutoRxListener  # noqa: E402
+from settings.listener_types import ListenerType  # noqa: E402
+from settings_provider import settings_provider  # noqa: E402
+
+import synthetic_firehose  # noqa: E402
+
+
+def synthetic_messages(sondes: int, duration: int):
+    home = settings_provider.settings.listener_location.location_tuple
+    for offset, message in synthetic_firehose.generate(sondes, duration, home):
+        yield offset, ListenerType.MQTT, message
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return statistics.quantiles(values, n=1000)[int(fraction * 1000) - 1] if len(values) > 1 else values[0]
+
+
+async def replay(messages, speed: float):
+    app = AsyncRadiosondeAutoRxListener()
+    notification_dispatcher.dry_run = True
+    listeners = {}
+    latencies = []
+
+    started = time.perf_counter()
+    first_timestamp = None
+    for received_at, source, data in messages:
+        if speed > 0:
+            if first_timestamp is None:
+                first_timestamp = received_at
+            delay = (received_at - first_timestamp) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        listener = listeners.get(source)
+        if listener is None:
+            listener = ListenerRepo.get_listener(source)(settings_provider, app.handle_payload_summary)
+            listeners[source] = listener
+
+        handling_started = time.perf_counter()
+        await listener.handle_raw(data)
+        latencies.append(time.perf_counter() - handling_started)
+
+    elapsed = time.perf_counter() - started
+    return app, latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", nargs="?", type=Path)
+    parser.add_argument("--synthetic", type=int, metavar="SONDES", help="Replay a synthetic firehose instead")
+    parser.add_argument("--duration", type=int, default=600, help="Seconds of synthetic firehose")
+    parser.add_argument("--speed", type=float, default=0, help="Replay speed: 1 = real time, 0 = max speed")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if (args.capture is None) == (args.synthetic is None):
+        parser.error("Give either a capture file or --synthetic")
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    if args.synthetic:
+        messages = synthetic_messages(args.synthetic, args.duration)
+    else:
+        messages = read_capture(args.capture)
+
+    app, latencies, elapsed = asyncio.run(replay(messages, args.speed))
+    if not latencies:
+        print("No messages replayed.")
+        return
+
+    peak_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"messages:        {len(latencies)}")
+    print(f"throughput:      {len(latencies) / elapsed:,.0f} messages/s")
+    print(f"latency p50:     {percentile(latencies, 0.50) * 1000:.3f} ms")
+    print(f"latency p99:     {percentile(latencies, 0.99) * 1000:.3f} ms")
+    print(f"peak RSS:        {peak_rss_mib:.1f} MiB")
+    tracker = app._tracker
+    print(f"tracked sondes:  {len(tracker)} ({tracker.seen} more seen far away)")
+    print(f"tracker memory:  {tracker.memory_bytes / 1024 / 1024:.1f} MiB, {tracker.bytes_per_sonde:.0f} bytes/sonde")
+    print(f"notifications:   {notification_dispatcher.submitted}")
+
+
+if __name__ == "__main__":
+    main()
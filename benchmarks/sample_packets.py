@@ -0,0 +1,81 @@
+"""Sample messages, in the format of each source, used by the benchmarks."""
+import json
+import random
+
+from fake_radiosondy_server import generate_features
+
+
+def udp_packet(rng: random.Random, callsign: str, frame: int) -> bytes:
+    """A radiosonde_auto_rx PAYLOAD_SUMMARY packet."""
+    return json.dumps({
+        "type": "PAYLOAD_SUMMARY",
+        "station": "N0CALL",
+        "callsign": callsign,
+        "latitude": round(rng.uniform(44.0, 46.0), 5),
+        "longitude": round(rng.uniform(8.0, 10.0), 5),
+        "altitude": round(rng.uniform(0, 30000), 1),
+        "speed": round(rng.uniform(0, 30), 1),
+        "heading": round(rng.uniform(0, 359), 1),
+        "time": "12:34:56",
+        "comment": "Radiosonde Auto-RX Telemetry",
+        "model": "RS41",
+        "freq": "403.0010 MHz",
+        "temp": round(rng.uniform(-60, 20), 1),
+        "frame": frame,
+        "bt": 65535,
+        "humidity": round(rng.uniform(0, 100), 1),
+        "pressure": round(rng.uniform(5, 1013), 1),
+        "sats": rng.randint(4, 12),
+        "batt": 2.9,
+        "snr": round(rng.uniform(5, 30), 1),
+        "fest": [-4200.0, 4300.0],
+        "f_centre": 403001000.0,
+        "ppm": -1.2,
+        "subtype": "RS41-SGP",
+        "sdr_device_idx": "0",
+        "vel_v": round(rng.uniform(-30, 6), 1),
+        "vel_h": round(rng.uniform(0, 30), 1),
+    }).encode()
+
+
+def mqtt_packet(rng: random.Random, callsign: str, frame: int) -> bytes:
+    """A sondehub `sondes/#` MQTT message payload."""
+    return json.dumps({
+        "software_name": "radiosonde_auto_rx",
+        "software_version": "1.7.4",
+        "uploader_callsign": "N0CALL",
+        "time_received": "2024-12-31T12:34:56.789Z",
+        "manufacturer": "Vaisala",
+        "type": "RS41",
+        "subtype": "RS41-SGP",
+        "serial": callsign,
+        "datetime": "2024-12-31T12:34:56.000Z",
+        "frame": frame,
+        "lat": round(rng.uniform(-70, 70), 5),
+        "lon": round(rng.uniform(-180, 180), 5),
+        "alt": round(rng.uniform(0, 30000), 1),
+        "temp": round(rng.uniform(-60, 20), 1),
+        "humidity": round(rng.uniform(0, 100), 1),
+        "pressure": round(rng.uniform(5, 1013), 1),
+        "vel_v": round(rng.uniform(-30, 6), 1),
+        "vel_h": round(rng.uniform(0, 30), 1),
+        "heading": round(rng.uniform(0, 359), 1),
+        "sats": rng.randint(4, 12),
+        "batt": 2.9,
+        "frequency": 403.001,
+        "burst_timer": 65535,
+        "snr": round(rng.uniform(5, 30), 1),
+        "rssi": round(rng.uniform(-110, -60), 1),
+        "uploader_position": [45.0, 9.0, 100],
+        "uploader_antenna": "1/4 wave",
+    }).encode()
+
+
+def generate(kind: str, count: int, seed: int = 42) -> list:
+    """Generate `count` sample messages of `kind` (udp, mqtt or web)."""
+    if kind == "web":
+        return generate_features(count, seed)
+
+    rng = random.Random(seed)
+    factory = udp_packet if kind == "udp" else mqtt_packet
+    return [factory(rng, f"S{i % 500:07d}", i // 500) for i in range(count)]
@@ -0,0 +1,115 @@
+"""
+Synthetic sondehub-style firehose: MQTT `sondes/#` messages for many simultaneous flights.
+
+Every sonde ascends at ~5 m/s to a random burst altitude, then descends with a speed decreasing
+towards the ground, drifting with the wind. A fraction of the flights land near `home`, so the
+geofence, threshold and landing paths are exercised too. Each frame is uploaded by a random number
+of receivers, like on sondehub, so duplicates are part of the stream.
+
+Usage: python benchmarks/synthetic_firehose.py OUTPUT.bin.gz [--sondes 2000] [--duration 600]
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from capture import CaptureWriter  # noqa: E402
+from settings.listener_types import ListenerType  # noqa: E402
+from settings_provider import settings_provider  # noqa: E402
+
+
+class _Flight:
+    def __init__(self, rng: random.Random, serial: str, home: tuple[float, float], near: bool, duration: int):
+        self.serial = serial
+        if near:
+            self.latitude = home[0] + rng.uniform(-0.3, 0.3)
+            self.longitude = home[1] + rng.uniform(-0.3, 0.3)
+        else:
+            self.latitude = rng.uniform(-70, 70)
+            self.longitude = rng.uniform(-180, 180)
+        # Flights near home start in their final descent, so they cross the alert thresholds.
+        self.altitude = rng.uniform(500, 3000) if near else rng.uniform(0, 30000)
+        self.burst_altitude = rng.uniform(20000, 35000)
+        self.ascending = not near and rng.random() < 0.5 and self.altitude < self.burst_altitude
+        self.frame = rng.randint(0, 5000)
+        self.drift = (rng.uniform(-10, 10), rng.uniform(-10, 10))  # m/s north, east
+        self.start = rng.randint(0, max(duration // 2, 1))
+
+    def step(self):
+        """Advance the flight by one second, returns False once it has landed."""
+        if self.ascending:
+            vel_v = 5.0
+            if self.altitude >= self.burst_altitude:
+                self.ascending = False
+        else:
+            # Descent speed decreases with the air density, ~5 m/s near the ground.
+            vel_v = -(5.0 + 25.0 * min(self.altitude / 30000, 1.0) ** 2)
+            if self.altitude <= 0:
+                return False
+
+        self.altitude = max(self.altitude + vel_v, 0.0)
+        self.latitude += self.drift[0] / 111_320
+        self.longitude += self.drift[1] / (111_320 * max(math.cos(math.radians(self.latitude)), 0.01))
+        self.frame += 1
+        self.vel_v = vel_v
+        return True
+
+    def message(self, uploader: str) -> bytes:
+        return json.dumps({
+            "software_name": "radiosonde_auto_rx",
+            "uploader_callsign": uploader,
+            "type": "RS41",
+            "subtype": "RS41-SGP",
+            "serial": self.serial,
+            "datetime": "",
+            "frame": self.frame,
+            "lat": round(self.latitude, 5),
+            "lon": round(self.longitude, 5),
+            "alt": round(self.altitude, 1),
+            "vel_v": round(self.vel_v, 1),
+            "vel_h": round(math.hypot(*self.drift), 1),
+            "heading": 0.0,
+            "sats": 9,
+            "batt": 2.9,
+            "frequency": 403.001,
+            "rssi": -90.0,
+        }).encode()
+
+
+def generate(sondes: int, duration: int, home: tuple[float, float], near_ratio: float = 0.01, seed: int = 42):
+    """Yield (seconds since start, MQTT payload) for `duration` seconds of firehose."""
+    rng = random.Random(seed)
+    flights = [_Flight(rng, f"S{i:07d}", home, rng.random() < near_ratio, duration) for i in range(sondes)]
+
+    for second in range(duration):
+        for flight in flights:
+            if second < flight.start or not flight.step():
+                continue
+            for uploader in range(rng.choice((1, 1, 2, 3))):
+                yield second + rng.random(), flight.message(f"UPLOADER{uploader}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--sondes", type=int, default=2000)
+    parser.add_argument("--duration", type=int, default=600)
+    parser.add_argument("--near-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+
+    home = settings_provider.settings.listener_location.location_tuple
+    writer = CaptureWriter(args.output)
+    for offset, message in generate(args.sondes, args.duration, home, args.near_ratio):
+        writer.write(ListenerType.MQTT, message, received_at=offset)
+        if writer.records % 50_000 == 0:
+            writer.flush_sync()
+    writer.flush_sync()
+    print(f"Wrote {writer.records} messages to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "app"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from decoders.field_mapping import mqtt_fields  # noqa: E402
+from radiosonde_payload import RadiosondePayload  # noqa: E402
+from settings import Settings  # noqa: E402
+from settings_provider import SettingsProvider  # noqa: E402
+
+HOME = (45.4642, 9.19)
+
+
+@pytest.fixture
+def make_payload():
+    """Build a payload from sondehub MQTT fields, near HOME by default."""
+
+    def make(serial="S1234567", **fields):
+        message = {
+            "serial": serial, "lat": HOME[0], "lon": HOME[1], "alt": 1000.0, "vel_v": -5.0, "vel_h": 10.0,
+            "heading": 90.0, "type": "RS41", "subtype": "RS41-SGP", "frame": 1, "batt": 2.9, "sats": 9,
+            "rssi": 10.0, "frequency": 402.5, "uploader_callsign": "STATION",
+        }
+        message.update(fields)
+        return RadiosondePayload.model_validate(mqtt_fields(message))
+
+    return make
+
+
+@pytest.fixture
+def make_settings():
+    """Build settings from the defaults, with the listener at HOME and the given sections replaced."""
+
+    def make(**sections) -> Settings:
+        data = Settings.get_default_settings().model_dump()
+        data["listener_location"] = {"latitude": HOME[0], "longitude": HOME[1], "altitude": 0}
+        data.update(sections)
+        return Settings(**data)
+
+    return make
+
+
+@pytest.fixture
+def settings_provider(tmp_path):
+    """A settings provider with the default settings, in a temporary config.yml."""
+    provider = SettingsProvider(tmp_path / "config.yml")
+    provider.settings  # Writes the default file
+    return provider
@@ -0,0 +1,118 @@
+from datetime import datetime, UTC
+
+import pytest
+
+import alert_rules
+from alert_rules import RuleSet
+from geofence import Geofence
+from sonde_tracker import SondeTracker
+
+from .conftest import HOME
+
+FAR = (HOME[0] + 1.0, HOME[1])  # About 111 km north of HOME
+
+
+def compile_rules(settings, tracker):
+    return RuleSet(settings.rules, {zone.name: zone for zone in settings.all_zones}, tracker)
+
+
+def matched(rule_set, tracker, model) -> list[str]:
+    sonde = tracker.get(model.callsign) or tracker.add(model, datetime.now(UTC))
+    return [rule.name for rule in rule_set.match(model, sonde)]
+
+
+@pytest.mark.parametrize("fields, expected", [
+    ({}, True),
+    ({"vel_v": 5.0}, False),
+    ({"alt": 3000.0}, False),
+    ({"type": "M10"}, False),
+    ({"lat": FAR[0]}, False),
+])
+def test_every_condition_must_hold(make_settings, make_payload, fields, expected):
+    settings = make_settings(rules=[{
+        "name": "low", "max_distance_km": 30, "descending": True, "max_altitude_meters": 2000, "models": ["RS41"],
+    }])
+    tracker = SondeTracker()
+    assert matched(compile_rules(settings, tracker), tracker, make_payload(**fields)) == (["low"] if expected else [])
+
+
+def test_unknown_battery_never_matches(make_settings, make_payload):
+    settings = make_settings(rules=[{"name": "battery", "max_battery_volts": 2.5}])
+    tracker = SondeTracker()
+    rule_set = compile_rules(settings, tracker)
+    assert matched(rule_set, tracker, make_payload("S1", batt=2.0)) == ["battery"]
+    assert matched(rule_set, tracker, make_payload("S2", batt=-1)) == []
+
+
+def test_burst_compares_with_the_previous_frame(make_settings, make_payload):
+    settings = make_settings(rules=[{"name": "burst", "burst": True}])
+    tracker = SondeTracker()
+    rule_set = compile_rules(settings, tracker)
+    assert matched(rule_set, tracker, make_payload(vel_v=5.0)) == []
+    tracker.update(make_payload(vel_v=5.0), datetime.now(UTC))
+    assert matched(rule_set, tracker, make_payload(vel_v=-5.0)) == ["burst"]
+
+
+def test_distance_is_checked_last(make_settings, make_payload, monkeypatch):
+    checked = []
+    contains = Geofence.contains
+
+    def counted_contains(self, location):
+        checked.append(location)
+        return contains(self, location)
+
+    monkeypatch.setattr(Geofence, "contains", counted_contains)
+    # The distance is written first, it is still checked after the model.
+    settings = make_settings(rules=[{"name": "rs92", "max_distance_km": 20, "models": ["RS92"]}])
+    tracker = SondeTracker()
+    rule_set = compile_rules(settings, tracker)
+
+    assert matched(rule_set, tracker, make_payload("S1", type="RS41")) == []
+    assert checked == []
+    assert matched(rule_set, tracker, make_payload("S2", type="RS92")) == ["rs92"]
+    assert len(checked) == 1
+
+
+def test_rules_of_a_zone_and_distance_share_their_geofence(make_settings, monkeypatch):
+    created = []
+
+    class CountedGeofence(Geofence):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self.range_km)
+
+    monkeypatch.setattr(alert_rules, "Geofence", CountedGeofence)
+    settings = make_settings(rules=[
+        {"name": "a", "max_distance_km": 20, "descending": True},
+        {"name": "b", "max_distance_km": 20, "max_altitude_meters": 1000},
+        {"name": "c", "max_distance_km": 30},
+    ])
+    compile_rules(settings, SondeTracker())
+    assert sorted(created) == [20, 30]
+
+
+def test_each_rule_is_notified_once(make_settings, make_payload):
+    settings = make_settings(rules=[{"name": "a"}, {"name": "b", "descending": True}])
+    tracker = SondeTracker()
+    rule_set = compile_rules(settings, tracker)
+    model = make_payload()
+    assert matched(rule_set, tracker, model) == ["a", "b"]
+
+    for rule in rule_set.match(model, tracker.get(model.callsign)):
+        tracker.set_rule_notified(model.callsign, rule.bit)
+    assert matched(rule_set, tracker, model) == []
+
+
+def test_rule_bits_survive_a_settings_reload(make_settings, make_payload):
+    tracker = SondeTracker()
+    first = compile_rules(make_settings(rules=[{"name": "a"}, {"name": "b"}]), tracker)
+    model = make_payload()
+    tracker.add(model, datetime.now(UTC))
+    tracker.set_rule_notified(model.callsign, first.rules[1].bit)
+
+    reordered = compile_rules(make_settings(rules=[{"name": "c"}, {"name": "b"}]), tracker)
+    assert matched(reordered, tracker, model) == ["c"]
+
+
+def test_no_rules(make_settings):
+    assert not compile_rules(make_settings(), SondeTracker())
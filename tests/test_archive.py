@@ -0,0 +1,116 @@
+import asyncio
+import math
+
+import pytest
+
+import archive
+from archive import ArchiveWriter, query
+
+T0 = 1_736_500_000.0  # 2025-01-10 09:06:40 UTC
+DAY = 86_400.0
+
+
+def write(writer: ArchiveWriter, rows):
+    for received_at, model in rows:
+        writer.write(model, received_at)
+    writer.flush_sync()
+
+
+def test_round_trip(tmp_path, make_payload):
+    writer = ArchiveWriter(tmp_path)
+    write(writer, [(T0 + i, make_payload(f"S{i % 2}", alt=100.0 * i, frame=i, sats=9)) for i in range(10)])
+
+    rows = list(query(tmp_path))
+    assert len(rows) == writer.rows == 10
+    row = rows[3]
+    assert list(row) == list(archive.COLUMNS)
+    assert (row["time"], row["callsign"], row["altitude"], row["frame"], row["sats"]) == (T0 + 3, "S1", 300.0, 3, 9)
+    assert (row["model"], row["subtype"], row["station"]) == ("RS41", "RS41-SGP", "STATION")
+
+
+def test_filters_and_columns(tmp_path, make_payload):
+    write(ArchiveWriter(tmp_path), [
+        (T0, make_payload("S1", lat=45.0, lon=9.0)),
+        (T0 + 10, make_payload("S2", lat=46.0, lon=9.0)),
+        (T0 + 20, make_payload("S1", lat=45.5, lon=179.9)),
+        (T0 + DAY, make_payload("S1", lat=45.0, lon=9.0)),
+    ])
+
+    assert [row["time"] for row in query(tmp_path, callsign="S1", columns=["time"])] == [T0, T0 + 20, T0 + DAY]
+    assert [row["callsign"] for row in query(tmp_path, since=T0 + 5, until=T0 + 20, columns=["callsign"])] == [
+        "S2", "S1",
+    ]
+    assert list(query(tmp_path, bbox=(44.0, 8.0, 45.9, 10.0), until=T0 + 100, columns=["callsign"])) == [
+        {"callsign": "S1"},
+    ]
+    # West above east crosses the antimeridian.
+    assert list(query(tmp_path, bbox=(44.0, 179.0, 47.0, -179.0), columns=["time"])) == [{"time": T0 + 20}]
+    with pytest.raises(ValueError):
+        list(query(tmp_path, columns=["nope"]))
+
+
+def test_one_part_per_day_and_skipped_days(tmp_path, make_payload, monkeypatch):
+    write(ArchiveWriter(tmp_path), [(T0, make_payload()), (T0 + DAY, make_payload())])
+    assert len(list(tmp_path.glob("*/*.rsa"))) == 2
+
+    read = []
+    original_read = archive.ArchivePart.read
+
+    def counted_read(part, names):
+        read.append(part.path)
+        return original_read(part, names)
+
+    monkeypatch.setattr(archive.ArchivePart, "read", counted_read)
+    assert len(list(query(tmp_path, since=T0 + DAY))) == 1
+    assert len(read) == 2  # The filter and the columns of the second day only
+    assert len({path.parent for path in read}) == 1
+
+
+def test_missing_fields(tmp_path, make_payload):
+    writer = ArchiveWriter(tmp_path)
+    with_none = make_payload("S1")
+    with_none.batt = None
+    with_none.sats = None
+    without_position = make_payload("S2")
+    without_position.latitude = None
+    write(writer, [(T0, with_none), (T0, without_position)])
+
+    assert writer.skipped == 1
+    (row,) = query(tmp_path, columns=["callsign", "batt", "sats"])
+    assert row["callsign"] == "S1" and math.isnan(row["batt"]) and row["sats"] == -1
+
+
+def test_string_separator_is_stripped(tmp_path, make_payload):
+    write(ArchiveWriter(tmp_path), [
+        (T0, make_payload("S\x001", uploader_callsign="A\x00B", type="RS\x0041")),
+        (T0 + 1, make_payload("S2")),
+    ])
+    rows = list(query(tmp_path, columns=["callsign", "station", "model"]))
+    assert rows == [
+        {"callsign": "S1", "station": "AB", "model": "RS41"},
+        {"callsign": "S2", "station": "STATION", "model": "RS41"},
+    ]
+
+
+def test_failed_day_is_retried_without_duplicates(tmp_path, make_payload):
+    writer = ArchiveWriter(tmp_path)
+    blocked = tmp_path / archive._day(T0 + DAY)
+    blocked.write_text("")  # Not a directory, writing the second day fails
+    for received_at in (T0, T0 + 1, T0 + DAY, T0 + DAY + 1):
+        writer.write(make_payload(), received_at)
+
+    assert not asyncio.run(writer.flush())
+    assert writer.rows == 2 and len(writer._buffer) == 2
+
+    blocked.unlink()
+    assert asyncio.run(writer.flush())
+    assert [row["time"] for row in query(tmp_path, columns=["time"])] == [T0, T0 + 1, T0 + DAY, T0 + DAY + 1]
+
+
+def test_buffer_is_bounded(tmp_path, make_payload):
+    writer = ArchiveWriter(tmp_path / "missing", batch_bytes=archive.ROW_BYTES * 2,
+                           max_buffered_bytes=archive.ROW_BYTES * 5)
+    for i in range(8):
+        writer.write(make_payload(frame=i), T0 + i)
+    assert len(writer._buffer) == 5 and writer.dropped == 3
+    assert [row[0] for row in writer._buffer] == [T0 + i for i in range(3, 8)]
@@ -0,0 +1,108 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, UTC
+
+from deadline_scheduler import DeadlineScheduler
+
+T0 = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def at(seconds: float) -> datetime:
+    return T0 + timedelta(seconds=seconds)
+
+
+class Recorder:
+    """`on_due` of a scheduler, recording its calls and returning the next deadlines it is given."""
+
+    def __init__(self, next_deadlines=None):
+        self.calls = []
+        self.next_deadlines = next_deadlines or {}
+
+    def __call__(self, key, now):
+        self.calls.append(key)
+        return self.next_deadlines.pop(key, None)
+
+
+def test_due_in_deadline_order():
+    recorder = Recorder()
+    scheduler = DeadlineScheduler(recorder)
+    scheduler.schedule("b", at(20))
+    scheduler.schedule("a", at(10))
+    scheduler.schedule("c", at(30))
+
+    assert scheduler.run_due(at(25)) == 2
+    assert recorder.calls == ["a", "b"]
+    assert len(scheduler) == 1
+
+
+def test_moving_a_deadline():
+    recorder = Recorder(next_deadlines={"a": at(40)})
+    scheduler = DeadlineScheduler(recorder)
+    scheduler.schedule("a", at(10))
+    scheduler.schedule("a", at(40))  # Later: the entry stays, `on_due` returns the actual deadline
+    assert len(scheduler._heap) == 1
+    scheduler.schedule("b", at(30))
+    scheduler.schedule("b", at(5))  # Earlier: a new entry, the old one is stale
+
+    scheduler.run_due(at(15))
+    assert recorder.calls == ["b", "a"]
+    scheduler.run_due(at(35))
+    assert recorder.calls == ["b", "a"]
+    scheduler.run_due(at(40))
+    assert recorder.calls == ["b", "a", "a"]
+    assert len(scheduler) == 0 and scheduler._stale == 0
+
+
+def test_cancelled_deadline_is_skipped():
+    recorder = Recorder()
+    scheduler = DeadlineScheduler(recorder)
+    scheduler.schedule("a", at(10))
+    scheduler.cancel("a")
+    assert scheduler.run_due(at(20)) == 0
+    assert recorder.calls == []
+
+
+def test_failing_callback_does_not_stop_the_others():
+    calls = []
+
+    def on_due(key, now):
+        calls.append(key)
+        if key == "a":
+            raise RuntimeError("boom")
+
+    scheduler = DeadlineScheduler(on_due)
+    scheduler.schedule("a", at(10))
+    scheduler.schedule("b", at(20))
+    assert scheduler.run_due(at(30)) == 2
+    assert calls == ["a", "b"]
+
+
+def test_stale_entries_are_compacted():
+    recorder = Recorder()
+    scheduler = DeadlineScheduler(recorder)
+    rng = random.Random(1)
+    for _ in range(100_000):
+        key = rng.randrange(500)
+        if rng.random() < 0.5:
+            scheduler.cancel(key)
+        else:
+            scheduler.schedule(key, at(rng.uniform(0, 7200)))
+        assert len(scheduler._heap) <= 2 * len(scheduler) + 1024 + 1
+
+    live = set(scheduler._deadlines)
+    scheduler.run_due(at(7200))
+    assert sorted(recorder.calls) == sorted(live)
+    assert scheduler._stale == 0
+
+
+def test_run_fires_at_the_deadline():
+    async def main():
+        fired = asyncio.Event()
+        scheduler = DeadlineScheduler(lambda key, now: fired.set())
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0)
+        scheduler.schedule("a", datetime.now(UTC) + timedelta(seconds=0.05))
+        await asyncio.wait_for(fired.wait(), 2)
+        task.cancel()
+
+    asyncio.run(main())
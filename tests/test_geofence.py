@@ -0,0 +1,63 @@
+import pytest
+from geopy import distance
+
+import geofence
+from geofence import Geofence, geodesic_km
+
+from .conftest import HOME
+
+
+def destination(home, bearing: float, km: float) -> tuple[float, float]:
+    point = distance.distance(kilometers=km).destination(home, bearing)
+    return point.latitude, point.longitude
+
+
+@pytest.mark.parametrize("bearing", [0, 45, 90, 180, 270])
+@pytest.mark.parametrize("km, inside", [(5.0, True), (19.9, True), (20.1, False), (60.0, False)])
+def test_contains_matches_the_geodesic(bearing, km, inside):
+    assert Geofence(HOME, 20.0).contains(destination(HOME, bearing, km)) is inside
+
+
+def test_exact_geodesic_only_near_the_boundary(monkeypatch):
+    calls = []
+
+    def counting_geodesic(a, b):
+        calls.append(b)
+        return geodesic_km(a, b)
+
+    monkeypatch.setattr(geofence, "geodesic_km", counting_geodesic)
+    fence = Geofence(HOME, 20.0)
+    fence.contains(destination(HOME, 30, 5.0))
+    fence.contains(destination(HOME, 30, 40.0))
+    fence.contains((HOME[0] + 5, HOME[1]))
+    assert calls == []
+
+    fence.contains(destination(HOME, 30, 20.05))
+    assert len(calls) == 1
+
+
+def test_across_the_antimeridian():
+    home = (-40.0, 179.95)
+    fence = Geofence(home, 20.0)
+    assert fence.contains((-40.0, -179.95))
+    assert not fence.contains((-40.0, -179.5))
+
+
+def test_near_the_pole_uses_the_geodesic():
+    home = (80.0, 10.0)
+    fence = Geofence(home, 50.0)
+    assert fence.contains(destination(home, 90, 49.0))
+    assert not fence.contains(destination(home, 90, 51.0))
+
+
+def test_distance_is_cached_per_callsign_and_position(monkeypatch):
+    fence = Geofence(HOME, 20.0)
+    location = destination(HOME, 60, 10.0)
+    assert fence.is_within_range("S1", location)
+    assert fence.get_distance("S1", location) == pytest.approx(10.0, abs=1e-6)
+
+    monkeypatch.setattr(geofence, "geodesic_km", lambda a, b: pytest.fail("distance computed again"))
+    assert fence.get_distance("S1", location) == pytest.approx(10.0, abs=1e-6)
+
+    fence.forget("S1")
+    assert fence._cache == {}
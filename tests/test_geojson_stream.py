@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from listeners.geojson_stream import FeatureStreamParser
+
+FEATURES = [
+    {"type": "Feature", "properties": {"id": f"S{i}", "course": "90 °", "altitude": f"{i} m"}}
+    for i in range(5)
+]
+BODY = json.dumps({"type": "FeatureCollection", "features": FEATURES}, ensure_ascii=False).encode()
+
+
+def parse(chunks) -> list[dict]:
+    parser = FeatureStreamParser()
+    features = []
+    for chunk in chunks:
+        features.extend(parser.feed(chunk))
+    return features + parser.close()
+
+
+def test_whole_body():
+    assert parse([BODY]) == FEATURES
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64])
+def test_chunks_split_anywhere(size):
+    # Splits the "features" key, the features and the multi-byte "°" between chunks.
+    assert parse([BODY[i:i + size] for i in range(0, len(BODY), size)]) == FEATURES
+
+
+def test_features_returned_as_soon_as_complete():
+    parser = FeatureStreamParser()
+    end = BODY.index(b'"S1"')
+    assert parser.feed(BODY[:end]) == FEATURES[:1]
+    assert parser.feed(BODY[end:]) == FEATURES[1:]
+    assert parser.close() == []
+
+
+def test_empty_collection():
+    assert parse([b'{"type": "FeatureCollection", "features": []}']) == []
+
+
+def test_truncated_body():
+    parser = FeatureStreamParser()
+    parser.feed(BODY[:-10])
+    with pytest.raises(ValueError):
+        parser.close()
@@ -0,0 +1,79 @@
+import asyncio
+
+import metrics
+from listeners.ingest_queue import IngestQueue
+from settings.overflow_policy import OverflowPolicy
+
+
+def drain(queue: IngestQueue) -> list:
+    async def main():
+        return [await queue.get() for _ in range(queue.qsize())]
+
+    return asyncio.run(main())
+
+
+def test_drop_oldest():
+    queue = IngestQueue(2, OverflowPolicy.DROP_OLDEST, "test-oldest")
+    assert queue.put(1) and queue.put(2)
+    assert not queue.put(3)
+    assert drain(queue) == [2, 3]
+    assert queue.dropped == 1
+    assert metrics.INGEST_DROPPED.labels("test-oldest").value == 1
+
+
+def test_drop_newest():
+    queue = IngestQueue(2, OverflowPolicy.DROP_NEWEST)
+    queue.put(1)
+    queue.put(2)
+    assert not queue.put(3)
+    assert drain(queue) == [1, 2]
+    assert queue.dropped == 1
+
+
+def test_coalesce_keeps_the_latest_per_key_in_place():
+    queue = IngestQueue(10, OverflowPolicy.COALESCE, "test-coalesce")
+    queue.put("a1", "a")
+    queue.put("b1", "b")
+    assert queue.put("a2", "a")
+    assert drain(queue) == ["a2", "b1"]
+    assert queue.coalesced == 1
+    assert metrics.INGEST_COALESCED.labels("test-coalesce").value == 1
+
+
+def test_coalesce_full_of_distinct_keys_drops_the_oldest():
+    queue = IngestQueue(2, OverflowPolicy.COALESCE)
+    queue.put("a1", "a")
+    queue.put("b1", "b")
+    assert not queue.put("c1", "c")
+    assert queue.put("b2", "b")
+    assert drain(queue) == ["b2", "c1"]
+    assert queue.dropped == 1
+
+
+def test_coalesce_without_key_is_never_merged():
+    queue = IngestQueue(10, OverflowPolicy.COALESCE)
+    queue.put(1)
+    queue.put(2)
+    assert drain(queue) == [1, 2]
+
+
+def test_high_water():
+    queue = IngestQueue(10, listener="test-high-water")
+    for item in range(4):
+        queue.put(item)
+    drain(queue)
+    queue.put(4)
+    assert queue.high_water == 4
+    assert metrics.INGEST_HIGH_WATER.labels("test-high-water").value == 4
+
+
+def test_get_waits_for_an_item():
+    async def main():
+        queue = IngestQueue(10)
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+        queue.put("item")
+        return await asyncio.wait_for(getter, 1)
+
+    assert asyncio.run(main()) == "item"
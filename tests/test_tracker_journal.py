@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, UTC
+
+from sonde_tracker import SondeTracker
+from tracker_journal import TrackerJournal
+
+
+def tracked(directory):
+    tracker = SondeTracker()
+    journal = TrackerJournal(tracker, directory, flush_interval=0.01, snapshot_interval=3600)
+    tracker.track_changes(TrackerJournal.CHANGES)
+    return tracker, journal
+
+
+def reload(directory) -> SondeTracker:
+    tracker = SondeTracker()
+    TrackerJournal(tracker, directory).load()
+    return tracker
+
+
+def test_snapshot_and_journal_round_trip(tmp_path, make_payload):
+    async def main():
+        tracker, journal = tracked(tmp_path)
+        tracker.add(make_payload("S1", alt=1234.0), datetime.now(UTC))
+        tracker.add(make_payload("S2"), datetime.now(UTC))
+        tracker.set_notify("S1", "default", True)
+        tracker.set_rule_notified("S1", tracker.rule_bit("low battery"))
+        await journal.snapshot()
+
+        tracker.set_landing_notify("S1", "default", True)
+        tracker.remove("S2")
+        tracker.add(make_payload("S3"), datetime.now(UTC))
+        await journal.flush()
+
+    asyncio.run(main())
+    restored = reload(tmp_path)
+    assert sorted(restored.callsigns()) == ["S1", "S3"]
+    sonde = restored.get("S1")
+    assert sonde.altitude == 1234.0
+    assert sonde.notify == sonde.landing_notify == frozenset({"default"})
+    assert restored.rule_names(sonde.rules) == ["low battery"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["journal-1.jsonl", "snapshot.json"]
+
+
+def test_record_cut_short_is_skipped(tmp_path, make_payload):
+    async def main():
+        tracker, journal = tracked(tmp_path)
+        tracker.add(make_payload("S1"), datetime.now(UTC))
+        await journal.flush()
+        with open(tmp_path / "journal-0.jsonl", "a", encoding="utf-8") as journal_file:
+            journal_file.write('{"callsign": "S2", "noti')
+
+    asyncio.run(main())
+    assert reload(tmp_path).callsigns() == ["S1"]
+
+
+def test_failed_write_is_retried(tmp_path, make_payload):
+    directory = tmp_path / "journal"
+    directory.write_text("")  # Not a directory, every write fails
+
+    async def main():
+        tracker, journal = tracked(directory)
+        task = asyncio.create_task(journal.run())
+        tracker.add(make_payload("S1"), datetime.now(UTC))
+        await asyncio.sleep(0.1)
+        assert not task.done()
+
+        directory.unlink()
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert reload(directory).callsigns() == ["S1"]
+
+
+def test_final_flush_on_cancel(tmp_path, make_payload):
+    async def main():
+        tracker, journal = tracked(tmp_path)
+        journal.flush_interval = 3600
+        task = asyncio.create_task(journal.run())
+        await asyncio.sleep(0)
+        tracker.add(make_payload("S1"), datetime.now(UTC))
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert reload(tmp_path).callsigns() == ["S1"]
@@ -0,0 +1,101 @@
+import asyncio
+
+from aiohttp import web
+
+from fake_radiosondy_server import FakeRadiosondyExport
+from listeners.web_listener import AsyncWebListener
+
+FEATURES = 50
+
+
+async def serve(export: FakeRadiosondyExport) -> tuple[web.AppRunner, str]:
+    runner = web.AppRunner(export.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/export/export_map.php?live_map=1"
+
+
+def poll(settings_provider, export: FakeRadiosondyExport, steps):
+    """
+    Run `steps(listener, export, polled)` against the fake export, `polled` collecting the payloads passed
+    to the callback.
+    """
+
+    async def main():
+        runner, url = await serve(export)
+        settings_provider.settings.web_listener.url = url
+        polled = []
+
+        async def callback(model):
+            polled.append(model)
+
+        listener = AsyncWebListener(settings_provider, callback)
+        listener._session = listener._create_session()
+        try:
+            await steps(listener, export, polled)
+        finally:
+            await listener._session.close()
+            await runner.cleanup()
+
+    asyncio.run(main())
+
+
+def test_first_poll_decodes_every_feature(settings_provider):
+    async def steps(listener, export, polled):
+        assert await listener._make_request()
+        assert len(polled) == FEATURES
+        assert {model.callsign for model in polled} == {f"S{i:07d}" for i in range(FEATURES)}
+        assert all(model.frame == listener._poll for model in polled)
+        assert all(0 <= model.heading < 360 for model in polled)
+
+    poll(settings_provider, FakeRadiosondyExport(FEATURES, change_every=0), steps)
+
+
+def test_unchanged_export_gets_a_304(settings_provider):
+    async def steps(listener, export, polled):
+        await listener._make_request()
+        polled.clear()
+        assert await listener._make_request()
+        assert export.not_modified == 1
+        assert polled == []
+
+    poll(settings_provider, FakeRadiosondyExport(FEATURES, change_every=0), steps)
+
+
+def test_unchanged_features_are_skipped(settings_provider):
+    async def steps(listener, export, polled):
+        await listener._make_request()
+        polled.clear()
+        listener._etag = listener._last_modified = None  # Downloaded again, without validators
+        assert await listener._make_request()
+        assert export.not_modified == 0
+        assert polled == []
+
+    poll(settings_provider, FakeRadiosondyExport(FEATURES, change_every=0), steps)
+
+
+def test_changed_export_is_decoded_again(settings_provider):
+    async def steps(listener, export, polled):
+        await listener._make_request()
+        first_etag, first_poll = listener._etag, listener._poll
+        polled.clear()
+        export.change_every = 1e8  # New version of the export, with other positions
+        assert await listener._make_request()
+        assert listener._etag != first_etag
+        assert len(polled) == FEATURES
+        assert all(model.frame == listener._poll > first_poll for model in polled)
+
+    poll(settings_provider, FakeRadiosondyExport(FEATURES, change_every=0), steps)
+
+
+def test_server_error_keeps_the_validators(settings_provider):
+    async def steps(listener, export, polled):
+        await listener._make_request()
+        etag = listener._etag
+        listener.settings.web_listener.url = listener.settings.web_listener.url.replace("export_map", "missing")
+        assert not await listener._make_request()
+        assert listener._etag == etag
+
+    poll(settings_provider, FakeRadiosondyExport(FEATURES, change_every=0), steps)